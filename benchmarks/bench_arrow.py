@@ -0,0 +1,80 @@
+'''
+Time to count the USAS tags of a tagged corpus stored as JSON Lines of
+`UCREL_Doc.to_json` compared to the same corpus stored as Parquet and as
+an Arrow IPC file, and the size of each file.
+
+    python benchmarks/bench_arrow.py --tokens 1000000
+'''
+import argparse
+import collections
+import os
+import tempfile
+import time
+from typing import Callable, Tuple
+
+import pyarrow.compute
+
+from ucrel_api.api import parse_usas_tab
+from ucrel_api.arrow import write_arrow, read_arrow, write_parquet, read_parquet
+from ucrel_api.ucrel_doc import UCREL_Doc
+from bench_parse import usas_tab_response
+
+
+def timed(function: Callable, *args) -> Tuple[object, float]:
+    '''
+    **returns**: The return value of `function(*args)` and how long it took
+    in seconds.
+    '''
+    start = time.perf_counter()
+    value = function(*args)
+    return value, time.perf_counter() - start
+
+
+def json_usas_counts(path: str) -> collections.Counter:
+    usas_counts = collections.Counter()
+    with open(path, 'r', encoding='utf-8') as json_lines:
+        for line in json_lines:
+            usas_counts.update(token.usas_tag for token in UCREL_Doc.from_json(line))
+    return usas_counts
+
+
+def arrow_usas_counts(table) -> collections.Counter:
+    value_counts = pyarrow.compute.value_counts(table.column('usas_tag')).to_pylist()
+    return collections.Counter({count['values']: count['counts'] for count in value_counts})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tokens', type=int, default=1000000)
+    parser.add_argument('--doc-tokens', type=int, default=1000)
+    args = parser.parse_args()
+
+    ucrel_doc = parse_usas_tab(usas_tab_response(args.tokens))
+    ucrel_docs = [UCREL_Doc('', tokens=ucrel_doc.tokens[start:start + args.doc_tokens])
+                  for start in range(0, len(ucrel_doc), args.doc_tokens)]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        json_path = os.path.join(temp_dir, 'corpus.jsonl')
+        parquet_path = os.path.join(temp_dir, 'corpus.parquet')
+        arrow_path = os.path.join(temp_dir, 'corpus.arrow')
+        with open(json_path, 'w', encoding='utf-8') as json_lines:
+            for doc in ucrel_docs:
+                json_lines.write(doc.to_json() + '\n')
+        write_parquet(ucrel_docs, parquet_path)
+        write_arrow(ucrel_docs, arrow_path)
+
+        json_counts, json_time = timed(json_usas_counts, json_path)
+        parquet_counts, parquet_time = timed(
+            lambda: arrow_usas_counts(read_parquet(parquet_path, columns=['usas_tag'])))
+        arrow_counts, arrow_time = timed(lambda: arrow_usas_counts(read_arrow(arrow_path)))
+        assert json_counts == parquet_counts == arrow_counts
+
+        print(f'{args.tokens} tokens in {len(ucrel_docs)} UCREL Docs, USAS tag counts:')
+        for name, path, seconds in [('JSON Lines', json_path, json_time),
+                                    ('Parquet', parquet_path, parquet_time),
+                                    ('Arrow', arrow_path, arrow_time)]:
+            size = os.path.getsize(path) / 1024 ** 2
+            print(f'{name:10} {seconds:7.3f}s ({json_time / seconds:6.1f}x), {size:6.1f}MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+'''
+Per call latency of `UCREL_API.usas` with a pooled, keep-alive
+`requests.Session` compared to opening a new connection per call
+(`requests.post`, the behaviour before connection pooling was added).
+
+    python benchmarks/bench_connection_pool.py --calls 500
+'''
+import argparse
+import time
+from types import SimpleNamespace
+
+import requests
+
+from ucrel_api.api import UCREL_API
+from usas_stub_server import USASStubServer
+
+
+def time_calls(api: UCREL_API, calls: int, text: str) -> float:
+    '''
+    **returns**: Mean seconds per `api.usas` call.
+    '''
+    api.usas(text)
+    start = time.perf_counter()
+    for _ in range(calls):
+        api.usas(text)
+    return (time.perf_counter() - start) / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--calls', type=int, default=500)
+    parser.add_argument('--text', default='Hope you have a nice day.')
+    args = parser.parse_args()
+
+    with USASStubServer() as server:
+        server_address, port = server.address
+        with UCREL_API('bench@example.com', server_address, port) as api:
+            pooled = time_calls(api, args.calls, args.text)
+        # `requests.post` opens (and closes) a new connection per call.
+        unpooled_api = UCREL_API('bench@example.com', server_address, port)
+        unpooled_api._session = SimpleNamespace(post=requests.post)
+        unpooled = time_calls(unpooled_api, args.calls, args.text)
+
+    print(f'new connection per call: {unpooled * 1000:.3f} ms/call')
+    print(f'pooled connection:       {pooled * 1000:.3f} ms/call')
+    print(f'saved per call:          {(unpooled - pooled) * 1000:.3f} ms '
+          f'({unpooled / pooled:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+'''
+Memory used by the tokens of a `UCREL_Doc` (a list of `UCREL_Token`s)
+compared to a `UCREL_Columnar_Doc` of the same tokens.
+
+    python benchmarks/bench_doc_memory.py --tokens 1000000
+'''
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+from ucrel_api.api import parse_usas_tab
+from ucrel_api.ucrel_doc import UCREL_Columnar_Doc
+from bench_parse import usas_tab_response
+
+
+def allocated(function: Callable, *args) -> Tuple[object, int]:
+    '''
+    **returns**: The return value of `function(*args)` and the number of
+    bytes it allocated that are still in use afterwards.
+    '''
+    gc.collect()
+    tracemalloc.start()
+    value = function(*args)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size
+
+
+def timed(function: Callable, *args) -> float:
+    '''
+    **returns**: How long `function(*args)` took in seconds.
+    '''
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tokens', type=int, default=1000000)
+    args = parser.parse_args()
+
+    usas_tab = usas_tab_response(args.tokens)
+    ucrel_doc, doc_size = allocated(parse_usas_tab, usas_tab, '')
+    columnar_doc, columnar_size = allocated(UCREL_Columnar_Doc.from_doc, ucrel_doc)
+    assert columnar_doc == ucrel_doc
+    convert_time = timed(UCREL_Columnar_Doc.from_doc, ucrel_doc)
+    iterate_time = timed(lambda: sum(1 for _ in columnar_doc))
+
+    print(f'{args.tokens} tokens')
+    print(f'UCREL_Doc:          {doc_size / args.tokens:6.1f} bytes per token')
+    print(f'UCREL_Columnar_Doc: {columnar_size / args.tokens:6.1f} bytes per token '
+          f'({doc_size / columnar_size:.1f}x less), converted in {convert_time:.2f}s')
+    print(f'Iterating over the UCREL_Columnar_Doc tokens: {iterate_time:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
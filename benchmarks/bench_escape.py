@@ -0,0 +1,87 @@
+'''
+Time to SGML entity escape and un-escape large texts with
+`UCREL_API._sgml_entity_escape` and `UCREL_API._sgml_entity_un_escape`
+compared to one `str.replace` per entity.
+
+    python benchmarks/bench_escape.py --chars 10000000
+'''
+import argparse
+import random
+import time
+from typing import Callable, Dict, Tuple
+
+from ucrel_api.api import UCREL_API
+
+
+def replace_escape(text: str, entity_mapper: Dict[str, str]) -> str:
+    text = text.replace('&', '&amp;')
+    for entity, escaped_entity in entity_mapper.items():
+        text = text.replace(entity, escaped_entity)
+    return text
+
+
+def replace_un_escape(text: str, reverse_entity_mapper: Dict[str, str]) -> str:
+    for escaped_entity, entity in reverse_entity_mapper.items():
+        if escaped_entity != '&amp;':
+            text = text.replace(escaped_entity, entity)
+    return text.replace('&amp;', '&')
+
+
+def random_text(number_chars: int, entity_ratio: float) -> str:
+    '''
+    **returns**: A text of about `number_chars` characters made of English
+    like words, `entity_ratio` of the words are characters that are
+    escaped.
+    '''
+    random.seed(18)
+    words = ['the', 'tagger', 'of', 'New', 'York', 'and', 'semantic', 'a', 'lemma']
+    entities = list(UCREL_API.SGML_ENTITY_MAPPER) + ['&']
+    text = []
+    length = 0
+    while length < number_chars:
+        word = random.choice(entities) if random.random() < entity_ratio else random.choice(words)
+        text.append(word)
+        length += len(word) + 1
+    return ' '.join(text)
+
+
+def timed(function: Callable, *args, repeat: int = 3) -> Tuple[object, float]:
+    '''
+    **returns**: The return value of `function(*args)` and the fastest time
+    of `repeat` runs of it in seconds.
+    '''
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function(*args)
+        times.append(time.perf_counter() - start)
+    return value, min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--chars', type=int, default=10000000)
+    args = parser.parse_args()
+
+    texts = [('ASCII, no entities', random_text(args.chars, 0.0).replace('&', 'and')),
+             ('1% entities', random_text(args.chars, 0.01)),
+             ('20% entities', random_text(args.chars, 0.2))]
+    entity_mapper = UCREL_API.SGML_ENTITY_MAPPER
+    reverse_entity_mapper = UCREL_API.REVERSE_SGML_ENTITY_MAPPER
+    print(f'{args.chars} characters, {len(entity_mapper)} entities')
+    for name, text in texts:
+        escaped, escape_time = timed(UCREL_API._sgml_entity_escape, text)
+        replace_escaped, replace_escape_time = timed(replace_escape, text, entity_mapper)
+        assert escaped == replace_escaped
+        un_escaped, un_escape_time = timed(UCREL_API._sgml_entity_un_escape, escaped)
+        replace_un_escaped, replace_un_escape_time = timed(replace_un_escape, escaped,
+                                                           reverse_entity_mapper)
+        assert un_escaped == replace_un_escaped == text
+        print(f'{name:20} escape {escape_time:6.3f}s, replace per entity {replace_escape_time:6.3f}s '
+              f'({replace_escape_time / escape_time:5.1f}x), un-escape {un_escape_time:6.3f}s, '
+              f'replace per entity {replace_un_escape_time:6.3f}s '
+              f'({replace_un_escape_time / un_escape_time:5.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
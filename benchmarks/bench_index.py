@@ -0,0 +1,104 @@
+'''
+Query times of a `UCREL_Index` compared to a linear scan over
+`UCREL_Doc.sentences`, and the time to build and load the index.
+
+    python benchmarks/bench_index.py --tokens 1000000
+'''
+import argparse
+import io
+import random
+import time
+from typing import Callable, List, Tuple
+
+from ucrel_api.index import UCREL_Index
+from ucrel_api.ucrel_doc import UCREL_Doc
+from ucrel_api.ucrel_token import UCREL_Token
+
+POS_TAGS = ['NN1', 'NN2', 'JJ', 'VV0', 'VVD', 'AT', 'AT1', 'II', 'RR', 'PPY', 'NP1', 'CC']
+USAS_TAGS = ['A1.1.1', 'A11.1+', 'A5.1+', 'E4.1+', 'E4.1-', 'E4.2+', 'I1.1', 'I2.1',
+             'N5+', 'S2', 'T1.3', 'Z5', 'Z8', 'Z99']
+
+
+def random_docs(number_tokens: int, doc_tokens: int = 1000,
+                sentence_length: int = 20, vocab_size: int = 20000) -> List[UCREL_Doc]:
+    '''
+    **returns**: `UCREL_Doc`s with `number_tokens` tokens in total, whose
+    lemmas are from a vocabulary of `vocab_size` lemmas.
+    '''
+    random.seed(42)
+    lemmas = [f'lemma{index}' for index in range(vocab_size)]
+    ucrel_docs = []
+    for doc_start in range(0, number_tokens, doc_tokens):
+        tokens = []
+        for _ in range(min(doc_tokens, number_tokens - doc_start)):
+            lemma = random.choice(lemmas)
+            tokens.append(UCREL_Token(lemma, lemma, random.choice(POS_TAGS),
+                                      random.choice(USAS_TAGS)))
+        sentence_indexes = [(start, min(start + sentence_length, len(tokens)))
+                            for start in range(0, len(tokens), sentence_length)]
+        ucrel_docs.append(UCREL_Doc('', tokens=tokens, sentence_indexes=sentence_indexes))
+    return ucrel_docs
+
+
+def scan_sentences(ucrel_docs: List[UCREL_Doc],
+                   match: Callable[[UCREL_Token], bool]) -> List[Tuple[int, int]]:
+    '''
+    **returns**: The `(doc id, sentence id)` of each sentence with a token
+    that `match`es, found by a linear scan.
+    '''
+    found = []
+    for doc_id, ucrel_doc in enumerate(ucrel_docs):
+        for sentence_id, sentence in enumerate(ucrel_doc.sentences):
+            if any(match(token) for token in sentence):
+                found.append((doc_id, sentence_id))
+    return found
+
+
+def timed(function: Callable, *args, repeat: int = 3) -> Tuple[object, float]:
+    '''
+    **returns**: The return value of `function(*args)` and the fastest time
+    of `repeat` runs of it in seconds.
+    '''
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function(*args)
+        times.append(time.perf_counter() - start)
+    return value, min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tokens', type=int, default=1000000)
+    args = parser.parse_args()
+
+    ucrel_docs = random_docs(args.tokens)
+    index, build_time = timed(UCREL_Index, ucrel_docs, repeat=1)
+    index_file = io.BytesIO()
+    index.dump(index_file)
+    _, load_time = timed(lambda: UCREL_Index.load(io.BytesIO(index_file.getvalue())))
+    print(f'{args.tokens} tokens in {len(ucrel_docs)} UCREL Docs, index built in '
+          f'{build_time:.2f}s, {index_file.tell() / 1024 ** 2:.1f}MB loaded in {load_time:.3f}s')
+
+    queries = [('lemma lemma7',
+                lambda: index.sentences(lemma='lemma7'),
+                lambda token: token.lemma == 'lemma7'),
+               ('lemma lemma7 tagged NN1',
+                lambda: index.sentences(lemma='lemma7', pos_tag='NN1'),
+                lambda token: token.lemma == 'lemma7' and token.pos_tag == 'NN1'),
+               ('USAS tag starts with E4',
+                lambda: index.sentences(usas_tag='E4', prefix=True),
+                lambda token: token.usas_tag.startswith('E4')),
+               ('USAS tag A1 and its sub-categories',
+                lambda: index.sentences(usas_tag='A1', prefix=True),
+                lambda token: token.usas_tag == 'A1' or token.usas_tag.startswith('A1.'))]
+    for name, index_query, match in queries:
+        index_sentences, index_time = timed(index_query)
+        scan_result, scan_time = timed(scan_sentences, ucrel_docs, match, repeat=1)
+        assert index_sentences == scan_result
+        print(f'{name:35} {len(index_sentences):7} sentences, index {index_time * 1000:8.2f}ms, '
+              f'scan {scan_time * 1000:8.1f}ms ({scan_time / index_time:.0f}x)')
+
+
+if __name__ == '__main__':
+    main()
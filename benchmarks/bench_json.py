@@ -0,0 +1,111 @@
+'''
+Round trip times of the `UCREL_Doc` JSON serialization, `to_json`/`from_json`
+and the streaming `dump`/`load`, compared to the string concatenation
+`to_json` and the `from_json` they replaced.
+
+    python benchmarks/bench_json.py --tokens 10000000
+'''
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Tuple
+
+from ucrel_api.api import parse_usas_tab
+from ucrel_api import ucrel_doc as ucrel_doc_module
+from ucrel_api.ucrel_doc import UCREL_Doc
+from ucrel_api.ucrel_token import UCREL_Token
+from bench_parse import usas_tab_response
+
+
+def concatenation_to_json(ucrel_doc: UCREL_Doc) -> str:
+    '''
+    The `UCREL_Doc.to_json` before it used a single `json.dumps`.
+    '''
+    text_json = json.dumps(ucrel_doc.text)
+    sentence_indexes_json = json.dumps(ucrel_doc._sentence_indexes)
+
+    token_json = '['
+    for token in ucrel_doc.tokens:
+        token_json += f'{token.to_json()}, '
+    token_json = token_json.rstrip(', ')
+    token_json += ']'
+
+    json_string = ('{"text": ' + text_json + ', "tokens": ' + token_json +
+                   ', "sentence_indexes": '+ sentence_indexes_json + '}')
+    return json_string
+
+
+def json_from_json(json_string: str) -> UCREL_Doc:
+    '''
+    The `UCREL_Doc.from_json` before it could use orjson.
+    '''
+    json_ucrel_doc = json.loads(json_string)
+    sentence_indexes = []
+    json_sentence_indexes = json_ucrel_doc['sentence_indexes']
+    if json_sentence_indexes is not None:
+        for index in json_sentence_indexes:
+            sentence_indexes.append(tuple(index))
+    json_ucrel_doc['sentence_indexes'] = sentence_indexes if sentence_indexes else None
+    json_ucrel_doc['tokens'] = [UCREL_Token(**token) for token in json_ucrel_doc['tokens']]
+    return UCREL_Doc(**json_ucrel_doc)
+
+
+def timed(function: Callable, *args, repeat: int = 3) -> Tuple[object, float]:
+    '''
+    **returns**: The return value of `function(*args)` and the fastest time
+    of `repeat` runs of it in seconds.
+    '''
+    times = []
+    for _ in range(repeat):
+        value = None
+        gc.collect()
+        start = time.perf_counter()
+        value = function(*args)
+        times.append(time.perf_counter() - start)
+    return value, min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tokens', type=int, default=1000000)
+    args = parser.parse_args()
+
+    ucrel_doc = parse_usas_tab(usas_tab_response(args.tokens))
+    print(f'{args.tokens} tokens')
+
+    json_string, concatenation_time = timed(concatenation_to_json, ucrel_doc)
+    new_json_string, to_json_time = timed(ucrel_doc.to_json)
+    assert new_json_string == json_string
+    del new_json_string
+    print(f'to_json:   {to_json_time:.2f}s, previously {concatenation_time:.2f}s')
+
+    _, json_time = timed(json_from_json, json_string)
+    from_json_doc, from_json_time = timed(UCREL_Doc.from_json, json_string)
+    assert from_json_doc == ucrel_doc
+    del from_json_doc
+    fast_path = 'orjson' if ucrel_doc_module.orjson is not None else 'json, orjson is not installed'
+    print(f'from_json: {from_json_time:.2f}s ({fast_path}), previously {json_time:.2f}s')
+    del json_string
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        json_file = os.path.join(temp_dir, 'doc.json')
+        def dump() -> None:
+            with open(json_file, 'w', encoding='utf-8') as json_fp:
+                ucrel_doc.dump(json_fp)
+
+        def load() -> UCREL_Doc:
+            with open(json_file, 'r', encoding='utf-8') as json_fp:
+                return UCREL_Doc.load(json_fp)
+
+        _, dump_time = timed(dump)
+        loaded_doc, load_time = timed(load)
+        assert loaded_doc == ucrel_doc
+        size = os.path.getsize(json_file) / 1024 ** 2
+        print(f'dump:      {dump_time:.2f}s, load {load_time:.2f}s ({size:.0f}MB file)')
+
+
+if __name__ == '__main__':
+    main()
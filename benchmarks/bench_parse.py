@@ -0,0 +1,120 @@
+'''
+Time to parse a USAS `tab` style response into a `UCREL_Doc` with
+`parse_usas_tab` compared to the nested `split` parser it replaced.
+
+    python benchmarks/bench_parse.py --tokens 1000000
+'''
+import argparse
+import random
+import time
+from typing import List, Tuple
+
+from ucrel_api.api import UCREL_API, parse_usas_tab
+from ucrel_api.ucrel_doc import UCREL_Doc
+from ucrel_api.ucrel_token import UCREL_Token
+
+TOKEN_LINES = ['hello\tUH\thello\tZ4 \n', 'New\tNP1\tnew\tZ2[i2.2.1 Z3 \n',
+               'York\tNP1\tyork\tZ2[i2.2.2 \n', '&pound;100\tNNU\t&pound;100\tI1 \n',
+               '&lsqb;\t(\t&lsqb;\t\n', 'Andr&eacute;\tNP1\tandr&eacute;\tZ99 \n',
+               'another\tDD1\tanother\tA6.1- N5++ \n', 'day\tNNT1\tday\tT1.3 \n']
+
+
+def usas_tab_response(number_tokens: int, sentence_length: int = 20) -> str:
+    '''
+    **returns**: A USAS `tab` style response of `number_tokens` tokens.
+    '''
+    random.seed(42)
+    lines = ['\n<s>\n</s>\n']
+    for token_index in range(number_tokens):
+        if token_index % sentence_length == 0:
+            lines.append('<s>\n')
+        if token_index % sentence_length == sentence_length - 1:
+            lines.append('.\t.\tPUNC\t\n</s>\n')
+        else:
+            lines.append(random.choice(TOKEN_LINES))
+    if number_tokens % sentence_length:
+        lines.append('</s>\n')
+    return ''.join(lines)
+
+
+def split_parse_usas_tab(usas_data: str, text: str) -> UCREL_Doc:
+    '''
+    The parser `UCREL_API.usas` used before `parse_usas_tab`.
+    '''
+    usas_data = usas_data.strip()
+    ucrel_tokens: List[UCREL_Token] = []
+    sentence_indexes: List[Tuple[int, int]] = []
+    token_index = 0
+    last_sentence_index = 0
+    for sentence in usas_data.split('<s>'):
+        sentence = sentence.strip().rstrip('</s>')
+        if not sentence:
+            continue
+        for token_values in sentence.split('\n'):
+            token_values = token_values.strip()
+            if not token_values:
+                continue
+            token_values = token_values.split('\t')
+            token_text, pos_tag, lemma, usas_tags = None, None, None, None
+            if len(token_values) == 3:
+                token_text, pos_tag, lemma = token_values
+            else:
+                token_text, pos_tag, lemma, usas_tags = token_values
+            token_text = split_un_escape(token_text)
+            lemma = split_un_escape(lemma)
+            usas_tag = None
+            mwe_tag = None
+            if usas_tags is not None:
+                usas_tag = usas_tags.split()[0]
+                usas_and_mwe = usas_tag.split('[i')
+                if len(usas_and_mwe) == 2:
+                    usas_tag, mwe_tag = usas_and_mwe
+            ucrel_tokens.append(UCREL_Token(token_text, lemma=lemma, pos_tag=pos_tag,
+                                            usas_tag=usas_tag, mwe_tag=mwe_tag))
+            token_index += 1
+        sentence_indexes.append((last_sentence_index, token_index))
+        last_sentence_index = token_index
+    return UCREL_Doc(text, tokens=ucrel_tokens, sentence_indexes=sentence_indexes)
+
+
+def split_un_escape(text: str) -> str:
+    '''
+    The SGML un-escaping used before `parse_usas_tab`.
+    '''
+    if '&amp;' in text:
+        text = text.replace('&amp;', '&')
+    for escaped_entity in ['&pound;', '&eacute;', '&lt;', '&gt;', '&lsqb;', '&rsqb;']:
+        if escaped_entity in text:
+            text = text.replace(escaped_entity, UCREL_API.REVERSE_SGML_ENTITY_MAPPER[escaped_entity])
+    return text
+
+
+def best_time(function, *args, repeat: int = 3) -> float:
+    '''
+    **returns**: The fastest of `repeat` runs of `function(*args)` in seconds.
+    '''
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tokens', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    usas_tab = usas_tab_response(args.tokens)
+    assert parse_usas_tab(usas_tab, '') == split_parse_usas_tab(usas_tab, '')
+    split_time = best_time(split_parse_usas_tab, usas_tab, '', repeat=args.repeat)
+    parse_time = best_time(parse_usas_tab, usas_tab, '', repeat=args.repeat)
+    print(f'{args.tokens} tokens, {len(usas_tab) / 1024 ** 2:.1f}MB response')
+    print(f'split parser:   {split_time:.3f}s')
+    print(f'parse_usas_tab: {parse_time:.3f}s ({split_time / parse_time:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
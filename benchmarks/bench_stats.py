@@ -0,0 +1,120 @@
+'''
+Time to compute lemma, POS and USAS tag frequencies, a POS by USAS tag
+cross tabulation, and lemma log-likelihood keyness with `UCREL_Stats`
+compared to Python loops over the `UCREL_Token`s.
+
+The corpus is made of copies of a few `UCREL_Columnar_Doc`s, so that a
+corpus of 50M tokens fits in memory.
+
+    python benchmarks/bench_stats.py --tokens 50000000
+'''
+import argparse
+import collections
+import math
+import random
+import time
+from typing import Callable, Dict, List, Tuple
+
+from ucrel_api.stats import UCREL_Stats
+from ucrel_api.ucrel_doc import UCREL_Columnar_Doc
+from ucrel_api.ucrel_token import UCREL_Token
+from bench_index import POS_TAGS, USAS_TAGS
+
+
+def corpus(number_tokens: int, doc_tokens: int, number_distinct: int,
+           vocab_size: int, seed: int) -> List[UCREL_Columnar_Doc]:
+    '''
+    **returns**: `UCREL_Columnar_Doc`s with `number_tokens` tokens in total,
+    made of copies of `number_distinct` random Docs.
+    '''
+    random.seed(seed)
+    lemmas = [f'lemma{index}' for index in range(vocab_size)]
+    distinct_docs = []
+    for _ in range(number_distinct):
+        tokens = []
+        for _ in range(doc_tokens):
+            lemma = random.choice(lemmas)
+            tokens.append(UCREL_Token(lemma, lemma, random.choice(POS_TAGS),
+                                      random.choice(USAS_TAGS)))
+        distinct_docs.append(UCREL_Columnar_Doc('', tokens))
+    number_docs = number_tokens // doc_tokens
+    return [distinct_docs[doc_index % number_distinct] for doc_index in range(number_docs)]
+
+
+def loop_counts(ucrel_docs: List[UCREL_Columnar_Doc]) -> Dict[str, collections.Counter]:
+    counts = {'lemma': collections.Counter(), 'pos_tag': collections.Counter(),
+              'usas_tag': collections.Counter(), 'crosstab': collections.Counter()}
+    for ucrel_doc in ucrel_docs:
+        for token in ucrel_doc:
+            counts['lemma'][token.lemma] += 1
+            counts['pos_tag'][token.pos_tag] += 1
+            counts['usas_tag'][token.usas_tag] += 1
+            counts['crosstab'][(token.pos_tag, token.usas_tag)] += 1
+    return counts
+
+
+def loop_keyness(counts: collections.Counter,
+                 reference_counts: collections.Counter) -> List[Tuple[str, float]]:
+    size = sum(counts.values())
+    reference_size = sum(reference_counts.values())
+    keyness = []
+    for value in counts.keys() | reference_counts.keys():
+        frequency, reference_frequency = counts[value], reference_counts[value]
+        total_ratio = (frequency + reference_frequency) / (size + reference_size)
+        expected, reference_expected = size * total_ratio, reference_size * total_ratio
+        log_likelihood = 0.0
+        if frequency:
+            log_likelihood += frequency * math.log(frequency / expected)
+        if reference_frequency:
+            log_likelihood += reference_frequency * math.log(reference_frequency / reference_expected)
+        log_likelihood *= 2 if frequency >= expected else -2
+        keyness.append((value, log_likelihood))
+    keyness.sort(key=lambda value_keyness: -abs(value_keyness[1]))
+    return keyness
+
+
+def timed(function: Callable, *args) -> Tuple[object, float]:
+    start = time.perf_counter()
+    value = function(*args)
+    return value, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tokens', type=int, default=50000000)
+    parser.add_argument('--doc-tokens', type=int, default=10000)
+    args = parser.parse_args()
+
+    ucrel_docs = corpus(args.tokens, args.doc_tokens, 10, 20000, 1)
+    reference_docs = corpus(args.tokens // 10, args.doc_tokens, 10, 20000, 2)
+    fields = ('lemma', 'pos_tag', 'usas_tag')
+
+    def vectorised() -> Tuple[Dict[str, Dict[str, int]], List[Tuple[str, float, int, int]], float]:
+        stats = UCREL_Stats(ucrel_docs, fields)
+        reference_stats = UCREL_Stats(reference_docs, fields)
+        start = time.perf_counter()
+        frequencies = {field: stats.frequencies(field) for field in fields}
+        stats.crosstab('pos_tag', 'usas_tag')
+        keyness = stats.keyness(reference_stats, 'lemma')
+        return frequencies, keyness, time.perf_counter() - start
+
+    def loop() -> Tuple[Dict[str, collections.Counter], List[Tuple[str, float]]]:
+        counts = loop_counts(ucrel_docs)
+        reference_counts = loop_counts(reference_docs)
+        return counts, loop_keyness(counts['lemma'], reference_counts['lemma'])
+
+    (frequencies, keyness, counting_time), vectorised_time = timed(vectorised)
+    (counts, loop_keys), loop_time = timed(loop)
+    for field in fields:
+        assert frequencies[field] == counts[field]
+    loop_keyness_values = dict(loop_keys)
+    assert all(math.isclose(loop_keyness_values[value], log_likelihood, abs_tol=1e-9)
+               for value, log_likelihood, _, _ in keyness)
+    print(f'{len(ucrel_docs) * args.doc_tokens} tokens, compared to '
+          f'{len(reference_docs) * args.doc_tokens} reference tokens')
+    print(f'UCREL_Stats {vectorised_time:.2f}s, of which {counting_time:.2f}s is counting '
+          f'after the ids are created, Python loops {loop_time:.2f}s ({loop_time / vectorised_time:.0f}x)')
+
+
+if __name__ == '__main__':
+    main()
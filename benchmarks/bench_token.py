@@ -0,0 +1,105 @@
+'''
+Memory per token and construction time of the `__slots__` based
+`UCREL_Token`, with interned tags, compared to the `__dict__` based
+`UCREL_Token` without interned tags that it replaced.
+
+    python benchmarks/bench_token.py --tokens 1000000
+'''
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from typing import Callable, Iterator, Optional, Tuple
+
+from ucrel_api.ucrel_token import UCREL_Token
+from bench_parse import usas_tab_response
+
+TokenValues = Tuple[str, str, str, Optional[str], Optional[str]]
+
+
+class DictToken():
+    '''
+    The `UCREL_Token` before it used `__slots__`.
+    '''
+    def __init__(self, text: str, lemma: Optional[str] = None,
+                 pos_tag: Optional[str] = None,
+                 usas_tag: Optional[str] = None,
+                 mwe_tag: Optional[str] = None) -> None:
+        self.text = text
+        self.lemma = lemma
+        self.pos_tag = pos_tag
+        self.usas_tag = usas_tag
+        self.mwe_tag = mwe_tag
+
+
+def token_values(usas_tab: str) -> Iterator[TokenValues]:
+    '''
+    **returns**: The values of each token in the `usas_tab` response, each
+    value is a new string as it is when parsed from a USAS response.
+    '''
+    for line in usas_tab.split('\n'):
+        fields = line.split('\t')
+        if len(fields) < 3:
+            continue
+        usas_tag, mwe_tag = None, None
+        if len(fields) == 4 and fields[3].strip():
+            usas_tag, _, mwe_tag = fields[3].split()[0].partition('[i')
+        yield fields[0], fields[2], fields[1], usas_tag, mwe_tag or None
+
+
+def dict_tokens(usas_tab: str) -> list:
+    return [DictToken(text, lemma, pos_tag, usas_tag, mwe_tag)
+            for text, lemma, pos_tag, usas_tag, mwe_tag in token_values(usas_tab)]
+
+
+def slotted_tokens(usas_tab: str) -> list:
+    intern = sys.intern
+    return [UCREL_Token(text, lemma, intern(pos_tag),
+                        intern(usas_tag) if usas_tag else None,
+                        intern(mwe_tag) if mwe_tag else None)
+            for text, lemma, pos_tag, usas_tag, mwe_tag in token_values(usas_tab)]
+
+
+def measure(function: Callable, usas_tab: str, repeat: int) -> Tuple[int, float]:
+    '''
+    **returns**: The bytes still allocated after `function(usas_tab)`, which
+    are the tokens and the strings they keep, and the fastest time of
+    `repeat` runs of it in seconds.
+    '''
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function(usas_tab)
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    tokens = function(usas_tab)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tokens
+    return size, min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tokens', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    usas_tab = usas_tab_response(args.tokens)
+    assert [token.__dict__ for token in dict_tokens(usas_tab)] == \
+        [json.loads(token.to_json()) for token in slotted_tokens(usas_tab)]
+    dict_size, dict_time = measure(dict_tokens, usas_tab, args.repeat)
+    slotted_size, slotted_time = measure(slotted_tokens, usas_tab, args.repeat)
+    print(f'{args.tokens} tokens')
+    print(f'__dict__ tokens:               {dict_size / args.tokens:6.1f} bytes per token, '
+          f'created in {dict_time:.3f}s')
+    print(f'__slots__ and interned tokens: {slotted_size / args.tokens:6.1f} bytes per token, '
+          f'created in {slotted_time:.3f}s ({dict_size / slotted_size:.1f}x less memory)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+'''
+Benchmark suite of the `UCREL_API` request throughput against the local
+stand-in USAS server, `parse_usas_tab` parse speed, `UCREL_Doc` memory per
+token, and `UCREL_Doc` JSON round trip time. The results are written as
+JSON so that they can be compared with the results of an earlier run to
+find regressions.
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --output new.json --compare results.json
+'''
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ucrel_api.adaptive import UCREL_Adaptive_Controller
+from ucrel_api.api import UCREL_API, parse_usas_tab
+from ucrel_api.metrics import UCREL_Metrics
+from ucrel_api.ucrel_doc import UCREL_Doc, UCREL_Columnar_Doc
+from usas_stub_server import USASStubServer, usas_tab_response
+
+WORDS = ['the', 'bank', 'is', 'by', 'river', 'New', 'York', 'nice', 'day', 'have',
+         'hope', 'you', 'a', 'of', 'André', '£100', '[note]', 'semantic', 'tagger']
+
+
+def random_text(number_tokens: int, seed: int, sentence_length: int = 20) -> str:
+    '''
+    **returns**: A text of `number_tokens` words and full stops, with a
+    full stop ending each sentence of `sentence_length` tokens.
+    '''
+    rng = random.Random(seed)
+    tokens = []
+    for token_index in range(number_tokens):
+        if token_index % sentence_length == sentence_length - 1:
+            tokens.append('.')
+        else:
+            tokens.append(rng.choice(WORDS))
+    return ' '.join(tokens)
+
+
+def best_time(function: Callable, *args, repeat: int = 3) -> Tuple[object, float]:
+    '''
+    **returns**: The return value of `function(*args)` and the fastest time
+    of `repeat` runs of it in seconds.
+    '''
+    times = []
+    for _ in range(repeat):
+        value = None
+        gc.collect()
+        start = time.perf_counter()
+        value = function(*args)
+        times.append(time.perf_counter() - start)
+    return value, min(times)
+
+
+def allocated(function: Callable, *args) -> Tuple[object, int]:
+    '''
+    **returns**: The return value of `function(*args)` and the number of
+    bytes it allocated that are still in use afterwards.
+    '''
+    gc.collect()
+    tracemalloc.start()
+    value = function(*args)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size
+
+
+def result(name: str, metric: str, value: float, unit: str,
+           higher_is_better: bool) -> Dict[str, object]:
+    return {'name': name, 'metric': metric, 'value': value, 'unit': unit,
+            'higher_is_better': higher_is_better}
+
+
+def throughput_results(args: argparse.Namespace) -> List[Dict[str, object]]:
+    '''
+    Tags `args.texts` texts of `args.text_tokens` tokens with `usas`, with
+    `usas_many` using `args.workers` threads, with `usas_batch`, and with
+    `usas_many` and `usas_batch` adapted by a `UCREL_Adaptive_Controller`
+    of at most `args.workers` requests at once.
+    '''
+    texts = [random_text(args.text_tokens, seed) for seed in range(args.texts)]
+    results = []
+    with USASStubServer(latency=args.latency, usas_tags=args.usas_tags) as server:
+        server_address, port = server.address
+        metrics = UCREL_Metrics()
+        controller = UCREL_Adaptive_Controller(target_latency=args.target_latency,
+                                               initial_concurrency=min(4, args.workers),
+                                               max_concurrency=args.workers)
+        with UCREL_API('bench@example.com', server_address, port,
+                       pool_maxsize=args.workers, metrics=metrics) as api, \
+             UCREL_API('bench@example.com', server_address, port,
+                       pool_maxsize=args.workers, controller=controller) as adaptive_api:
+            api.usas(texts[0])
+            metrics.reset()
+            runs = [('usas', lambda: [api.usas(text) for text in texts]),
+                    ('usas_many', lambda: list(api.usas_many(texts, workers=args.workers))),
+                    ('usas_batch', lambda: api.usas_batch(texts)),
+                    ('adaptive_usas_many', lambda: list(adaptive_api.usas_many(texts))),
+                    ('adaptive_usas_batch', lambda: adaptive_api.usas_batch(texts))]
+            for name, run in runs:
+                request_count = server.request_count
+                ucrel_docs, seconds = best_time(run, repeat=1)
+                assert not any(isinstance(ucrel_doc, Exception) for ucrel_doc in ucrel_docs)
+                number_tokens = sum(map(len, ucrel_docs))
+                results.append(result(f'throughput.{name}', 'texts_per_second',
+                                      len(texts) / seconds, 'texts/s', True))
+                results.append(result(f'throughput.{name}', 'tokens_per_second',
+                                      number_tokens / seconds, 'tokens/s', True))
+                results.append(result(f'throughput.{name}', 'requests',
+                                      server.request_count - request_count, 'requests', False))
+                if name == 'usas':
+                    # Where the time of each sequential request went.
+                    snapshot = metrics.snapshot()
+                    for timer in UCREL_Metrics.TIMERS:
+                        results.append(result(f'throughput.{name}', f'{timer}_seconds_per_request',
+                                              snapshot[f'{timer}_seconds'] / len(texts),
+                                              's', False))
+                    results.append(result(f'throughput.{name}', 'bytes_received_per_token',
+                                          snapshot['bytes_received'] / number_tokens,
+                                          'bytes', False))
+    return results
+
+
+def parse_results(usas_tab: str, number_tokens: int, repeat: int) -> List[Dict[str, object]]:
+    _, seconds = best_time(parse_usas_tab, usas_tab, repeat=repeat)
+    return [result('parse.parse_usas_tab', 'tokens_per_second', number_tokens / seconds,
+                   'tokens/s', True),
+            result('parse.parse_usas_tab', 'megabytes_per_second',
+                   len(usas_tab.encode('utf-8')) / 1024 ** 2 / seconds, 'MB/s', True)]
+
+
+def memory_results(usas_tab: str, number_tokens: int) -> List[Dict[str, object]]:
+    ucrel_doc, doc_size = allocated(parse_usas_tab, usas_tab)
+    _, columnar_size = allocated(UCREL_Columnar_Doc.from_doc, ucrel_doc)
+    return [result('memory.UCREL_Doc', 'bytes_per_token', doc_size / number_tokens,
+                   'bytes', False),
+            result('memory.UCREL_Columnar_Doc', 'bytes_per_token',
+                   columnar_size / number_tokens, 'bytes', False)]
+
+
+def json_results(usas_tab: str, number_tokens: int, repeat: int) -> List[Dict[str, object]]:
+    ucrel_doc = parse_usas_tab(usas_tab)
+    json_string, to_json_seconds = best_time(ucrel_doc.to_json, repeat=repeat)
+    json_doc, from_json_seconds = best_time(UCREL_Doc.from_json, json_string, repeat=repeat)
+    assert json_doc == ucrel_doc
+    return [result('json.to_json', 'tokens_per_second', number_tokens / to_json_seconds,
+                   'tokens/s', True),
+            result('json.from_json', 'tokens_per_second', number_tokens / from_json_seconds,
+                   'tokens/s', True),
+            result('json.round_trip', 'seconds_per_million_tokens',
+                   (to_json_seconds + from_json_seconds) * 1000000 / number_tokens, 's', False)]
+
+
+def git_commit() -> Optional[str]:
+    '''
+    **returns**: The commit of the working directory, if it is a git
+    repository.
+    '''
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, object]], previous: List[Dict[str, object]],
+            tolerance: float) -> int:
+    '''
+    Prints the change of each result compared to the same result in the
+    `previous` results.
+
+    **returns**: The number of results that are worse than the previous
+    result by more than the `tolerance`, a fraction of the previous result.
+    '''
+    previous_values = {(item['name'], item['metric']): item['value'] for item in previous}
+    regressions = 0
+    for item in results:
+        previous_value = previous_values.get((item['name'], item['metric']))
+        if not previous_value:
+            continue
+        change = (item['value'] - previous_value) / previous_value
+        worse = -change if item['higher_is_better'] else change
+        flag = ''
+        if worse > tolerance:
+            regressions += 1
+            flag = '  REGRESSION'
+        print(f'{item["name"]:32} {item["metric"]:34} {previous_value:14.4g} -> '
+              f'{item["value"]:14.4g} {change:+8.1%}{flag}')
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help='JSON file to write the results to.')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare to.')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Fraction a result can be worse than the earlier '
+                             'result before it is a regression.')
+    parser.add_argument('--texts', type=int, default=200,
+                        help='The number of texts tagged by the throughput benchmarks.')
+    parser.add_argument('--text-tokens', type=int, default=100,
+                        help='The number of tokens in each text.')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.005,
+                        help='Seconds the stand-in server sleeps before each response.')
+    parser.add_argument('--target-latency', type=float, default=0.1,
+                        help='Seconds each request should take for the adaptive benchmarks.')
+    parser.add_argument('--usas-tags', type=int, default=5,
+                        help='The number of candidate USAS tags the stand-in server '
+                             'gives each token.')
+    parser.add_argument('--tokens', type=int, default=200000,
+                        help='The number of tokens of the parse, memory and JSON benchmarks.')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    usas_tab = usas_tab_response(UCREL_API._sgml_entity_escape(random_text(args.tokens, 0)),
+                                 args.usas_tags)
+    number_tokens = len(parse_usas_tab(usas_tab))
+    results = throughput_results(args)
+    results.extend(parse_results(usas_tab, number_tokens, args.repeat))
+    results.extend(memory_results(usas_tab, number_tokens))
+    results.extend(json_results(usas_tab, number_tokens, args.repeat))
+
+    for item in results:
+        print(f'{item["name"]:32} {item["metric"]:34} {item["value"]:14.4g} {item["unit"]}')
+    report = {'metadata': {'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                           'git_commit': git_commit(),
+                           'python': sys.version.split()[0],
+                           'implementation': platform.python_implementation(),
+                           'platform': platform.platform(),
+                           'cpu_count': os.cpu_count(),
+                           'arguments': {name: value for name, value in vars(args).items()
+                                         if name not in ('output', 'compare')}},
+              'results': results}
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f'Results written to {args.output}')
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as previous_file:
+            previous = json.load(previous_file)
+        print(f'\nCompared to {args.compare}:')
+        if previous['metadata']['arguments'] != report['metadata']['arguments']:
+            print('Warning: the earlier run used different arguments, '
+                  f'{previous["metadata"]["arguments"]}')
+        regressions = compare(results, previous['results'], args.tolerance)
+        if regressions:
+            print(f'{regressions} regressions of more than {args.tolerance:.0%}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+'''
+A local stand-in for the `/cgi-bin/usas.pl` endpoint of the UCREL Tool Chain.
+
+The server splits the posted text into words and `.`, `!` or `?`
+punctuation tokens and returns each token in the USAS `tab` style, a new
+`<s>` sentence is started after every punctuation token. The tags are fake but the format is the
+same as the real server so that the client can be benchmarked without
+calling the public UCREL Tool Chain. The size of the response per token
+is set by the number of candidate USAS tags given to each token, the real
+server gives up to about ten.
+
+Run on its own:
+
+    python benchmarks/usas_stub_server.py --port 8070 --latency 0.01 --usas-tags 5
+'''
+import argparse
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import re
+import time
+from typing import Dict, Tuple
+import zlib
+
+USAS_ENDPOINT = '/cgi-bin/usas.pl'
+TOKEN_PATTERN = re.compile(r'[^\s.!?]+|[.!?]')
+POS_TAGS = ['NN1', 'NN2', 'JJ', 'VV0', 'VVD', 'AT', 'AT1', 'II', 'RR', 'PPY', 'NP1', 'CC']
+USAS_TAGS = ['Z99', 'A1.1.1', 'A11.1+', 'A5.1+', 'E4.1+', 'E4.1-', 'E4.2+', 'I1.1', 'I2.1',
+             'N5+', 'S2mf', 'T1.3', 'Z5', 'Z8', 'X2.1', 'M1', 'Q2.2']
+
+
+def usas_tab_response(text: str, usas_tags: int = 2) -> str:
+    '''
+    1. **text**: SGML escaped text.
+    2. **usas_tags**: The number of candidate USAS tags of each token.
+
+    **returns**: A fake USAS `tab` style response for the given text, the
+    same word is always given the same tags.
+    '''
+    lines = ['', '<s>']
+    for token in TOKEN_PATTERN.findall(text):
+        if token in ('.', '!', '?'):
+            lines.append(f'{token}\t{token}\tPUNC\t')
+            lines.append('</s>')
+            lines.append('<s>')
+        else:
+            lemma = token.lower()
+            tag_index = zlib.crc32(lemma.encode('utf-8'))
+            pos_tag = POS_TAGS[tag_index % len(POS_TAGS)]
+            tags = ' '.join(USAS_TAGS[(tag_index + tag_number) % len(USAS_TAGS)]
+                            for tag_number in range(usas_tags))
+            lines.append(f'{token}\t{pos_tag}\t{lemma}\t{tags} ')
+    if lines[-1] == '<s>':
+        lines.pop()
+    else:
+        lines.append('</s>')
+    return '\n'.join(lines) + '\n'
+
+
+def _form_data(body: bytes) -> Dict[str, str]:
+    '''
+    **returns**: The `name: value` pairs of a multipart form data body. The
+    boundary is read from the body as `UCREL_API` sends the multipart body
+    with a `text/plain` content type header.
+    '''
+    boundary = body.split(b'\r\n', 1)[0][2:].decode('ascii')
+    content_type = f'multipart/form-data; boundary="{boundary}"'
+    header = f'Content-Type: {content_type}\r\n\r\n'.encode('utf-8')
+    message = BytesParser(policy=HTTP).parsebytes(header + body)
+    form_data = {}
+    for part in message.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        form_data[name] = part.get_payload(decode=True).decode('utf-8')
+    return form_data
+
+
+class _USASStubHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        if self.path != USAS_ENDPOINT:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        form_data = _form_data(body)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        response = usas_tab_response(form_data.get('text', ''),
+                                     self.server.usas_tags).encode('utf-8')
+        self.server.request_count += 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class USASStubServer(ThreadingHTTPServer):
+    '''
+    Threaded HTTP server that answers USAS requests with
+    `usas_tab_response`. Connections are kept alive (HTTP/1.1).
+    '''
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, usas_tags: int = 2) -> None:
+        '''
+        1. **host**: Host to bind to.
+        2. **port**: Port to bind to, `0` picks a free port.
+        3. **latency**: Seconds to sleep before answering each request.
+        4. **usas_tags**: The number of candidate USAS tags of each token.
+        '''
+        super().__init__((host, port), _USASStubHandler)
+        self.latency = latency
+        self.usas_tags = usas_tags
+        self.request_count = 0
+
+    @property
+    def address(self) -> Tuple[str, str]:
+        '''
+        **returns**: The `(server_address, port)` to give to `UCREL_API`.
+        '''
+        host, port = self.server_address[:2]
+        return f'http://{host}', str(port)
+
+    def __enter__(self) -> 'USASStubServer':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8070)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds to sleep before answering each request.')
+    parser.add_argument('--usas-tags', type=int, default=2,
+                        help='The number of candidate USAS tags of each token.')
+    args = parser.parse_args()
+    server = USASStubServer(args.host, args.port, args.latency, args.usas_tags)
+    print(f'Serving USAS stub on http://{args.host}:{args.port}{USAS_ENDPOINT}')
+    server.serve_forever()
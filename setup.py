@@ -26,6 +26,7 @@ py_versions = '2.0 2.1 2.2 2.3 2.4 2.5 2.6 2.7 3.0 3.1 3.2 3.3 3.4 3.5 3.6 3.7 3
 
 requirements = cfg.get('requirements','').split()
 dev_requirements = cfg.get('dev_requirements','').split()
+console_scripts = cfg.get('console_scripts','').split()
 min_python = cfg['min_python']
 lic = licenses.get(cfg['license'].lower(), (cfg['license'], None))
 
@@ -42,6 +43,7 @@ setuptools.setup(
     include_package_data = True,
     install_requires = requirements,
     extras_require={'dev': dev_requirements},
+    entry_points = {'console_scripts': console_scripts},
     python_requires  = '>=' + cfg['min_python'],
     long_description = open('README.md').read(),
     long_description_content_type = 'text/markdown',
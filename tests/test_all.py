@@ -5,6 +5,15 @@ def test_all_modules() -> None:
     nbdev.test.test_nb('./module_notebooks/00_api.ipynb')
     nbdev.test.test_nb('./module_notebooks/01_ucrel_token.ipynb')
     nbdev.test.test_nb('./module_notebooks/02_ucrel_doc.ipynb')
+    nbdev.test.test_nb('./module_notebooks/03_async_api.ipynb')
+    nbdev.test.test_nb('./module_notebooks/04_cache.ipynb')
+    nbdev.test.test_nb('./module_notebooks/05_corpus.ipynb')
+    nbdev.test.test_nb('./module_notebooks/06_arrow.ipynb')
+    nbdev.test.test_nb('./module_notebooks/07_index.ipynb')
+    nbdev.test.test_nb('./module_notebooks/08_stats.ipynb')
+    nbdev.test.test_nb('./module_notebooks/09_metrics.ipynb')
+    nbdev.test.test_nb('./module_notebooks/10_pipeline.ipynb')
+    nbdev.test.test_nb('./module_notebooks/11_adaptive.ipynb')
 
 #a = nbdev.export.read_nb('./module_notebooks/api.ipynb')
 #import re
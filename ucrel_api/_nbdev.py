@@ -3,12 +3,42 @@
 __all__ = ["index", "modules", "custom_doc_links", "git_url"]
 
 index = {"UCREL_API": "00_api.ipynb",
+         "parse_usas_tab": "00_api.ipynb",
          "UCREL_Token": "01_ucrel_token.ipynb",
-         "UCREL_Doc": "02_ucrel_doc.ipynb"}
+         "UCREL_Doc": "02_ucrel_doc.ipynb",
+         "UCREL_Columnar_Doc": "02_ucrel_doc.ipynb",
+         "AsyncUCREL_API": "03_async_api.ipynb",
+         "UCREL_Disk_Cache": "04_cache.ipynb",
+         "UCREL_Memory_Cache": "04_cache.ipynb",
+         "UCREL_Corpus": "05_corpus.ipynb",
+         "TOKEN_COLUMNS": "06_arrow.ipynb",
+         "to_arrow": "06_arrow.ipynb",
+         "from_arrow": "06_arrow.ipynb",
+         "write_arrow": "06_arrow.ipynb",
+         "read_arrow": "06_arrow.ipynb",
+         "write_parquet": "06_arrow.ipynb",
+         "read_parquet": "06_arrow.ipynb",
+         "UCREL_Index": "07_index.ipynb",
+         "UCREL_Stats": "08_stats.ipynb",
+         "UCREL_Metrics": "09_metrics.ipynb",
+         "read_documents": "10_pipeline.ipynb",
+         "UCREL_Pipeline": "10_pipeline.ipynb",
+         "main": "10_pipeline.ipynb",
+         "UCREL_Rate_Limiter": "11_adaptive.ipynb",
+         "UCREL_Adaptive_Controller": "11_adaptive.ipynb"}
 
 modules = ["api.py",
            "ucrel_token.py",
-           "ucrel_doc.py"]
+           "ucrel_doc.py",
+           "async_api.py",
+           "cache.py",
+           "corpus.py",
+           "arrow.py",
+           "index.py",
+           "stats.py",
+           "metrics.py",
+           "pipeline.py",
+           "adaptive.py"]
 
 doc_url = "https://UCREL.github.io/ucrel-python-api/"
 
@@ -0,0 +1,368 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: module_notebooks/11_adaptive.ipynb (unless otherwise specified).
+
+__all__ = ['UCREL_Rate_Limiter', 'UCREL_Adaptive_Controller']
+
+# Cell
+
+import threading
+import time
+from typing import Dict, Optional, Union
+
+class UCREL_Rate_Limiter():
+    '''
+    A [token bucket](https://en.wikipedia.org/wiki/Token_bucket) rate
+    limiter that can be shared by many threads. The bucket holds at most
+    `burst` tokens and is refilled at `rate` tokens per second, each
+    request takes one token and waits for it if the bucket is empty.
+    '''
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        '''
+        1. **rate**: The number of tokens, requests, added per second.
+        2. **burst**: The most tokens the bucket can hold, the number of
+        requests that can be made at once after a pause. By default
+        `rate`, or 1 if `rate` is less than 1.
+
+        **raises ValueError**: If `rate` is not positive.
+        '''
+        if rate <= 0:
+            raise ValueError(f'`rate` has to be more than 0 and not {rate}')
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self._tokens = self.burst
+        self._last_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        '''
+        Takes `tokens` from the bucket, waiting until the bucket has been
+        refilled if there are not enough. Tokens are reserved in the order
+        `acquire` is called.
+
+        1. **tokens**: The number of tokens to take.
+
+        **returns**: The number of seconds waited.
+        '''
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last_time) * self.rate)
+            self._last_time = now
+            self._tokens -= tokens
+            wait_seconds = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait_seconds:
+            time.sleep(wait_seconds)
+        return wait_seconds
+
+    def __getstate__(self) -> dict:
+        '''
+        **returns**: The state of this instance without its lock.
+        '''
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        '''
+        1. **state**: State returned by `__getstate__`.
+        '''
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        '''
+        String representation of the UCREL Rate Limiter instance, format:
+
+        UCREL Rate Limiter, {self.rate} requests per second, burst {self.burst}
+        '''
+        return f'UCREL Rate Limiter, {self.rate} requests per second, burst {self.burst}'
+
+# Cell
+
+class UCREL_Adaptive_Controller():
+    '''
+    Adapts the size of the requests, and how many are made at once, to
+    what the server can sustain. Given to a `UCREL_API` through its
+    `controller` argument, which then reports the latency and errors of
+    each request to the controller.
+
+    * **Request size**: The latency of a request is modelled as a fixed
+    overhead plus a time per character, fitted to the recent requests.
+    `chunk_chars` is the number of characters that are expected to take
+    `target_latency` seconds, which `UCREL_API.usas_chunked` and
+    `UCREL_API.usas_batch` use when they are not given `max_chars`.
+    * **Concurrency**: Additive increase, multiplicative decrease
+    ([AIMD](https://en.wikipedia.org/wiki/Additive_increase/multiplicative_decrease)),
+    `concurrency` increases by about one for each round of requests that
+    take less than `target_latency`, and is halved when a request is
+    slower than `target_latency`, fails, or the server returns a 5xx or
+    429 status code.
+    * **Load shedding**: When a request fails, or the server returns a
+    5xx or 429 status code, requests are rate limited, see
+    `UCREL_Rate_Limiter`, to half of the recent request rate. The rate
+    increases by about one request per second every second whilst
+    requests succeed, and the limit is removed once it is more than
+    `max_concurrency` requests could make.
+
+    An instance can be shared by many threads and `UCREL_API`s, e.g. all
+    of the `UCREL_API`s that call the same server.
+    '''
+    def __init__(self, target_latency: float = 10.0, initial_chars: int = 20000,
+                 min_chars: int = 1000, max_chars: int = 100000,
+                 initial_concurrency: int = 4, min_concurrency: int = 1,
+                 max_concurrency: int = 16, min_rate: float = 0.1,
+                 smoothing: float = 0.2) -> None:
+        '''
+        1. **target_latency**: The number of seconds each request should take,
+        should be less than the `UCREL_API` `timeout`.
+        2. **initial_chars**: The `chunk_chars` before any request has been made.
+        3. **min_chars**: The smallest `chunk_chars`.
+        4. **max_chars**: The largest `chunk_chars`.
+        5. **initial_concurrency**: The `concurrency` before any request has been made.
+        6. **min_concurrency**: The smallest `concurrency`.
+        7. **max_concurrency**: The largest `concurrency`. The `UCREL_API`
+        `pool_maxsize` should be at least this large.
+        8. **min_rate**: The lowest rate, requests per second, that requests
+        are limited to when shedding load.
+        9. **smoothing**: The weight, between 0 and 1, of each new request
+        in the latency model, larger adapts faster.
+
+        **raises ValueError**: If the minimum, initial, and maximum chars or
+        concurrency are not in order, or `smoothing` is not between 0 and 1.
+        '''
+        if not 0 < min_chars <= initial_chars <= max_chars:
+            raise ValueError('`min_chars`, `initial_chars`, and `max_chars` have to be '
+                             f'in order and positive, not {min_chars}, {initial_chars}, {max_chars}')
+        if not 0 < min_concurrency <= initial_concurrency <= max_concurrency:
+            raise ValueError('`min_concurrency`, `initial_concurrency`, and `max_concurrency` '
+                             'have to be in order and positive, not '
+                             f'{min_concurrency}, {initial_concurrency}, {max_concurrency}')
+        if not 0 < smoothing <= 1:
+            raise ValueError(f'`smoothing` has to be between 0 and 1 and not {smoothing}')
+        self.target_latency = target_latency
+        self.initial_chars = initial_chars
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.min_rate = min_rate
+        self.smoothing = smoothing
+        self.rate_limiter: Optional[UCREL_Rate_Limiter] = None
+
+        self._condition = threading.Condition()
+        self._concurrency = float(initial_concurrency)
+        self._in_flight = 0
+        # Requests that started before the last decrease do not decrease
+        # again, so that one slow period only halves the concurrency once.
+        self._last_decrease = 0.0
+        self._requests = 0
+        self._errors = 0
+        # Exponentially weighted means of the characters, latency, their
+        # product and the characters squared, of the requests, for a least
+        # squares fit of latency = overhead + seconds per char * chars.
+        self._mean_chars = 0.0
+        self._mean_seconds = 0.0
+        self._mean_chars_seconds = 0.0
+        self._mean_chars_squared = 0.0
+
+    @property
+    def concurrency(self) -> int:
+        '''
+        **returns**: The number of requests that can be made at once.
+        '''
+        return int(self._concurrency)
+
+    def acquire(self) -> float:
+        '''
+        Waits until a request can be made, until a rate limited request is
+        allowed and fewer than `concurrency` requests are being made. Every
+        `acquire` has to be followed by a `release`.
+
+        **returns**: The `time.monotonic` time the request was allowed, to
+        give to `record_success` or `record_error`.
+        '''
+        rate_limiter = self.rate_limiter
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        with self._condition:
+            while self._in_flight >= int(self._concurrency):
+                self._condition.wait()
+            self._in_flight += 1
+        return time.monotonic()
+
+    def release(self) -> None:
+        '''
+        Records that a request, allowed by `acquire`, has finished.
+        '''
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def _observe(self, chars: int, seconds: float) -> None:
+        '''
+        Adds a request of `chars` characters that took `seconds` to the
+        latency model.
+        '''
+        if not self._requests:
+            self._mean_chars, self._mean_seconds = chars, seconds
+            self._mean_chars_seconds, self._mean_chars_squared = chars * seconds, chars * chars
+            return
+        weight = self.smoothing
+        self._mean_chars += weight * (chars - self._mean_chars)
+        self._mean_seconds += weight * (seconds - self._mean_seconds)
+        self._mean_chars_seconds += weight * (chars * seconds - self._mean_chars_seconds)
+        self._mean_chars_squared += weight * (chars * chars - self._mean_chars_squared)
+
+    def _latency_model(self) -> Optional[Dict[str, float]]:
+        '''
+        **returns**: The `overhead_seconds` and `seconds_per_char` of the
+        latency model, or `None` before any request has been recorded.
+        '''
+        if not self._requests or self._mean_chars <= 0:
+            return None
+        chars_variance = self._mean_chars_squared - self._mean_chars ** 2
+        seconds_per_char = 0.0
+        # Only fit the overhead when the requests are of different sizes.
+        if chars_variance > (0.01 * self._mean_chars) ** 2:
+            covariance = self._mean_chars_seconds - self._mean_chars * self._mean_seconds
+            seconds_per_char = covariance / chars_variance
+        overhead_seconds = self._mean_seconds - seconds_per_char * self._mean_chars
+        if seconds_per_char <= 0 or overhead_seconds < 0:
+            seconds_per_char = self._mean_seconds / self._mean_chars
+            overhead_seconds = 0.0
+        return {'overhead_seconds': overhead_seconds, 'seconds_per_char': seconds_per_char}
+
+    def chunk_chars(self) -> int:
+        '''
+        **returns**: The number of characters a request should have to take
+        `target_latency` seconds, between `min_chars` and `max_chars`.
+        '''
+        with self._condition:
+            latency_model = self._latency_model()
+        if latency_model is None:
+            return self.initial_chars
+        if latency_model['seconds_per_char'] <= 0:
+            return self.max_chars
+        chars = ((self.target_latency - latency_model['overhead_seconds']) /
+                 latency_model['seconds_per_char'])
+        return int(min(self.max_chars, max(self.min_chars, chars)))
+
+    def _decrease(self, start: float, shed_load: bool) -> None:
+        '''
+        Halves the `concurrency`, and if `shed_load` halves the rate limit,
+        unless they have already been decreased since the request started.
+        Has to be called with the lock held.
+        '''
+        if start <= self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        concurrency = self._concurrency
+        self._concurrency = max(float(self.min_concurrency), concurrency / 2)
+        if not shed_load:
+            return
+        if self.rate_limiter is not None:
+            rate = self.rate_limiter.rate / 2
+        elif self._mean_seconds > 0:
+            # Half of the recent request rate
+            rate = concurrency / self._mean_seconds / 2
+        else:
+            rate = concurrency / self.target_latency / 2
+        rate = max(self.min_rate, rate)
+        self.rate_limiter = UCREL_Rate_Limiter(rate, burst=1.0)
+
+    def record_success(self, start: float, chars: int, retries: int = 0) -> None:
+        '''
+        Records a request that returned a response.
+
+        1. **start**: The time returned by `acquire` for the request.
+        2. **chars**: The number of characters of text sent.
+        3. **retries**: The number of times the request was retried, a
+        retried request is treated as an error as the server is overloaded.
+        '''
+        seconds = time.monotonic() - start
+        with self._condition:
+            self._observe(chars, seconds)
+            self._requests += 1
+            if retries:
+                self._errors += 1
+                self._decrease(start, shed_load=True)
+            elif seconds > self.target_latency:
+                self._decrease(start, shed_load=False)
+            else:
+                self._concurrency = min(float(self.max_concurrency),
+                                        self._concurrency + 1 / self._concurrency)
+                self._condition.notify_all()
+                rate_limiter = self.rate_limiter
+                if rate_limiter is not None:
+                    rate = rate_limiter.rate + 1 / rate_limiter.rate
+                    if self._mean_seconds > 0 and rate > self.max_concurrency / self._mean_seconds:
+                        self.rate_limiter = None
+                    else:
+                        rate_limiter.rate = rate
+
+    def record_error(self, start: float, chars: int, status_code: Optional[int] = None,
+                     timeout: bool = False) -> None:
+        '''
+        Records a request that failed, or returned an error status code.
+        Only server errors, 5xx and 429 status codes, and failed requests,
+        e.g. connection errors and timeouts, shed load.
+
+        1. **start**: The time returned by `acquire` for the request.
+        2. **chars**: The number of characters of text sent.
+        3. **status_code**: The status code of the response, `None` if the
+        request failed without a response. **Optional**
+        4. **timeout**: Whether the request timed out, the time it took is
+        added to the latency model so that the requests become smaller.
+        '''
+        seconds = time.monotonic() - start
+        if status_code is not None and status_code < 500 and status_code != 429:
+            return
+        with self._condition:
+            if timeout:
+                self._observe(chars, seconds)
+                self._requests += 1
+            self._errors += 1
+            self._decrease(start, shed_load=True)
+
+    def snapshot(self) -> Dict[str, Union[int, float, None]]:
+        '''
+        **returns**: The current `concurrency`, number of requests
+        `in_flight`, `chunk_chars`, `rate` limit (`None` if not rate
+        limited), the latency model `overhead_seconds` and
+        `seconds_per_char`, and the number of `requests` and `errors`
+        recorded.
+        '''
+        chunk_chars = self.chunk_chars()
+        with self._condition:
+            latency_model = self._latency_model() or {'overhead_seconds': None,
+                                                      'seconds_per_char': None}
+            rate_limiter = self.rate_limiter
+            return {'concurrency': self.concurrency, 'in_flight': self._in_flight,
+                    'chunk_chars': chunk_chars,
+                    'rate': rate_limiter.rate if rate_limiter is not None else None,
+                    **latency_model, 'requests': self._requests, 'errors': self._errors}
+
+    def __getstate__(self) -> dict:
+        '''
+        **returns**: The state of this instance without its lock, so that a
+        `UCREL_API` with a controller can be used by a process pool. Each
+        process adapts its own copy, with no requests in flight.
+        '''
+        state = self.__dict__.copy()
+        del state['_condition']
+        state['_in_flight'] = 0
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        '''
+        1. **state**: State returned by `__getstate__`.
+        '''
+        self.__dict__.update(state)
+        self._condition = threading.Condition()
+
+    def __repr__(self) -> str:
+        '''
+        String representation of the UCREL Adaptive Controller instance, format:
+
+        UCREL Adaptive Controller, target latency {self.target_latency} seconds, concurrency {self.concurrency}, chunk chars {self.chunk_chars()}
+        '''
+        return (f'UCREL Adaptive Controller, target latency {self.target_latency} seconds, '
+                f'concurrency {self.concurrency}, chunk chars {self.chunk_chars()}')
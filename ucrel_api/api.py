@@ -1,17 +1,70 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: module_notebooks/00_api.ipynb (unless otherwise specified).
 
-__all__ = ['UCREL_API']
+__all__ = ['UCREL_API', 'parse_usas_tab']
 
 # Cell
 
+import collections
+import contextlib
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor
 import functools
-from typing import Optional, List, Tuple
+import html.entities
+from typing import Optional, List, Tuple, Iterable, Iterator, Union, Deque, Dict
 import re
+import sys
+import time
 from xml.sax import saxutils
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from .ucrel_doc import UCREL_Doc, UCREL_Token
+from .adaptive import UCREL_Adaptive_Controller
+from .cache import UCREL_Disk_Cache, UCREL_Memory_Cache
+from .metrics import UCREL_Metrics
+from .ucrel_doc import UCREL_Doc, UCREL_Token, _MWE_Grouper
+
+# Chunk boundaries used by `UCREL_API.split_text`
+_PARAGRAPH_BOUNDARY = re.compile(r'\n[^\S\n]*\n\s*')
+_SENTENCE_BOUNDARY = re.compile(r'[.!?]\s+')
+_WHITESPACE_BOUNDARY = re.compile(r'\s+')
+# `str.isascii` was added in Python 3.7, before then all texts are treated
+# as not ASCII which is slower but gives the same result.
+_is_ascii = getattr(str, 'isascii', lambda text: False)
+
+def _ucrel_url(server_address: str, port: str, endpoint: str) -> str:
+    '''
+    Used by both `UCREL_API` and `AsyncUCREL_API`.
+
+    1. **server_address**: The address of the UCREL Tool Chain server.
+    2. **port**: The port to the server, an empty string if it is not required.
+    3. **endpoint**: An endpoint of the UCREL Tool Chain server.
+
+    **returns**: The URL of the `endpoint`.
+    '''
+    if port:
+        return f'{server_address}:{port}{endpoint}'
+    return f'{server_address}{endpoint}'
+
+def _ucrel_form_data(email: str, escaped_text: str, **data_kwargs) -> Dict[str, str]:
+    '''
+    Used by both `UCREL_API` and `AsyncUCREL_API`.
+
+    1. **email**: Email address of the user.
+    2. **escaped_text**: The SGML entity escaped text to be processed by
+    the UCREL Tool Chain, see `UCREL_API._sgml_entity_escape`.
+    3. **data_kwargs**: Optional, additional `key: value` data to
+    be sent with the multipart form data.
+
+    **returns**: The multipart form data of a POST request to the
+    UCREL Tool Chain server.
+    '''
+    # Type here refers to the fact we want to use the REST API
+    # Style refers to the output type, in this case we use verticical
+    # as the verticial format returns the most output e.g. all possible tags
+    # and split into sentences.
+    return {'type': 'rest', 'email': email,
+            **data_kwargs, 'style': 'tab',  'text': escaped_text}
 
 class UCREL_API():
 
@@ -19,13 +72,35 @@ class UCREL_API():
                           'é': '&eacute;', '<': '&lt;',
                           '>': '&gt;', '[': '&lsqb;',
                           ']': '&rsqb;'}
+    # The rest of the ISO Latin-1 characters, e.g. `ö` is `&ouml;`
+    SGML_ENTITY_MAPPER.update((chr(code_point), f'&{name};')
+                              for code_point, name in html.entities.codepoint2name.items()
+                              if 0xA0 <= code_point <= 0xFF)
     REVERSE_SGML_ENTITY_MAPPER = {v: k for k, v in SGML_ENTITY_MAPPER.items()}
+    REVERSE_SGML_ENTITY_MAPPER['&amp;'] = '&'
+    _SGML_UN_ESCAPE_PATTERN = re.compile('|'.join(map(re.escape, REVERSE_SGML_ENTITY_MAPPER)))
+    # The ASCII characters are escaped with `str.replace`, which is faster
+    # than a pattern when they are rare, the others with one pattern.
+    _SGML_ASCII_ENTITIES = [(entity, escaped_entity)
+                            for entity, escaped_entity in SGML_ENTITY_MAPPER.items()
+                            if ord(entity) < 128]
+    _SGML_ESCAPE_PATTERN = re.compile('[' + ''.join(re.escape(entity) for entity in SGML_ENTITY_MAPPER
+                                                    if ord(entity) >= 128) + ']')
+    USAS_ENDPOINT = '/cgi-bin/usas.pl'
+    # Token that separates the texts packed into one request by `usas_batch`
+    BATCH_SEPARATOR = 'UCRELAPIDOCUMENTSEPARATOR'
+    REQUEST_HEADERS = {'Accept':'text/plain; charset=utf-8',
+                       'Content-Type': 'text/plain; charset=utf-8'}
+    # Number of bytes read at a time from a streamed response
+    STREAM_CHUNK_SIZE = 8192
 
     @classmethod
     def _sgml_entity_escape(cls, text: str) -> str:
         '''
         The SGML entities that are escaped are those found in
-        the [CLAWS input/output format guidelines.](http://ucrel.lancs.ac.uk/claws/format.html)
+        the [CLAWS input/output format guidelines,](http://ucrel.lancs.ac.uk/claws/format.html)
+        `&`, `<`, `>`, `[`, `]`, and the ISO Latin-1 characters e.g. `£`
+        is escaped to `&pound;`.
 
         1. **text**: Text to escape
 
@@ -35,33 +110,49 @@ class UCREL_API():
         # entities
         if '&' in text:
             text = text.replace('&', '&amp;')
-        for entity, escaped_entity in cls.SGML_ENTITY_MAPPER.items():
+        for entity, escaped_entity in cls._SGML_ASCII_ENTITIES:
             if entity in text:
                 text = text.replace(entity, escaped_entity)
+        if not _is_ascii(text):
+            entity_mapper = cls.SGML_ENTITY_MAPPER
+            text = cls._SGML_ESCAPE_PATTERN.sub(lambda match: entity_mapper[match.group()], text)
         return text
 
     @classmethod
     def _sgml_entity_un_escape(cls, text: str) -> str:
         '''
         The SGML entities that are un-escaped are those found in
-        the [CLAWS input/output format guidelines.](http://ucrel.lancs.ac.uk/claws/format.html)
+        the [CLAWS input/output format guidelines,](http://ucrel.lancs.ac.uk/claws/format.html)
+        the reverse of `_sgml_entity_escape`. Other entities are left as
+        they are.
 
         1. **text**: Text to un-escape
 
         **returns** The text un-escaped from SGML entities
         '''
-        if '&amp;' in text:
-            text = text.replace('&amp;', '&')
-        for escaped_entity, entity in cls.REVERSE_SGML_ENTITY_MAPPER.items():
-            if escaped_entity in text:
-                text = text.replace(escaped_entity, entity)
-        return text
+        if '&' not in text:
+            return text
+        entity_mapper = cls.REVERSE_SGML_ENTITY_MAPPER
+        return cls._SGML_UN_ESCAPE_PATTERN.sub(lambda match: entity_mapper[match.group()], text)
 
     def __init__(self, email: str, server_address: str,
-                 port: str = '', timeout: int = 60) -> None:
+                 port: str = '', timeout: int = 60,
+                 pool_connections: int = 10, pool_maxsize: int = 10,
+                 max_retries: int = 0, backoff_factor: float = 0.0,
+                 retry_status_codes: Tuple[int, ...] = (500, 502, 503, 504),
+                 cache: Optional[UCREL_Disk_Cache] = None,
+                 memory_cache: Optional[UCREL_Memory_Cache] = None,
+                 metrics: Optional[UCREL_Metrics] = None,
+                 controller: Optional[UCREL_Adaptive_Controller] = None) -> None:
         '''
         Creates a UCREL API instance that is used to call the UCREL Tool chain.
 
+        All requests made by the instance go through one
+        [`requests.Session`](https://requests.readthedocs.io/en/latest/user/advanced/#session-objects)
+        so that the TCP (and TLS) connections to the server are pooled and
+        kept alive between calls. Call `close` (or use the instance as a
+        context manager) to release the pooled connections.
+
         1. **email**: Email address of the user. This is used to identify the user
         calling the UCREL Tool Chain API.
         2. **server_address**: The address of the UCREL Tool Chain e.g.
@@ -70,11 +161,110 @@ class UCREL_API():
         if port number is not required.
         4. **timeout**: The amount of time to allow each request to take before raising
         a [`requests.exceptions.Timeout`](https://requests.readthedocs.io/en/latest/api/#requests.Timeout)
+        5. **pool_connections**: The number of connection pools (one per host)
+        to cache.
+        6. **pool_maxsize**: The maximum number of connections to keep alive
+        in each pool. Should be at least the number of threads that share
+        this instance.
+        7. **max_retries**: The number of times a request is retried when the
+        connection fails or the server returns one of the `retry_status_codes`.
+        Requests that time out while reading the response are not retried.
+        8. **backoff_factor**: Sleep `backoff_factor * (2 ** (retry number - 1))`
+        seconds between retries.
+        9. **retry_status_codes**: HTTP status codes that trigger a retry.
+        10. **cache**: A cache of the server responses, when given a text that
+        has already been sent to the server with the same settings, e.g.
+        `tagset`, is not sent again. **Optional**
+        11. **memory_cache**: An in memory cache of the `UCREL_Doc`s returned
+        by `usas`, when given a text that has already been tagged with the
+        same `tagset` a copy of the cached `UCREL_Doc` is returned. **Optional**
+        12. **metrics**: Records the time spent escaping, requesting,
+        downloading, and parsing, and the number of bytes, tokens, retries,
+        and cache hits, see `UCREL_Metrics`. When `usas_many` uses
+        processes each process records to its own copy. **Optional**
+        13. **controller**: Adapts the number of requests made at once, the
+        rate of requests, and the size of the chunks of `usas_chunked` and
+        `usas_batch`, to the latency and errors of the requests, see
+        `UCREL_Adaptive_Controller`. **Optional**
         '''
         self.email = email
         self.server_address = server_address
         self.port = port
         self.timeout = timeout
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.retry_status_codes = retry_status_codes
+        self.cache = cache
+        self.memory_cache = memory_cache
+        self.metrics = metrics
+        self.controller = controller
+        self._session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        '''
+        **returns**: A `requests.Session` whose HTTP and HTTPS adapters use
+        the connection pool and retry settings of this instance.
+        '''
+        # Read errors are not retried so that a slow server still raises a
+        # `requests.exceptions.Timeout` rather than a `ConnectionError`.
+        retry = Retry(total=self.max_retries, read=False,
+                      backoff_factor=self.backoff_factor,
+                      status_forcelist=self.retry_status_codes,
+                      allowed_methods=frozenset(['POST']),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize,
+                              max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def close(self) -> None:
+        '''
+        Closes all of the pooled connections. The instance can still be
+        used afterwards, new connections are opened as they are needed.
+        '''
+        self._session.close()
+
+    def __enter__(self) -> 'UCREL_API':
+        '''
+        **returns**: This instance, the pooled connections are closed on exit.
+        '''
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        '''
+        Closes the pooled connections, see `close`.
+        '''
+        self.close()
+
+    def _ucrel_url(self, endpoint: str) -> str:
+        '''
+        1. **endpoint**: An endpoint of the UCREL Tool Chain server.
+
+        **returns**: The URL of the `endpoint`.
+        '''
+        return _ucrel_url(self.server_address, self.port, endpoint)
+
+    def _ucrel_form_data(self, text: str, **data_kwargs) -> Dict[str, str]:
+        '''
+        1. **text**: The text to be processed by the UCREL Tool Chain.
+        2. **data_kwargs**: Optional, additional `key: value` data to
+        be sent with the multipart form data.
+
+        **returns**: The multipart form data of a POST request to the
+        UCREL Tool Chain server, the `text` is SGML entity escaped.
+        '''
+        # Escape the SGML entities
+        if self.metrics is None:
+            escaped_text = self._sgml_entity_escape(text)
+        else:
+            with self.metrics.timer('escape'):
+                escaped_text = self._sgml_entity_escape(text)
+        return _ucrel_form_data(self.email, escaped_text, **data_kwargs)
 
     def _ucrel_post_request(self, endpoint: str, text: str, **data_kwargs) -> str:
         '''
@@ -96,34 +286,134 @@ class UCREL_API():
         **raises Exception**: If any error occurs while processing the POST request
         to the `endpoint`.
         '''
-        url = f'{self.server_address}{endpoint}'
-        if self.port:
-            url = f'{self.server_address}:{self.port}{endpoint}'
-        # Escape the SGML entities
+        url = self._ucrel_url(endpoint)
         text = text.strip()
-        escaped_text = self._sgml_entity_escape(text)
-        # Type here refers to the fact we want to use the REST API
-        # Style refers to the output type, in this case we use verticical
-        # as the verticial format returns the most output e.g. all possible tags
-        # and split into sentences.
-        data = {'type': 'rest', 'email': self.email,
-                **data_kwargs, 'style': 'tab',  'text': escaped_text}
-        headers = {'Accept':'text/plain; charset=utf-8',
-                   'Content-Type': 'text/plain; charset=utf-8'}
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(url, text, **data_kwargs)
+            cached_response = self.cache.get(cache_key)
+            if cached_response is not None:
+                if self.metrics is not None:
+                    self.metrics.count('cache_hits')
+                return cached_response
+        # Only escaped when the response is not cached.
+        data = self._ucrel_form_data(text, **data_kwargs)
         try:
-            post_response = requests.post(url, files=data, timeout=self.timeout,
-                                          headers=headers)
-            status_code = post_response.status_code
-            if post_response.status_code != 200:
-                error_msg = (f'Raised a status code of {status_code}. '
-                             'Can only accept code 200.')
-                raise requests.exceptions.HTTPError(error_msg)
-            return post_response.text
+            start_time = time.perf_counter()
+            with self._post(url, data, len(text)) as post_response:
+                if self.metrics is not None:
+                    self._record_response(post_response, time.perf_counter() - start_time)
+                status_code = post_response.status_code
+                if post_response.status_code != 200:
+                    error_msg = (f'Raised a status code of {status_code}. '
+                                 'Can only accept code 200.')
+                    raise requests.exceptions.HTTPError(error_msg, response=post_response)
+                response_text = post_response.text
+            if cache_key is not None:
+                self.cache.set(cache_key, response_text)
+            return response_text
         except requests.exceptions.Timeout:
+            if self.metrics is not None:
+                self.metrics.count('errors')
             error_message = (f'URL: {url}. Failed due to a timeout for the ')
             raise requests.exceptions.Timeout(error_message)
         except Exception as e:
-            raise type(e)(f'URL: {url}\nError: {str(e)}')
+            if self.metrics is not None:
+                self.metrics.count('errors')
+            error_message = f'URL: {url}\nError: {str(e)}'
+            if isinstance(e, requests.exceptions.HTTPError):
+                # Keeps the response so that its status code can be checked.
+                raise requests.exceptions.HTTPError(error_message, response=e.response)
+            raise type(e)(error_message)
+
+    @contextlib.contextmanager
+    def _post(self, url: str, data: Dict[str, str], chars: int,
+              stream: bool = False) -> Iterator[requests.Response]:
+        '''
+        Context manager that POSTs the multipart form `data` to the `url`
+        through the pooled connections, and closes the response when its
+        block exits. With a `self.controller` the request waits until the
+        controller allows it, and the request is only released, and its
+        latency or error recorded, when the block exits, after the body,
+        including a streamed body, has been read.
+
+        1. **url**: The URL to POST to.
+        2. **data**: The multipart form data, see `_ucrel_form_data`.
+        3. **chars**: The number of characters of text in the `data`.
+        4. **stream**: Whether to stream the response.
+
+        **returns**: The response, whatever its status code.
+        '''
+        controller = self.controller
+        if controller is None:
+            with self._session.post(url, files=data, timeout=self.timeout,
+                                    headers=self.REQUEST_HEADERS, stream=stream) as response:
+                yield response
+            return
+        start = controller.acquire()
+        try:
+            try:
+                response = self._session.post(url, files=data, timeout=self.timeout,
+                                              headers=self.REQUEST_HEADERS, stream=stream)
+            except requests.exceptions.Timeout:
+                controller.record_error(start, chars, timeout=True)
+                raise
+            except requests.exceptions.RequestException:
+                controller.record_error(start, chars)
+                raise
+            with response:
+                if response.status_code != 200:
+                    controller.record_error(start, chars, status_code=response.status_code)
+                    yield response
+                    return
+                try:
+                    yield response
+                except requests.exceptions.Timeout:
+                    controller.record_error(start, chars, timeout=True)
+                    raise
+                except requests.exceptions.RequestException:
+                    # e.g. the server stopped sending a streamed body
+                    controller.record_error(start, chars)
+                    raise
+                controller.record_success(start, chars, retries=self._number_retries(response))
+        finally:
+            controller.release()
+
+    @staticmethod
+    def _number_retries(response: requests.Response) -> int:
+        '''
+        **returns**: The number of times the request of the `response` was
+        retried, from the retry history kept by urllib3.
+        '''
+        retries = getattr(response.raw, 'retries', None)
+        if retries is None:
+            return 0
+        return len(retries.history)
+
+    def _record_response(self, response: requests.Response,
+                         seconds: Optional[float] = None) -> None:
+        '''
+        Records a response from the server in `self.metrics`.
+
+        1. **response**: A response returned by `self._session`.
+        2. **seconds**: The time taken to send the request and read the
+        whole response. If not given, e.g. the response is streamed, the
+        download time is not recorded.
+        '''
+        metrics = self.metrics
+        metrics.count('requests')
+        if response.request.body is not None:
+            metrics.count('bytes_sent', len(response.request.body))
+        retries = self._number_retries(response)
+        if retries:
+            metrics.count('retries', retries)
+        # `elapsed` is the time until the response headers were received.
+        request_seconds = response.elapsed.total_seconds()
+        metrics.time('request', request_seconds)
+        if seconds is not None:
+            metrics.count('bytes_received', len(response.content))
+            metrics.time('download', max(seconds - request_seconds, 0.0))
 
     def usas(self, text: str, tagset: str = 'c7') -> UCREL_Doc:
         '''
@@ -134,57 +424,445 @@ class UCREL_API():
         lingustic attributes that are generared from tagging it
         with [USAS.](http://ucrel.lancs.ac.uk/usas/)
         '''
+        memory_cache_key = None
+        if self.memory_cache is not None:
+            memory_cache_key = self.memory_cache.key(self._ucrel_url(self.USAS_ENDPOINT),
+                                                     text, tagset=tagset)
+            cached_doc = self.memory_cache.get(memory_cache_key)
+            if cached_doc is not None:
+                if self.metrics is not None:
+                    self.metrics.count('memory_cache_hits')
+                return cached_doc
+        return self._usas_request(text, tagset, memory_cache_key)
+
+    def _usas_request(self, text: str, tagset: str,
+                      memory_cache_key: Optional[str] = None) -> UCREL_Doc:
+        '''
+        Same as `usas` but the `memory_cache` is not checked, the
+        `UCREL_Doc` is only added to it.
+
+        1. **text**: The text to be tagged by USAS.
+        2. **tagset**: The tagset to be used by USAS. Either `c5` or `c7`.
+        3. **memory_cache_key**: The key of the `text` in the
+        `memory_cache`, by default it is created. **Optional**
+
+        **returns**: The `UCREL_Doc` of the `text`.
+        '''
         # Call USAS endpoint.
-        usas_endpoint = '/cgi-bin/usas.pl'
-        usas_data = self._ucrel_post_request(usas_endpoint, text, tagset=tagset)
-        usas_data = usas_data.strip()
-        if not usas_data:
-            return UCREL_Doc(text, tokens=[], sentence_indexes=[])
+        usas_data = self._ucrel_post_request(self.USAS_ENDPOINT, text, tagset=tagset)
+        if self.metrics is None:
+            ucrel_doc = parse_usas_tab(usas_data, text)
+        else:
+            with self.metrics.timer('parse'):
+                ucrel_doc = parse_usas_tab(usas_data, text)
+            self.metrics.count('tokens', len(ucrel_doc))
+        if self.memory_cache is not None:
+            if memory_cache_key is None:
+                memory_cache_key = self.memory_cache.key(self._ucrel_url(self.USAS_ENDPOINT),
+                                                         text, tagset=tagset)
+            self.memory_cache.set(memory_cache_key, ucrel_doc)
+        return ucrel_doc
 
-        ucrel_tokens: List[UCREL_Token] = []
+    def _ucrel_post_stream(self, endpoint: str, text: str, **data_kwargs) -> Iterator[str]:
+        '''
+        Same as `_ucrel_post_request` but the response is read incrementally.
+        Streamed responses are read from, but not stored in, `self.cache`,
+        as storing them requires the whole response to be in memory.
 
-        sentence_indexes: List[Tuple[int, int]] = []
-        token_index = 0
-        last_sentence_index = 0
+        1. **endpoint**: The POST endpoint of the UCREL Tool Chain sevrer
+        to call. The endpoint is expected to require `text` key in the
+        multipart form data.
+        2. **text**: The text to be processed by the given `endpoint`.
+        3. **data_kwargs**: Optional, additional `key: value` data to
+        be sent with the multipart form data.
 
+        **returns**: The string response from the UCREL Tool Chain
+        server in chunks, as they are received.
 
+        **raises requests.exceptions.Timeout**: If the response headers from the POST
+        request take longer than `self.timeout`.
+        **raises requests.exceptions.ConnectionError**: If the server stops sending
+        the response for longer than `self.timeout`.
+        **raises requests.exceptions.HTTPError**: If anything other than a status code 200
+        is returned from the `endpoint`.
+        **raises Exception**: If any error occurs while processing the POST request
+        to the `endpoint`.
+        '''
+        url = self._ucrel_url(endpoint)
+        text = text.strip()
+        if self.cache is not None:
+            cached_response = self.cache.get(self.cache.key(url, text, **data_kwargs))
+            if cached_response is not None:
+                if self.metrics is not None:
+                    self.metrics.count('cache_hits')
+                yield cached_response
+                return
+        data = self._ucrel_form_data(text, **data_kwargs)
+        try:
+            with self._post(url, data, len(text), stream=True) as post_response:
+                if self.metrics is not None:
+                    self._record_response(post_response)
+                status_code = post_response.status_code
+                if status_code != 200:
+                    error_msg = (f'Raised a status code of {status_code}. '
+                                 'Can only accept code 200.')
+                    raise requests.exceptions.HTTPError(error_msg, response=post_response)
+                post_response.encoding = 'utf-8'
+                yield from post_response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE,
+                                                       decode_unicode=True)
+                if self.metrics is not None:
+                    self.metrics.count('bytes_received', post_response.raw.tell())
+        except requests.exceptions.Timeout:
+            if self.metrics is not None:
+                self.metrics.count('errors')
+            error_message = (f'URL: {url}. Failed due to a timeout for the ')
+            raise requests.exceptions.Timeout(error_message)
+        except Exception as e:
+            if self.metrics is not None:
+                self.metrics.count('errors')
+            error_message = f'URL: {url}\nError: {str(e)}'
+            if isinstance(e, requests.exceptions.HTTPError):
+                # Keeps the response so that its status code can be checked.
+                raise requests.exceptions.HTTPError(error_message, response=e.response)
+            raise type(e)(error_message)
+
+    def usas_sentences(self, text: str, tagset: str = 'c7') -> Iterator[List[UCREL_Token]]:
+        '''
+        Same as `usas` but the response is parsed as it is received, each
+        sentence is yielded as soon as its closing `</s>` tag arrives. Only the
+        sentence that is being received is kept in memory.
+
+        1. **text**: The text to be tagged by USAS.
+        2. **tagset**: The tagset to be used by USAS. Either `c5` or `c7`.
 
-        for sentence in usas_data.split('<s>'):
-            sentence = sentence.strip().rstrip('</s>')
-            if not sentence:
+        **returns**: The sentences of the text, each a list of `UCREL_Token`s,
+        the same as the `sentences` of the `UCREL_Doc` that `usas` returns.
+
+        **raises ValueError**: If a line in the response is not a sentence tag
+        or a token.
+        '''
+        if self.memory_cache is not None:
+            cached_doc = self.memory_cache.get(self.memory_cache.key(self._ucrel_url(self.USAS_ENDPOINT),
+                                                                     text, tagset=tagset))
+            if cached_doc is not None:
+                if self.metrics is not None:
+                    self.metrics.count('memory_cache_hits')
+                yield from cached_doc.sentences
+                return
+        buffer = ''
+        for chunk in self._ucrel_post_stream(self.USAS_ENDPOINT, text, tagset=tagset):
+            # Only the new chunk, and the end of the buffer that a `</s>`
+            # could start in, has to be searched.
+            search_start = max(len(buffer) - 3, 0)
+            buffer += chunk
+            sentences_end = buffer.rfind('</s>', search_start)
+            if sentences_end == -1:
+                continue
+            sentences_end += len('</s>')
+            yield from self._parse_sentences(buffer[:sentences_end])
+            buffer = buffer[sentences_end:]
+        yield from self._parse_sentences(buffer)
+
+    def _parse_sentences(self, usas_tab: str) -> Iterable[List[UCREL_Token]]:
+        '''
+        Same as `_iter_usas_sentences`, but when the parse time and number
+        of tokens are recorded in `self.metrics` all of the sentences are
+        parsed before they are returned.
+
+        1. **usas_tab**: USAS `tab` style response, or part of one that
+        ends after a `</s>` tag.
+
+        **returns**: The sentences of the `usas_tab`.
+        '''
+        if self.metrics is None:
+            return _iter_usas_sentences(usas_tab)
+        with self.metrics.timer('parse'):
+            sentences = list(_iter_usas_sentences(usas_tab))
+        self.metrics.count('tokens', sum(map(len, sentences)))
+        return sentences
+
+    def usas_batch(self, texts: Iterable[str], tagset: str = 'c7',
+                   max_chars: Optional[int] = None) -> List[UCREL_Doc]:
+        '''
+        Tags many texts with USAS using as few requests as possible. The
+        texts are packed into requests of at most `max_chars` characters,
+        within a request each text is separated by
+        `UCREL_API.BATCH_SEPARATOR`, which is its own paragraph and is used
+        to split the tagged sentences back into one `UCREL_Doc` per text.
+        If the separators cannot be found in the response the texts of
+        that request are tagged one at a time. Texts found in the
+        `memory_cache` are not sent, and the `UCREL_Doc` of each text that
+        is sent is added to the `memory_cache`, the same as `usas`.
+
+        1. **texts**: The texts to be tagged by USAS.
+        2. **tagset**: The tagset to be used by USAS. Either `c5` or `c7`.
+        3. **max_chars**: The maximum number of characters to send in one
+        request. A text longer than this is sent in a request on its own.
+        By default the `chunk_chars` of the `controller`, or 20000 without
+        a `controller`.
+
+        **returns**: A `UCREL_Doc` for each text in `texts`, in the same
+        order, as if each text had been tagged with `usas`.
+
+        **raises ValueError**: If any of the `texts` contains
+        `UCREL_API.BATCH_SEPARATOR`.
+        '''
+        texts = list(texts)
+        if max_chars is None:
+            max_chars = self._max_chars()
+        ucrel_docs: List[Optional[UCREL_Doc]] = [None] * len(texts)
+        separator_length = len(self.BATCH_SEPARATOR) + 4
+
+        batch: List[int] = []
+        batch_chars = 0
+        for text_index, text in enumerate(texts):
+            if self.BATCH_SEPARATOR in text:
+                error_msg = (f'Text at index {text_index} contains the batch '
+                             f'separator {self.BATCH_SEPARATOR}')
+                raise ValueError(error_msg)
+            text_length = len(text.strip())
+            # Empty texts do not need to be sent to the server.
+            if not text_length:
+                ucrel_docs[text_index] = UCREL_Doc(text, tokens=[], sentence_indexes=[])
                 continue
-            for token_values in sentence.split('\n'):
-                token_values = token_values.strip()
-                if not token_values:
+            if self.memory_cache is not None:
+                cached_doc = self.memory_cache.get(self.memory_cache.key(self._ucrel_url(self.USAS_ENDPOINT),
+                                                                         text, tagset=tagset))
+                if cached_doc is not None:
+                    if self.metrics is not None:
+                        self.metrics.count('memory_cache_hits')
+                    ucrel_docs[text_index] = cached_doc
                     continue
+            if batch and batch_chars + separator_length + text_length > max_chars:
+                self._usas_batch_request(texts, batch, tagset, ucrel_docs)
+                batch, batch_chars = [], 0
+            if batch:
+                batch_chars += separator_length
+            batch.append(text_index)
+            batch_chars += text_length
+        if batch:
+            self._usas_batch_request(texts, batch, tagset, ucrel_docs)
+        return ucrel_docs
+
+    def _usas_batch_request(self, texts: List[str], batch: List[int], tagset: str,
+                            ucrel_docs: List[Optional[UCREL_Doc]]) -> None:
+        '''
+        Tags the texts at the `batch` indexes in one request and stores the
+        resulting `UCREL_Doc`s at the same indexes in `ucrel_docs`, and in
+        the `memory_cache`.
+
+        1. **texts**: All of the texts given to `usas_batch`.
+        2. **batch**: Indexes of the `texts` to tag in this request.
+        3. **tagset**: The tagset to be used by USAS. Either `c5` or `c7`.
+        4. **ucrel_docs**: The `UCREL_Doc`s returned by `usas_batch`.
+        '''
+        # The texts were not found in the `memory_cache` by `usas_batch`,
+        # so it is not checked again.
+        if len(batch) == 1:
+            ucrel_docs[batch[0]] = self._usas_request(texts[batch[0]], tagset)
+            return
 
-                token_values = token_values.split('\t')
-                token_text, pos_tag, lemma, usas_tags = None, None, None, None
-                # Punctuation does not get tagged with USAS tags.
-                if len(token_values) == 3:
-                    token_text, pos_tag, lemma = token_values
+        separator = f'\n\n{self.BATCH_SEPARATOR}\n\n'
+        batch_text = separator.join(texts[text_index].strip() for text_index in batch)
+        usas_data = self._ucrel_post_request(self.USAS_ENDPOINT, batch_text, tagset=tagset)
+
+        # Split the sentences on the separator tokens, a separator token
+        # also ends the sentence it is in.
+        doc_sentences: List[List[List[UCREL_Token]]] = [[]]
+        for sentence in self._parse_sentences(usas_data):
+            current_sentence: List[UCREL_Token] = []
+            for token in sentence:
+                if token.text == self.BATCH_SEPARATOR:
+                    if current_sentence:
+                        doc_sentences[-1].append(current_sentence)
+                        current_sentence = []
+                    doc_sentences.append([])
                 else:
-                    token_text, pos_tag, lemma, usas_tags = token_values
-                token_text = self._sgml_entity_un_escape(token_text)
-                lemma = self._sgml_entity_un_escape(lemma)
-                usas_tag = None
-                mwe_tag = None
-                if usas_tags is not None:
-                    # Most likely USAS tag
-                    usas_tag = usas_tags.split()[0]
-                    # Get the MWE tag
-                    usas_and_mwe = usas_tag.split('[i')
-                    if len(usas_and_mwe) == 2:
-                        usas_tag, mwe_tag = usas_and_mwe
-
-                ucrel_tokens.append(UCREL_Token(token_text, lemma=lemma,
-                                                pos_tag=pos_tag,
-                                                usas_tag=usas_tag, mwe_tag=mwe_tag))
-                token_index += 1
-            sentence_indexes.append((last_sentence_index, token_index))
-            last_sentence_index = token_index
-
-        return UCREL_Doc(text, tokens=ucrel_tokens, sentence_indexes=sentence_indexes)
+                    current_sentence.append(token)
+            if current_sentence:
+                doc_sentences[-1].append(current_sentence)
+
+        if len(doc_sentences) != len(batch):
+            for text_index in batch:
+                ucrel_docs[text_index] = self._usas_request(texts[text_index], tagset)
+            return
+        for text_index, sentences in zip(batch, doc_sentences):
+            ucrel_doc = _sentences_to_doc(texts[text_index], sentences)
+            if self.memory_cache is not None:
+                self.memory_cache.set(self.memory_cache.key(self._ucrel_url(self.USAS_ENDPOINT),
+                                                            texts[text_index], tagset=tagset),
+                                      ucrel_doc)
+            ucrel_docs[text_index] = ucrel_doc
+
+    def usas_chunked(self, text: str, tagset: str = 'c7', max_chars: Optional[int] = None,
+                     workers: int = 1) -> UCREL_Doc:
+        '''
+        Tags a large text, e.g. a book, with USAS by splitting it into
+        chunks of at most `max_chars` characters, tagging each chunk and
+        joining the chunks back into one `UCREL_Doc`. The text is split on
+        paragraph boundaries, if a paragraph is too large it is split on
+        sentence boundaries, then whitespace, see `split_text`.
+
+        1. **text**: The text to be tagged by USAS.
+        2. **tagset**: The tagset to be used by USAS. Either `c5` or `c7`.
+        3. **max_chars**: The maximum number of characters in each chunk. By
+        default the `chunk_chars` of the `controller`, or 20000 without a
+        `controller`.
+        4. **workers**: The number of chunks to tag at the same time, see
+        `usas_many`.
+
+        **returns**: A `UCREL_Doc` representing the whole text, the same
+        as `usas` assuming no sentence crosses a chunk boundary.
+
+        **raises Exception**: The first exception raised while tagging a chunk.
+        '''
+        if max_chars is None:
+            max_chars = self._max_chars()
+        chunks = [chunk for chunk in self.split_text(text, max_chars) if chunk.strip()]
+        if workers > 1:
+            chunk_docs = self.usas_many(chunks, tagset=tagset, workers=workers)
+        else:
+            chunk_docs = (self.usas(chunk, tagset=tagset) for chunk in chunks)
+
+        sentences: List[List[UCREL_Token]] = []
+        for chunk_doc in chunk_docs:
+            if isinstance(chunk_doc, Exception):
+                raise chunk_doc
+            sentences.extend(chunk_doc.sentences)
+        return _sentences_to_doc(text, sentences)
+
+    def _max_chars(self) -> int:
+        '''
+        **returns**: The number of characters to send in a request, the
+        `chunk_chars` of the `controller`, or 20000 without a `controller`.
+        '''
+        if self.controller is None:
+            return 20000
+        return self.controller.chunk_chars()
+
+    @staticmethod
+    def split_text(text: str, max_chars: int) -> List[str]:
+        '''
+        Splits the `text` into chunks of at most `max_chars` characters.
+        Each chunk ends at the last paragraph boundary (blank line) that
+        fits within `max_chars`, else the last sentence boundary (`.`, `!`,
+        or `?` followed by whitespace), else the last whitespace, else the
+        chunk is cut at exactly `max_chars` characters.
+
+        1. **text**: The text to split.
+        2. **max_chars**: The maximum number of characters in each chunk.
+
+        **returns**: The chunks, which joined together are the `text`.
+
+        **raises ValueError**: If `max_chars` is less than 1.
+        '''
+        if max_chars < 1:
+            raise ValueError(f'`max_chars` has to be at least 1 and not {max_chars}')
+        chunks: List[str] = []
+        start_index = 0
+        while len(text) - start_index > max_chars:
+            window = text[start_index: start_index + max_chars]
+            end_index = max_chars
+            for boundary_pattern in (_PARAGRAPH_BOUNDARY, _SENTENCE_BOUNDARY,
+                                     _WHITESPACE_BOUNDARY):
+                boundary_ends = [match.end() for match in boundary_pattern.finditer(window)]
+                if boundary_ends:
+                    end_index = boundary_ends[-1]
+                    break
+            chunks.append(window[:end_index])
+            start_index += end_index
+        if start_index < len(text):
+            chunks.append(text[start_index:])
+        return chunks
+
+    def usas_many(self, texts: Iterable[str], tagset: str = 'c7',
+                  workers: Optional[int] = None, executor: str = 'thread'
+                  ) -> Iterator[Union[UCREL_Doc, Exception]]:
+        '''
+        Tags the `texts` with USAS using a pool of `workers`, the `texts`
+        are only read from as fast as they are tagged. If tagging a text
+        raises an exception the exception is yielded in place of its
+        `UCREL_Doc`, so that one failed text does not stop the others
+        from being tagged.
+
+        1. **texts**: The texts to be tagged by USAS.
+        2. **tagset**: The tagset to be used by USAS. Either `c5` or `c7`.
+        3. **workers**: The number of texts to tag at the same time. When
+        using threads `pool_maxsize` should be at least this large. By
+        default the `max_concurrency` of the `controller`, which limits
+        the requests made at once to its `concurrency`, or 4 without a
+        `controller`.
+        4. **executor**: `thread` to use a thread pool or `process` to use
+        a process pool, each process has its own copy of this instance.
+
+        **returns**: An iterator of a `UCREL_Doc` or an `Exception` for each
+        text, in the same order as the `texts`.
+
+        **raises ValueError**: If `executor` is not `thread` or `process`.
+        '''
+        # Validated here, not in the generator, so that the error is raised
+        # when `usas_many` is called rather than when it is first iterated.
+        if executor not in ('thread', 'process'):
+            error_msg = (f'The executor has to be either `thread` or `process` '
+                         f'and not {executor}')
+            raise ValueError(error_msg)
+        if workers is None:
+            workers = 4 if self.controller is None else self.controller.max_concurrency
+        return self._usas_many(texts, tagset, workers, executor)
+
+    def _usas_many(self, texts: Iterable[str], tagset: str, workers: int,
+                   executor: str) -> Iterator[Union[UCREL_Doc, Exception]]:
+        '''
+        The generator returned by `usas_many`, the pool is only created
+        once it is iterated.
+        '''
+        pool: Executor
+        if executor == 'thread':
+            pool = ThreadPoolExecutor(max_workers=workers)
+            usas_function = functools.partial(self.usas, tagset=tagset)
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers,
+                                       initializer=_init_process_api,
+                                       initargs=(self,))
+            usas_function = functools.partial(_process_usas, tagset=tagset)
+
+        # Only a few texts per worker are submitted ahead of the text that
+        # is being yielded, so that `texts` can be a large stream.
+        futures: Deque[Future] = collections.deque()
+        max_futures = workers * 2
+        with pool:
+            for text in texts:
+                futures.append(pool.submit(usas_function, text))
+                while len(futures) >= max_futures:
+                    yield self._future_result(futures.popleft())
+            while futures:
+                yield self._future_result(futures.popleft())
+
+    @staticmethod
+    def _future_result(future: Future) -> Union[UCREL_Doc, Exception]:
+        '''
+        **returns**: The result of the `future` or the exception it raised.
+        '''
+        exception = future.exception()
+        if exception is not None:
+            return exception
+        return future.result()
+
+    def __getstate__(self) -> dict:
+        '''
+        **returns**: The state of this instance without the
+        `requests.Session`, which is re-created when un-pickled.
+        '''
+        state = self.__dict__.copy()
+        del state['_session']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        '''
+        1. **state**: State returned by `__getstate__`.
+        '''
+        self.__dict__.update(state)
+        self._session = self._create_session()
 
     def __repr__(self) -> str:
         '''
@@ -198,4 +876,122 @@ class UCREL_API():
         if self.port:
             base_repr += f', port {self.port}'
         base_repr += f', timeout {self.timeout} seconds'
-        return base_repr
\ No newline at end of file
+        return base_repr
+
+# Cell
+
+# The `UCREL_API` used by each process of the `UCREL_API.usas_many`
+# process pool.
+_PROCESS_API: Optional[UCREL_API] = None
+
+def _init_process_api(ucrel_api: UCREL_API) -> None:
+    '''
+    Process pool initializer that stores the `ucrel_api` for `_process_usas`.
+    '''
+    global _PROCESS_API
+    _PROCESS_API = ucrel_api
+
+def _process_usas(text: str, tagset: str) -> UCREL_Doc:
+    '''
+    **returns**: `UCREL_API.usas` of the `text` using the `UCREL_API`
+    of this process.
+    '''
+    return _PROCESS_API.usas(text, tagset=tagset)
+
+# Cell
+
+# A line of the USAS `tab` style response, either a sentence tag, a token
+# with 3 or 4 tab separated values, or anything else which is an error.
+# One match per line of the `tab` style response, the groups are:
+# sentence tag, token text, POS tag, lemma, most likely USAS tag, MWE tag
+# and any other non empty line, which is a line that cannot be parsed.
+_USAS_TAB_LINE = re.compile(r'^[ \t\r\f\v]*(?:(</?s>)|([^\t\n]+)\t([^\t\n]*)\t([^\t\n]*)'
+                            r'(?:\t[ ]*([^\s\[]*)(?:\[i(\S*))?[^\t\n]*)?|(\S[^\n]*))'
+                            r'[ \t\r\f\v]*$', re.MULTILINE)
+
+def _iter_usas_sentences(usas_tab: str, mwe_grouper: Optional[_MWE_Grouper] = None
+                         ) -> Iterator[List[UCREL_Token]]:
+    '''
+    1. **usas_tab**: The `tab` style response from the USAS endpoint.
+    2. **mwe_grouper**: If given the tokens of each Multi Word Expression
+    (MWE) are added to it, the token indexes are the indexes of the tokens
+    in all of the sentences joined together. **Optional**
+
+    **returns**: The sentences of the response, where each sentence is
+    a list of `UCREL_Token`s. Sentences without any tokens are not returned.
+
+    **raises ValueError**: If a line in the response is not a sentence tag
+    or a token.
+    '''
+    # None of the SGML entities un-escape to a tab or new line, therefore
+    # the whole response can be un-escaped in one pass before it is split.
+    usas_tab = UCREL_API._sgml_entity_un_escape(usas_tab)
+    intern = sys.intern
+    sentence: List[UCREL_Token] = []
+    # Number of tokens in the sentences before `sentence`
+    token_offset = 0
+    for sentence_tag, token_text, pos_tag, lemma, usas_tag, mwe_tag, other in _USAS_TAB_LINE.findall(usas_tab):
+        if sentence_tag:
+            if sentence:
+                yield sentence
+                token_offset += len(sentence)
+                sentence = []
+            continue
+        if other:
+            raise ValueError(f'Cannot parse the USAS line: {other}')
+        # Only a lemma without any USAS tags after it can end in whitespace
+        if lemma[-1:].isspace():
+            lemma = lemma.rstrip()
+        if mwe_tag:
+            mwe_tag = intern(mwe_tag)
+            if mwe_grouper is not None:
+                mwe_grouper.add(token_offset + len(sentence), mwe_tag)
+        # Punctuation does not get tagged with USAS tags. The tags come from
+        # small tagsets, interned each tag is stored once rather than per token.
+        sentence.append(UCREL_Token(token_text, lemma, intern(pos_tag),
+                                    intern(usas_tag) if usas_tag else None,
+                                    mwe_tag or None))
+    if sentence:
+        yield sentence
+
+def _sentences_to_doc(text: str, sentences: Iterable[List[UCREL_Token]],
+                      mwe_indexes: Optional[List[Tuple[int, ...]]] = None) -> UCREL_Doc:
+    '''
+    1. **text**: The text the sentences came from.
+    2. **sentences**: The sentences, each a list of `UCREL_Token`s.
+    3. **mwe_indexes**: The token indexes of each Multi Word Expression in
+    the `sentences`, see `UCREL_Doc.mwe_indexes`. **Optional**
+
+    **returns**: A `UCREL_Doc` of the `text` whose tokens are the
+    concatenation of the `sentences`.
+    '''
+    ucrel_tokens: List[UCREL_Token] = []
+    sentence_indexes: List[Tuple[int, int]] = []
+    for sentence in sentences:
+        start_index = len(ucrel_tokens)
+        ucrel_tokens.extend(sentence)
+        sentence_indexes.append((start_index, len(ucrel_tokens)))
+    return UCREL_Doc(text, tokens=ucrel_tokens, sentence_indexes=sentence_indexes,
+                     mwe_indexes=mwe_indexes)
+
+def parse_usas_tab(usas_tab: str, text: Optional[str] = None) -> UCREL_Doc:
+    '''
+    Parses the `tab` style response from the USAS endpoint in one pass,
+    this is what `UCREL_API.usas` uses to create its `UCREL_Doc`.
+
+    1. **usas_tab**: The `tab` style response from the USAS endpoint.
+    2. **text**: The text that was tagged. **Optional**, if not given the
+    token texts joined by a space are used.
+
+    **returns**: A `UCREL_Doc` of the `text` with a sentence for each
+    `<s>` sentence in the response, and its Multi Word Expressions found
+    whilst parsing, see `UCREL_Doc.mwe_indexes`.
+
+    **raises ValueError**: If a line in the response is not a sentence tag
+    or a token.
+    '''
+    mwe_grouper = _MWE_Grouper()
+    sentences = list(_iter_usas_sentences(usas_tab, mwe_grouper))
+    if text is None:
+        text = ' '.join(token.text for sentence in sentences for token in sentence)
+    return _sentences_to_doc(text, sentences, mwe_grouper.mwe_indexes())
\ No newline at end of file
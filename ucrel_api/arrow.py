@@ -0,0 +1,224 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: module_notebooks/06_arrow.ipynb (unless otherwise specified).
+
+__all__ = ['TOKEN_COLUMNS', 'to_arrow', 'from_arrow', 'write_arrow', 'read_arrow', 'write_parquet',
+           'read_parquet']
+
+# Cell
+
+import itertools
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+from .ucrel_doc import UCREL_Doc
+from .ucrel_token import UCREL_Token
+
+# The columns of the Arrow table, one row per token.
+TOKEN_COLUMNS = ('doc_id', 'sentence_id', 'token_index', 'text', 'lemma',
+                 'pos_tag', 'usas_tag', 'mwe_tag', 'doc_text', 'doc_has_sentence_indexes')
+# The number of rows converted into `UCREL_Token`s at a time by `from_arrow`.
+_BATCH_ROWS = 65536
+
+def _check_pyarrow() -> None:
+    '''
+    **raises ImportError**: If `pyarrow` is not installed.
+    '''
+    if pyarrow is None:
+        error_msg = ('Arrow and Parquet export requires `pyarrow` to be '
+                     'installed: `pip install pyarrow`')
+        raise ImportError(error_msg)
+
+def to_arrow(ucrel_docs: Iterable[UCREL_Doc]) -> 'pyarrow.Table':
+    '''
+    1. **ucrel_docs**: The `UCREL_Doc`s to convert e.g. a list of
+    `UCREL_Doc`s or a `UCREL_Corpus`.
+
+    **returns**: A [pyarrow.Table](https://arrow.apache.org/docs/python/generated/pyarrow.Table.html)
+    with a row for each token, whose columns are `TOKEN_COLUMNS`.
+    `doc_id` is the index of the `UCREL_Doc` in the `ucrel_docs`,
+    `sentence_id` the index of the sentence in the `UCREL_Doc`,
+    `null` if the `UCREL_Doc` has no sentence indexes, and `token_index`
+    the index of the token in the `UCREL_Doc`. The tag columns are
+    dictionary encoded. The text of the `UCREL_Doc`, `doc_text`, and
+    whether it has sentence indexes, `doc_has_sentence_indexes`, are
+    only stored in the first row of each `UCREL_Doc`, the other rows
+    are `null`. A `UCREL_Doc` without tokens has one row whose
+    `token_index` and token columns are `null`.
+
+    **raises ImportError**: If `pyarrow` is not installed.
+    '''
+    _check_pyarrow()
+    doc_texts: List[Optional[str]] = []
+    has_sentence_indexes: List[Optional[bool]] = []
+    doc_ids: List[int] = []
+    sentence_ids: List[Optional[int]] = []
+    token_indexes: List[Optional[int]] = []
+    token_values: Tuple[List[Optional[str]], ...] = ([], [], [], [], [])
+    texts, lemmas, pos_tags, usas_tags, mwe_tags = token_values
+    for doc_id, ucrel_doc in enumerate(ucrel_docs):
+        number_tokens = len(ucrel_doc)
+        number_rows = max(number_tokens, 1)
+        doc_ids.extend(itertools.repeat(doc_id, number_rows))
+        doc_texts.append(ucrel_doc.text)
+        doc_texts.extend(itertools.repeat(None, number_rows - 1))
+        has_sentence_indexes.append(ucrel_doc._sentence_indexes is not None)
+        has_sentence_indexes.extend(itertools.repeat(None, number_rows - 1))
+        if not number_tokens:
+            token_indexes.append(None)
+            sentence_ids.append(None)
+            for values in token_values:
+                values.append(None)
+            continue
+        token_indexes.extend(range(number_tokens))
+        doc_sentence_ids: List[Optional[int]] = [None] * number_tokens
+        for sentence_id, (start_index, end_index) in enumerate(ucrel_doc._sentence_indexes or []):
+            doc_sentence_ids[start_index:end_index] = itertools.repeat(sentence_id,
+                                                                       end_index - start_index)
+        sentence_ids.extend(doc_sentence_ids)
+        for token in ucrel_doc:
+            texts.append(token.text)
+            lemmas.append(token.lemma)
+            pos_tags.append(token.pos_tag)
+            usas_tags.append(token.usas_tag)
+            mwe_tags.append(token.mwe_tag)
+
+    string_type = pyarrow.string()
+    columns = [pyarrow.array(doc_ids, type=pyarrow.int64()),
+               pyarrow.array(sentence_ids, type=pyarrow.int32()),
+               pyarrow.array(token_indexes, type=pyarrow.int32()),
+               pyarrow.array(texts, type=string_type),
+               pyarrow.array(lemmas, type=string_type)]
+    # Tags are from small tagsets, dictionary encoding stores each tag once.
+    for tags in (pos_tags, usas_tags, mwe_tags):
+        columns.append(pyarrow.array(tags, type=string_type).dictionary_encode())
+    columns.append(pyarrow.array(doc_texts, type=string_type))
+    columns.append(pyarrow.array(has_sentence_indexes, type=pyarrow.bool_()))
+    return pyarrow.Table.from_arrays(columns, names=list(TOKEN_COLUMNS))
+
+def _to_ucrel_doc(text: str, has_sentence_indexes: bool, tokens: List[UCREL_Token],
+                  sentence_ids: List[Optional[int]]) -> UCREL_Doc:
+    '''
+    1. **text**: The `doc_text` of the `UCREL_Doc`.
+    2. **has_sentence_indexes**: The `doc_has_sentence_indexes` of the `UCREL_Doc`.
+    3. **tokens**: The tokens of the `UCREL_Doc`.
+    4. **sentence_ids**: The `sentence_id` of each of the `tokens`.
+
+    **returns**: The `UCREL_Doc` of rows of a table created by `to_arrow`.
+    '''
+    if not has_sentence_indexes:
+        return UCREL_Doc(text, tokens=tokens)
+    sentence_indexes: List[Tuple[int, int]] = []
+    # Each run of the same sentence id is a sentence
+    token_index = 0
+    for sentence_id, sentence in itertools.groupby(sentence_ids):
+        sentence_length = len(list(sentence))
+        if sentence_id is not None:
+            sentence_indexes.append((token_index, token_index + sentence_length))
+        token_index += sentence_length
+    return UCREL_Doc(text, tokens=tokens, sentence_indexes=sentence_indexes)
+
+def from_arrow(table: 'pyarrow.Table') -> List[UCREL_Doc]:
+    '''
+    1. **table**: A table created by `to_arrow`, or read by `read_arrow` or
+    `read_parquet`, with all of its rows and columns.
+
+    **returns**: The `UCREL_Doc`s of the `table`, in `doc_id` order. The
+    rows are converted into Python objects in batches, but all of the
+    `UCREL_Doc`s are in memory, to analyse a large table use its columns.
+
+    **raises ImportError**: If `pyarrow` is not installed.
+    **raises ValueError**: If the `table` was not created by `to_arrow`.
+    '''
+    _check_pyarrow()
+    missing_columns = [name for name in TOKEN_COLUMNS if name not in table.column_names]
+    if missing_columns:
+        raise ValueError('The table was not created by `to_arrow`, it does not '
+                         f'have the columns {missing_columns}')
+    ucrel_docs: List[UCREL_Doc] = []
+    # The text, whether it has sentence indexes, tokens, and sentence ids
+    # of the `UCREL_Doc` whose rows are being read.
+    doc: Optional[Tuple[str, bool, List[UCREL_Token], List[Optional[int]]]] = None
+    current_doc_id = None
+
+    for batch in table.select(list(TOKEN_COLUMNS)).to_batches(max_chunksize=_BATCH_ROWS):
+        columns = [column.to_pylist() for column in batch.columns]
+        for (doc_id, sentence_id, token_index, text, lemma, pos_tag, usas_tag, mwe_tag,
+             doc_text, has_sentence_indexes) in zip(*columns):
+            if doc_id != current_doc_id:
+                if doc is not None:
+                    ucrel_docs.append(_to_ucrel_doc(*doc))
+                if doc_id != len(ucrel_docs) or doc_text is None:
+                    raise ValueError('The rows of the table are not in `doc_id` order.')
+                current_doc_id = doc_id
+                doc = (doc_text, has_sentence_indexes, [], [])
+            if token_index is not None:
+                doc[2].append(UCREL_Token(text, lemma, pos_tag, usas_tag, mwe_tag))
+                doc[3].append(sentence_id)
+    if doc is not None:
+        ucrel_docs.append(_to_ucrel_doc(*doc))
+    return ucrel_docs
+
+def write_arrow(ucrel_docs: Iterable[UCREL_Doc], path: Union[str, Path]) -> None:
+    '''
+    Writes the `ucrel_docs` as an [Arrow IPC file](https://arrow.apache.org/docs/python/ipc.html),
+    whose columns can be read without copying them into memory, see `read_arrow`.
+
+    1. **ucrel_docs**: The `UCREL_Doc`s to write, see `to_arrow`.
+    2. **path**: The file to write to.
+
+    **raises ImportError**: If `pyarrow` is not installed.
+    '''
+    table = to_arrow(ucrel_docs)
+    with pyarrow.OSFile(str(path), 'wb') as arrow_file:
+        with pyarrow.ipc.new_file(arrow_file, table.schema) as writer:
+            writer.write_table(table)
+
+def read_arrow(path: Union[str, Path]) -> 'pyarrow.Table':
+    '''
+    1. **path**: An Arrow IPC file written by `write_arrow`.
+
+    **returns**: The table of the file, see `to_arrow`. The file is
+    memory mapped, the columns of the table are not copied into memory
+    until they are used, `from_arrow` copies all of them into Python objects.
+
+    **raises ImportError**: If `pyarrow` is not installed.
+    '''
+    _check_pyarrow()
+    return pyarrow.ipc.open_file(pyarrow.memory_map(str(path), 'r')).read_all()
+
+def write_parquet(ucrel_docs: Iterable[UCREL_Doc], path: Union[str, Path],
+                  **parquet_kwargs) -> None:
+    '''
+    Writes the `ucrel_docs` as a [Parquet](https://arrow.apache.org/docs/python/parquet.html)
+    file, which is compressed and smaller than an Arrow IPC file.
+
+    1. **ucrel_docs**: The `UCREL_Doc`s to write, see `to_arrow`.
+    2. **path**: The file to write to.
+    3. **parquet_kwargs**: Optional, arguments of
+    [pyarrow.parquet.write_table](https://arrow.apache.org/docs/python/generated/pyarrow.parquet.write_table.html)
+    e.g. `compression='zstd'`.
+
+    **raises ImportError**: If `pyarrow` is not installed.
+    '''
+    _check_pyarrow()
+    pyarrow.parquet.write_table(to_arrow(ucrel_docs), str(path), **parquet_kwargs)
+
+def read_parquet(path: Union[str, Path],
+                 columns: Optional[List[str]] = None) -> 'pyarrow.Table':
+    '''
+    1. **path**: A Parquet file written by `write_parquet`.
+    2. **columns**: The columns to read, e.g. `['usas_tag']`. **Optional**,
+    by default all columns are read, which `from_arrow` requires.
+
+    **returns**: The table of the file, see `to_arrow`.
+
+    **raises ImportError**: If `pyarrow` is not installed.
+    '''
+    _check_pyarrow()
+    return pyarrow.parquet.read_table(str(path), columns=columns, memory_map=True)
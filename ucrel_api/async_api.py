@@ -0,0 +1,227 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: module_notebooks/03_async_api.ipynb (unless otherwise specified).
+
+__all__ = ['AsyncUCREL_API']
+
+# Cell
+
+import asyncio
+import collections
+from typing import Optional, Iterable, AsyncIterator, Set, Deque
+
+import requests
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from .api import UCREL_API, _ucrel_form_data, _ucrel_url, parse_usas_tab
+from .ucrel_doc import UCREL_Doc
+
+class AsyncUCREL_API():
+    '''
+    An [asyncio](https://docs.python.org/3/library/asyncio.html) version
+    of `UCREL_API`, that allows many requests to the UCREL Tool Chain to
+    be in flight at the same time without a thread per request.
+
+    Requires [aiohttp](https://docs.aiohttp.org/) to be installed,
+    `pip install aiohttp`.
+    '''
+    def __init__(self, email: str, server_address: str,
+                 port: str = '', timeout: int = 60,
+                 max_concurrency: int = 10,
+                 semaphore: Optional[asyncio.Semaphore] = None) -> None:
+        '''
+        1. **email**: Email address of the user. This is used to identify the user
+        calling the UCREL Tool Chain API.
+        2. **server_address**: The address of the UCREL Tool Chain e.g.
+        [http://ucrel-api.lancaster.ac.uk](http://ucrel-api.lancaster.ac.uk)
+        3. **port**: The port to the server e.g. 8080. Can be left as empty string
+        if port number is not required.
+        4. **timeout**: The amount of time to allow each request to take before raising
+        a [`requests.exceptions.Timeout`](https://requests.readthedocs.io/en/latest/api/#requests.Timeout)
+        5. **max_concurrency**: The maximum number of requests that can be
+        in flight at the same time.
+        6. **semaphore**: A semaphore that every request has to acquire,
+        can be shared with other instances to bound the total number of
+        requests in flight. **Optional**, by default a semaphore with
+        `max_concurrency` slots is created.
+
+        **raises ImportError**: If `aiohttp` is not installed.
+        '''
+        if aiohttp is None:
+            error_msg = ('The `AsyncUCREL_API` requires `aiohttp` to be '
+                         'installed: `pip install aiohttp`')
+            raise ImportError(error_msg)
+        self.email = email
+        self.server_address = server_address
+        self.port = port
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        # Created on first use as they have to be created within the
+        # running event loop.
+        self._session: Optional['aiohttp.ClientSession'] = None
+        self._semaphore = semaphore
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        '''
+        **returns**: The `aiohttp.ClientSession` used for all requests,
+        it is created on first use.
+        '''
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=timeout)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self) -> None:
+        '''
+        Closes the underlying `aiohttp.ClientSession` and all of its
+        connections.
+        '''
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> 'AsyncUCREL_API':
+        '''
+        **returns**: This instance, the session is closed on exit.
+        '''
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        '''
+        Closes the session, see `close`.
+        '''
+        await self.close()
+
+    async def _ucrel_post_request(self, endpoint: str, text: str, **data_kwargs) -> str:
+        '''
+        Same as `UCREL_API._ucrel_post_request` but as a coroutine. At most
+        `max_concurrency` requests are made at the same time.
+
+        1. **endpoint**: The POST endpoint of the UCREL Tool Chain sevrer
+        to call. The endpoint is expected to require `text` key in the
+        multipart form data.
+        2. **text**: The text to be processed by the given `endpoint`.
+        3. **data_kwargs**: Optional, additional `key: value` data to
+        be sent with the multipart form data.
+
+        **returns**: The string response from the UCREL Tool Chain
+        server after calling the given `endpoint` with the given `text`
+        and any `data_kwargs`.
+
+        **raises requests.exceptions.Timeout**: If the response from the POST request
+        takes longer than `self.timeout`.
+        **raises requests.exceptions.HTTPError**: If anything other than a status code 200
+        is returned from the `endpoint`.
+        **raises requests.exceptions.ConnectionError**: If `aiohttp` raises a
+        `aiohttp.ClientError`, e.g. the connection is refused.
+        '''
+        url = _ucrel_url(self.server_address, self.port, endpoint)
+        escaped_text = UCREL_API._sgml_entity_escape(text.strip())
+        data = _ucrel_form_data(self.email, escaped_text, **data_kwargs)
+        # The same multipart form data that `requests` creates for `UCREL_API`
+        form_data = aiohttp.FormData(quote_fields=False)
+        for name, value in data.items():
+            form_data.add_field(name, value, filename=name)
+        session = self._get_session()
+        try:
+            async with self._semaphore:
+                async with session.post(url, data=form_data,
+                                        headers=UCREL_API.REQUEST_HEADERS) as post_response:
+                    status_code = post_response.status
+                    if status_code != 200:
+                        error_msg = (f'URL: {url}\nError: Raised a status code of {status_code}. '
+                                     'Can only accept code 200.')
+                        raise requests.exceptions.HTTPError(error_msg)
+                    return await post_response.text(encoding='utf-8')
+        except asyncio.TimeoutError:
+            error_message = (f'URL: {url}. Failed due to a timeout for the ')
+            raise requests.exceptions.Timeout(error_message)
+        except aiohttp.ClientError as e:
+            # The `aiohttp` exceptions cannot be re-created from a message,
+            # they are raised as the `requests` exception `UCREL_API` raises.
+            raise requests.exceptions.ConnectionError(f'URL: {url}\nError: {str(e)}') from e
+
+    async def usas(self, text: str, tagset: str = 'c7') -> UCREL_Doc:
+        '''
+        1. **text**: The text to be tagged by USAS.
+        2. **tagset**: The tagset to be used by USAS. Either `c5` or `c7`.
+
+        **returns**: A `UCREL_Doc` representing the text and the
+        lingustic attributes that are generared from tagging it
+        with [USAS.](http://ucrel.lancs.ac.uk/usas/), the same as
+        `UCREL_API.usas`.
+        '''
+        usas_data = await self._ucrel_post_request(UCREL_API.USAS_ENDPOINT, text,
+                                                   tagset=tagset)
+        return parse_usas_tab(usas_data, text)
+
+    async def usas_stream(self, texts: Iterable[str], tagset: str = 'c7',
+                          ordered: bool = True) -> AsyncIterator[UCREL_Doc]:
+        '''
+        Tags the `texts` with USAS concurrently, at most `max_concurrency`
+        texts are tagged at the same time and the `texts` are only read
+        from as fast as they are tagged.
+
+        1. **texts**: The texts to be tagged by USAS.
+        2. **tagset**: The tagset to be used by USAS. Either `c5` or `c7`.
+        3. **ordered**: If `True` the `UCREL_Doc`s are yielded in the same
+        order as the `texts`, else they are yielded as soon as they are tagged.
+
+        **returns**: An async iterator of `UCREL_Doc`s, one for each text.
+
+        **raises Exception**: Any exception raised while tagging a text,
+        all texts that are still being tagged are cancelled.
+        '''
+        text_iterator = iter(texts)
+        pending: Set[asyncio.Future] = set()
+        # Tasks in the same order as the `texts`, only used when `ordered`
+        ordered_tasks: Deque[asyncio.Future] = collections.deque()
+
+        def add_task() -> None:
+            for text in text_iterator:
+                task = asyncio.ensure_future(self.usas(text, tagset=tagset))
+                pending.add(task)
+                if ordered:
+                    ordered_tasks.append(task)
+                return
+
+        try:
+            for _ in range(self.max_concurrency):
+                add_task()
+            while pending:
+                if ordered:
+                    task = ordered_tasks.popleft()
+                    await asyncio.wait([task])
+                    done = {task}
+                else:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+                for task in done:
+                    add_task()
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            # Wait for the cancelled tasks so that their connections are
+            # released and their exceptions are retrieved.
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def __repr__(self) -> str:
+        '''
+        String representation of the Async UCREL API instance, format:
+
+        Async UCREL API, server address {self.server_address}, port {self.port}, timeout {self.timeout} seconds, max concurrency {self.max_concurrency}
+
+        `, port {self.port}` -- will only exist in string if `self.port!=''`
+        '''
+        base_repr = f'Async UCREL API, server address {self.server_address}'
+        if self.port:
+            base_repr += f', port {self.port}'
+        base_repr += f', timeout {self.timeout} seconds'
+        base_repr += f', max concurrency {self.max_concurrency}'
+        return base_repr
@@ -0,0 +1,391 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: module_notebooks/04_cache.ipynb (unless otherwise specified).
+
+__all__ = ['UCREL_Disk_Cache', 'UCREL_Memory_Cache']
+
+# Cell
+
+import collections
+import copy
+import hashlib
+import json
+from pathlib import Path
+import sqlite3
+import sys
+import threading
+import time
+from typing import Optional, Union, Dict, Any, Tuple
+
+from .ucrel_doc import UCREL_Doc
+
+class UCREL_Disk_Cache():
+    '''
+    A persistent cache of UCREL Tool Chain responses stored in a
+    [SQLite](https://docs.python.org/3/library/sqlite3.html) file. When
+    the cache is larger than `max_bytes` the least recently used
+    responses are removed.
+
+    Give an instance to `UCREL_API` through its `cache` argument so that
+    texts that have already been tagged are not sent to the server again.
+    '''
+    def __init__(self, path: Union[str, Path],
+                 max_bytes: int = 1024 ** 3) -> None:
+        '''
+        1. **path**: The SQLite file to store the cache in, it is created if
+        it does not exist.
+        2. **max_bytes**: The maximum size of all of the cached responses in
+        bytes, default 1GB.
+        '''
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        '''
+        **returns**: A connection to the SQLite file, creating the tables if
+        they do not exist.
+        '''
+        connection = sqlite3.connect(str(self.path), timeout=60,
+                                     check_same_thread=False,
+                                     isolation_level=None)
+        connection.executescript('''
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+            CREATE TABLE IF NOT EXISTS total_size (size INTEGER NOT NULL);
+            INSERT INTO total_size SELECT 0 WHERE NOT EXISTS (SELECT * FROM total_size);
+            CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses
+            BEGIN UPDATE total_size SET size = size + NEW.size; END;
+            CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses
+            BEGIN UPDATE total_size SET size = size - OLD.size; END;
+        ''')
+        return connection
+
+    @staticmethod
+    def key(server_address: str, text: str, **data_kwargs: Any) -> str:
+        '''
+        1. **server_address**: The URL the `text` is sent to.
+        2. **text**: The text sent to the server.
+        3. **data_kwargs**: Any other data sent with the text e.g. `tagset`.
+
+        **returns**: A SHA-256 hash that uniquely identifies the request.
+        '''
+        key_data = json.dumps([server_address, text, sorted(data_kwargs.items())])
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        '''
+        1. **key**: Key of the response, see `key`.
+
+        **returns**: The cached response or `None` if it is not in the cache.
+        '''
+        with self._lock:
+            row = self._connection.execute('SELECT response FROM responses WHERE key = ?',
+                                           (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._connection.execute('UPDATE responses SET last_access = ? WHERE key = ?',
+                                     (time.time(), key))
+            return row[0].decode('utf-8')
+
+    def set(self, key: str, response: str) -> None:
+        '''
+        Adds the `response` to the cache, removing the least recently used
+        responses if the cache is larger than `max_bytes`.
+
+        1. **key**: Key of the response, see `key`.
+        2. **response**: The response to cache.
+        '''
+        encoded_response = response.encode('utf-8')
+        with self._lock:
+            connection = self._connection
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+                connection.execute('INSERT INTO responses VALUES (?, ?, ?, ?)',
+                                   (key, encoded_response, len(encoded_response),
+                                    time.time()))
+                total_size = connection.execute('SELECT size FROM total_size').fetchone()[0]
+                if total_size > self.max_bytes:
+                    self._evict(total_size - self.max_bytes)
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+
+    def _evict(self, excess_bytes: int) -> None:
+        '''
+        Removes the least recently used responses until at least
+        `excess_bytes` have been removed.
+
+        1. **excess_bytes**: Number of bytes to remove.
+        '''
+        evict_keys = []
+        oldest_responses = self._connection.execute('SELECT key, size FROM responses '
+                                                    'ORDER BY last_access, rowid')
+        for key, size in oldest_responses:
+            evict_keys.append((key,))
+            excess_bytes -= size
+            if excess_bytes <= 0:
+                break
+        oldest_responses.close()
+        self._connection.executemany('DELETE FROM responses WHERE key = ?', evict_keys)
+
+    def clear(self) -> None:
+        '''
+        Removes all responses from the cache and resets the hit and miss
+        counters.
+        '''
+        with self._lock:
+            self._connection.execute('DELETE FROM responses')
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def size(self) -> int:
+        '''
+        **returns**: The size of all of the cached responses in bytes.
+        '''
+        with self._lock:
+            return self._connection.execute('SELECT size FROM total_size').fetchone()[0]
+
+    def __len__(self) -> int:
+        '''
+        **returns**: The number of cached responses.
+        '''
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        '''
+        **returns**: The number of cache `hits` and `misses` of this instance,
+        and the number of cached `responses` and their `size` in bytes.
+        '''
+        return {'hits': self.hits, 'misses': self.misses,
+                'responses': len(self), 'size': self.size}
+
+    def close(self) -> None:
+        '''
+        Closes the connection to the SQLite file.
+        '''
+        with self._lock:
+            self._connection.close()
+
+    def __getstate__(self) -> dict:
+        '''
+        **returns**: The state of this instance without the SQLite
+        connection, which is re-opened when un-pickled.
+        '''
+        state = self.__dict__.copy()
+        del state['_connection']
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        '''
+        1. **state**: State returned by `__getstate__`.
+        '''
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._connection = self._connect()
+
+    def __repr__(self) -> str:
+        '''
+        String representation of the UCREL Disk Cache instance, format:
+
+        UCREL Disk Cache, path {self.path}, max bytes {self.max_bytes}
+        '''
+        return f'UCREL Disk Cache, path {self.path}, max bytes {self.max_bytes}'
+
+# Cell
+
+class UCREL_Memory_Cache():
+    '''
+    An in memory, least recently used, cache of `UCREL_Doc`s that is
+    bounded by the estimated size of the cached `UCREL_Doc`s in bytes
+    rather than the number of `UCREL_Doc`s.
+
+    The cache stores and returns copies of the `UCREL_Doc`s, so that
+    changing a `UCREL_Doc` returned from the cache does not change the
+    cached `UCREL_Doc`.
+
+    Give an instance to `UCREL_API` through its `memory_cache` argument so
+    that `UCREL_API.usas` returns the cached `UCREL_Doc` of texts that
+    have already been tagged.
+    '''
+    def __init__(self, max_bytes: int = 100 * 1024 ** 2) -> None:
+        '''
+        1. **max_bytes**: The maximum estimated size of all of the cached
+        `UCREL_Doc`s in bytes, default 100MB.
+        '''
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        self._ucrel_docs: 'collections.OrderedDict[str, Tuple[UCREL_Doc, int]]' = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    key = staticmethod(UCREL_Disk_Cache.key)
+
+    @staticmethod
+    def estimate_size(ucrel_doc: UCREL_Doc) -> int:
+        '''
+        1. **ucrel_doc**: The `UCREL_Doc` to estimate the size of.
+
+        **returns**: The estimated size of the `ucrel_doc` in bytes, this
+        includes the size of the text, tokens, sentence indexes, and MWE indexes.
+        '''
+        size = sys.getsizeof(ucrel_doc) + sys.getsizeof(ucrel_doc.text)
+        size += sys.getsizeof(ucrel_doc.tokens)
+        # Strings shared by many tokens, e.g. interned tags, are counted once.
+        counted_values = set()
+        for token in ucrel_doc.tokens:
+            size += sys.getsizeof(token)
+            for value in (token.text, token.lemma, token.pos_tag,
+                          token.usas_tag, token.mwe_tag):
+                if value is not None and id(value) not in counted_values:
+                    counted_values.add(id(value))
+                    size += sys.getsizeof(value)
+        if ucrel_doc._sentence_indexes is not None:
+            size += sys.getsizeof(ucrel_doc._sentence_indexes)
+            size += sum(sys.getsizeof(index) for index in ucrel_doc._sentence_indexes)
+        if ucrel_doc._mwe_indexes is not None:
+            size += sys.getsizeof(ucrel_doc._mwe_indexes)
+            size += sum(sys.getsizeof(index) for index in ucrel_doc._mwe_indexes)
+        return size
+
+    @staticmethod
+    def _copy(ucrel_doc: UCREL_Doc) -> UCREL_Doc:
+        '''
+        **returns**: A copy of the `ucrel_doc` whose tokens are copies of
+        the `ucrel_doc` tokens.
+        '''
+        sentence_indexes = ucrel_doc._sentence_indexes
+        if sentence_indexes is not None:
+            sentence_indexes = list(sentence_indexes)
+        mwe_indexes = ucrel_doc._mwe_indexes
+        if mwe_indexes is not None:
+            mwe_indexes = list(mwe_indexes)
+        return UCREL_Doc(ucrel_doc.text, tokens=[copy.copy(token) for token in ucrel_doc.tokens],
+                         sentence_indexes=sentence_indexes, mwe_indexes=mwe_indexes)
+
+    def get(self, key: str) -> Optional[UCREL_Doc]:
+        '''
+        1. **key**: Key of the `UCREL_Doc`, see `UCREL_Disk_Cache.key`.
+
+        **returns**: A copy of the cached `UCREL_Doc` or `None` if it is not
+        in the cache.
+        '''
+        with self._lock:
+            cached = self._ucrel_docs.get(key)
+            if cached is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._ucrel_docs.move_to_end(key)
+        return self._copy(cached[0])
+
+    def set(self, key: str, ucrel_doc: UCREL_Doc) -> None:
+        '''
+        Adds a copy of the `ucrel_doc` to the cache, removing the least
+        recently used `UCREL_Doc`s if the cache is larger than `max_bytes`.
+        A `UCREL_Doc` larger than `max_bytes` is not cached.
+
+        1. **key**: Key of the `UCREL_Doc`, see `UCREL_Disk_Cache.key`.
+        2. **ucrel_doc**: The `UCREL_Doc` to cache.
+        '''
+        size = self.estimate_size(ucrel_doc)
+        if size > self.max_bytes:
+            return
+        ucrel_doc = self._copy(ucrel_doc)
+        with self._lock:
+            self._remove(key)
+            self._ucrel_docs[key] = (ucrel_doc, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                oldest_key = next(iter(self._ucrel_docs))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def _remove(self, key: str) -> bool:
+        '''
+        **returns**: `True` if the `UCREL_Doc` with the `key` was in the
+        cache and has been removed.
+        '''
+        cached = self._ucrel_docs.pop(key, None)
+        if cached is None:
+            return False
+        self.size -= cached[1]
+        return True
+
+    def invalidate(self, key: str) -> bool:
+        '''
+        Removes the `UCREL_Doc` with the `key` from the cache.
+
+        1. **key**: Key of the `UCREL_Doc`, see `UCREL_Disk_Cache.key`.
+
+        **returns**: `True` if the `UCREL_Doc` was in the cache.
+        '''
+        with self._lock:
+            return self._remove(key)
+
+    def clear(self) -> None:
+        '''
+        Removes all `UCREL_Doc`s from the cache and resets the counters.
+        '''
+        with self._lock:
+            self._ucrel_docs.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self) -> int:
+        '''
+        **returns**: The number of cached `UCREL_Doc`s.
+        '''
+        return len(self._ucrel_docs)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        '''
+        **returns**: The number of cache `hits`, `misses`, and `evictions`,
+        and the number of cached `ucrel_docs` and their estimated `size`
+        in bytes.
+        '''
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'ucrel_docs': len(self),
+                'size': self.size}
+
+    def __getstate__(self) -> dict:
+        '''
+        **returns**: The state of this instance without the lock.
+        '''
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        '''
+        1. **state**: State returned by `__getstate__`.
+        '''
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        '''
+        String representation of the UCREL Memory Cache instance, format:
+
+        UCREL Memory Cache, max bytes {self.max_bytes}
+        '''
+        return f'UCREL Memory Cache, max bytes {self.max_bytes}'
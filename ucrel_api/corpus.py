@@ -0,0 +1,355 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: module_notebooks/05_corpus.ipynb (unless otherwise specified).
+
+__all__ = ['UCREL_Corpus']
+
+# Cell
+
+from array import array
+import mmap
+from pathlib import Path
+import sys
+import threading
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union
+import zlib
+
+from .ucrel_doc import UCREL_Doc
+
+class UCREL_Corpus():
+    '''
+    A corpus of `UCREL_Doc`s stored on disk as [JSON Lines](https://jsonlines.org/),
+    one `UCREL_Doc.to_json` per line, with an index file of where each
+    `UCREL_Doc` starts in the file. Any `UCREL_Doc` can be read without
+    reading the `UCREL_Doc`s before it.
+
+    The lines can also be compressed, with [zlib](https://docs.python.org/3/library/zlib.html),
+    in blocks of `docs_per_block` `UCREL_Doc`s. Reading a `UCREL_Doc` from
+    a compressed corpus decompresses the block it is in.
+
+    The index is stored next to the corpus file with the `.index` suffix
+    added e.g. `corpus.jsonl.index`.
+
+    A corpus opened with `read_only` is not written to, so it can be read
+    from a read only file or whilst another process is adding to it, the
+    `UCREL_Doc`s it has are those in the index when it was opened.
+    '''
+    # The first value of the index file, identifies the file and its version.
+    _INDEX_MAGIC = int.from_bytes(b'UCRELIX1', 'little')
+
+    def __init__(self, path: Union[str, Path], compress: bool = False,
+                 docs_per_block: int = 64, compression_level: int = 6,
+                 read_only: bool = False) -> None:
+        '''
+        1. **path**: The corpus file, it is created if it does not exist
+        and the corpus is not `read_only`.
+        2. **compress**: Whether the corpus is compressed in blocks. Ignored
+        if the corpus already exists, as it is stored in the index.
+        3. **docs_per_block**: The number of `UCREL_Doc`s in each compressed block.
+        4. **compression_level**: The zlib compression level, 1 is the
+        fastest and 9 the smallest.
+        5. **read_only**: Whether the corpus is only read. If not, anything
+        written after the last `UCREL_Doc` in the index, e.g. by a process
+        that was stopped whilst writing, is removed when it is opened.
+
+        **raises FileNotFoundError**: If the corpus is `read_only` and the
+        corpus or index file does not exist.
+
+        **raises ValueError**: If the index file is not a `UCREL_Corpus` index.
+        '''
+        self.path = Path(path)
+        self.index_path = Path(f'{self.path}.index')
+        self.docs_per_block = docs_per_block
+        self.compression_level = compression_level
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        # File offset of each Doc, for a compressed corpus the offset of
+        # its block, the offset of each Doc within its block, and the file
+        # offset of the end of its line or block.
+        self._offsets = array('Q')
+        self._block_offsets = array('Q')
+        self._end_offsets = array('Q')
+        # The end of the last line, or block, that is in the index.
+        self._end_offset = 0
+        # Lines of the block that has not been written yet.
+        self._pending_lines: List[bytes] = []
+        # The last decompressed block, (file offset, block).
+        self._block_cache: Tuple[int, bytes] = (-1, b'')
+
+        if read_only:
+            self._file = open(self.path, 'rb')
+            self._index_file: Optional[BinaryIO] = None
+        else:
+            self.path.touch(exist_ok=True)
+            self._file = open(self.path, 'r+b')
+            self._index_file = open(self.index_path, 'ab')
+        try:
+            self.compress = self._read_index(compress)
+        except (OSError, ValueError):
+            self._file.close()
+            if self._index_file is not None:
+                self._index_file.close()
+            raise
+        if not read_only:
+            # Removes anything written after the last indexed Doc,
+            # e.g. if a process was stopped whilst writing.
+            self._file.truncate(self._end_offset)
+
+    def _read_index(self, compress: bool) -> bool:
+        '''
+        Reads the index file, writing its header if it is empty and the
+        corpus is not `read_only`.
+
+        1. **compress**: Whether the corpus is compressed, only used when
+        the index is created.
+
+        **returns**: Whether the corpus is compressed.
+
+        **raises ValueError**: If the index file is not a `UCREL_Corpus` index.
+        '''
+        index_bytes = self.index_path.read_bytes()
+        if not index_bytes and not self.read_only:
+            self._write_index(array('Q', [self._INDEX_MAGIC, int(compress), 0]))
+            index_bytes = self.index_path.read_bytes()
+        index = array('Q')
+        # The header, and each Doc, is three values
+        whole_size = len(index_bytes) - len(index_bytes) % (3 * index.itemsize)
+        index.frombytes(index_bytes[:whole_size])
+        if sys.byteorder == 'big':
+            index.byteswap()
+        if not index or index[0] != self._INDEX_MAGIC:
+            raise ValueError(f'{self.index_path} is not a UCREL Corpus index file')
+        # Removes a partly written Doc, e.g. if a process was stopped whilst
+        # writing, a read only corpus ignores it.
+        if whole_size != len(index_bytes) and self._index_file is not None:
+            self._index_file.truncate(whole_size)
+        # Each Doc in the index is three values, see `_offsets`.
+        self._offsets = index[3::3]
+        self._block_offsets = index[4::3]
+        self._end_offsets = index[5::3]
+        self._end_offset = index[-1]
+        return bool(index[1])
+
+    def _write_index(self, index: array) -> None:
+        '''
+        Writes the `index` values to the end of the index file, in little endian.
+
+        1. **index**: The values to write.
+        '''
+        if sys.byteorder == 'big':
+            index = array('Q', index)
+            index.byteswap()
+        self._index_file.write(index.tobytes())
+        self._index_file.flush()
+
+    def append(self, ucrel_doc: UCREL_Doc) -> None:
+        '''
+        Adds the `ucrel_doc` to the end of the corpus. For a compressed corpus
+        the `ucrel_doc` is written to the corpus file when its block is full,
+        or when `flush` or `close` are called.
+
+        1. **ucrel_doc**: The `UCREL_Doc` to add.
+
+        **raises ValueError**: If the corpus is `read_only`.
+        '''
+        if self.read_only:
+            raise ValueError(f'Cannot add to the read only UCREL Corpus {self.path}')
+        line = ucrel_doc.to_json().encode('utf-8') + b'\n'
+        with self._lock:
+            if not self.compress:
+                self._write(line, [0])
+                return
+            self._pending_lines.append(line)
+            if len(self._pending_lines) >= self.docs_per_block:
+                self._write_block()
+
+    def extend(self, ucrel_docs: Iterable[UCREL_Doc]) -> None:
+        '''
+        1. **ucrel_docs**: The `UCREL_Doc`s to add to the end of the corpus,
+        see `append`.
+        '''
+        for ucrel_doc in ucrel_docs:
+            self.append(ucrel_doc)
+
+    def _write_block(self) -> None:
+        '''
+        Compresses and writes the lines that have not been written yet.
+        '''
+        lines = self._pending_lines
+        if not lines:
+            return
+        block_offsets = []
+        block_offset = 0
+        for line in lines:
+            block_offsets.append(block_offset)
+            block_offset += len(line)
+        block = zlib.compress(b''.join(lines), self.compression_level)
+        self._write(block, block_offsets)
+        self._pending_lines = []
+
+    def _write(self, data: bytes, block_offsets: List[int]) -> None:
+        '''
+        Writes the `data` to the end of the corpus file, then adds its Docs
+        to the index.
+
+        1. **data**: A line, or a compressed block of lines, to write.
+        2. **block_offsets**: The offset of each Doc in the `data` within
+        its block, `[0]` if the corpus is not compressed.
+        '''
+        offset = self._end_offset
+        end_offset = offset + len(data)
+        self._file.seek(offset)
+        self._file.write(data)
+        self._file.flush()
+        # The Docs are only added to the index once they have been written.
+        index = array('Q')
+        for block_offset in block_offsets:
+            index.extend([offset, block_offset, end_offset])
+        self._write_index(index)
+        self._offsets.extend(index[0::3])
+        self._block_offsets.extend(index[1::3])
+        self._end_offsets.extend(index[2::3])
+        self._end_offset = end_offset
+
+    def flush(self) -> None:
+        '''
+        Writes the `UCREL_Doc`s that are waiting for their compressed block
+        to be full.
+        '''
+        with self._lock:
+            self._write_block()
+
+    def close(self) -> None:
+        '''
+        Writes any `UCREL_Doc`s that have not been written, see `flush`, and
+        closes the corpus file.
+        '''
+        self.flush()
+        with self._lock:
+            self._file.close()
+            if self._index_file is not None:
+                self._index_file.close()
+
+    def __enter__(self) -> 'UCREL_Corpus':
+        '''
+        **returns**: This instance, the corpus is closed on exit.
+        '''
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        '''
+        Closes the corpus, see `close`.
+        '''
+        self.close()
+
+    def __len__(self) -> int:
+        '''
+        **returns**: The number of `UCREL_Doc`s in the corpus.
+        '''
+        return len(self._offsets) + len(self._pending_lines)
+
+    def _read_block(self, index: int) -> bytes:
+        '''
+        1. **index**: The index of a `UCREL_Doc` in a compressed corpus.
+
+        **returns**: The decompressed block the `UCREL_Doc` is in.
+        '''
+        offset = self._offsets[index]
+        cached_offset, block = self._block_cache
+        if cached_offset == offset:
+            return block
+        self._file.seek(offset)
+        block = zlib.decompress(self._file.read(self._end_offsets[index] - offset))
+        self._block_cache = (offset, block)
+        return block
+
+    def __getitem__(self, index: int) -> UCREL_Doc:
+        '''
+        Reads the `UCREL_Doc` at the `index` from the corpus file, only the
+        line of the `UCREL_Doc`, or the block it is in, is read.
+
+        1. **index**: The index of the `UCREL_Doc` in the corpus.
+
+        **returns**: The `UCREL_Doc` at the `index`.
+
+        **raises IndexError**: If the `index` is out of range.
+        '''
+        number_docs = len(self)
+        if index < 0:
+            index += number_docs
+        if not 0 <= index < number_docs:
+            raise IndexError(f'UCREL Doc index {index} is out of range for a '
+                             f'corpus of {number_docs} UCREL Docs')
+        with self._lock:
+            if index >= len(self._offsets):
+                line = self._pending_lines[index - len(self._offsets)]
+            elif self.compress:
+                block = self._read_block(index)
+                block_offset = self._block_offsets[index]
+                line = block[block_offset:block.index(b'\n', block_offset)]
+            else:
+                self._file.seek(self._offsets[index])
+                line = self._file.readline()
+        return UCREL_Doc.from_json(line.decode('utf-8'))
+
+    def __iter__(self) -> Iterator[UCREL_Doc]:
+        '''
+        Reads the `UCREL_Doc`s in order from a memory map of the corpus file.
+
+        **returns**: Yields each `UCREL_Doc` in the corpus, including those
+        added whilst iterating.
+        '''
+        doc_index = 0
+        while doc_index < len(self._offsets):
+            with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as corpus_map:
+                number_written = len(self._offsets)
+                while doc_index < number_written:
+                    offset = self._offsets[doc_index]
+                    end_offset = self._end_offsets[doc_index]
+                    if self.compress:
+                        # The last line of a block ends in a new line
+                        lines = zlib.decompress(corpus_map[offset:end_offset]).split(b'\n')[:-1]
+                    else:
+                        lines = [corpus_map[offset:end_offset]]
+                    doc_index += len(lines)
+                    for line in lines:
+                        yield UCREL_Doc.from_json(line.decode('utf-8'))
+        for line in list(self._pending_lines):
+            yield UCREL_Doc.from_json(line.decode('utf-8'))
+
+    def __getstate__(self) -> dict:
+        '''
+        **returns**: The state of this instance without the open files,
+        which are re-opened when un-pickled.
+
+        **raises ValueError**: If there are `UCREL_Doc`s that have not been
+        written, see `flush`.
+        '''
+        if self._pending_lines:
+            raise ValueError('Cannot pickle a UCREL Corpus with UCREL Docs that '
+                             'have not been written, call `flush` first.')
+        return {'path': self.path, 'compress': self.compress,
+                'docs_per_block': self.docs_per_block,
+                'compression_level': self.compression_level,
+                'read_only': self.read_only}
+
+    def __setstate__(self, state: dict) -> None:
+        '''
+        1. **state**: State returned by `__getstate__`.
+        '''
+        self.__init__(**state)
+
+    def __repr__(self) -> str:
+        '''
+        String representation of the UCREL Corpus instance, format:
+
+        UCREL Corpus, path {self.path}, {len(self)} UCREL Docs, compressed, read only
+
+        `, compressed` -- will only exist in string if `self.compress`
+
+        `, read only` -- will only exist in string if `self.read_only`
+        '''
+        base_repr = f'UCREL Corpus, path {self.path}, {len(self)} UCREL Docs'
+        if self.compress:
+            base_repr += ', compressed'
+        if self.read_only:
+            base_repr += ', read only'
+        return base_repr
@@ -0,0 +1,375 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: module_notebooks/07_index.ipynb (unless otherwise specified).
+
+__all__ = ['UCREL_Index']
+
+# Cell
+
+from array import array
+import bisect
+import itertools
+import json
+import sys
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .ucrel_doc import UCREL_Doc
+from .ucrel_token import UCREL_Token
+
+# A token in the index, (doc id, sentence id, token index)
+Posting = Tuple[int, Optional[int], int]
+
+def _sorted_contains(values: array, value: int) -> bool:
+    '''
+    1. **values**: Sorted values.
+    2. **value**: The value to find.
+
+    **returns**: Whether the `value` is in the `values`, found by binary search.
+    '''
+    position = bisect.bisect_left(values, value)
+    return position < len(values) and values[position] == value
+
+class UCREL_Index():
+    '''
+    An inverted index of the tokens in a collection of `UCREL_Doc`s, that
+    maps each lemma, POS tag, USAS tag, and MWE id to the tokens that have
+    it. Each token found is returned as a posting,
+    `(doc id, sentence id, token index)`, where the doc id is the order the
+    `UCREL_Doc` was added to the index, the sentence id the index of the
+    sentence in `UCREL_Doc.sentences` (`None` if the token is not in a
+    sentence), and the token index the index of the token in the `UCREL_Doc`.
+
+    The index only stores the postings, not the `UCREL_Doc`s, so keep the
+    `UCREL_Doc`s e.g. in a list or a `UCREL_Corpus` to look them up by doc id.
+
+    `UCREL_Doc`s can be added at any time, and the index can be saved to,
+    and loaded from, a binary file with `dump` and `load`.
+    '''
+    # The token values that are indexed, `mwe_id` is the doc id and the MWE
+    # id of the `UCREL_Token.mwe_tag`, as MWE ids are only unique within a
+    # Doc, e.g. `4:1` for the tag `1.2.1` in doc 4.
+    FIELDS = ('lemma', 'pos_tag', 'usas_tag', 'mwe_id')
+    # The first bytes of a file written by `dump`, identifies the file and its version.
+    _MAGIC = b'UCRELII2'
+
+    def __init__(self, ucrel_docs: Optional[Iterable[UCREL_Doc]] = None) -> None:
+        '''
+        1. **ucrel_docs**: `UCREL_Doc`s to add to the index. **Optional**
+        '''
+        # The first token id of each Doc, a token id is the index of the
+        # token across all of the Docs in the index.
+        self._doc_offsets = array('Q')
+        # The sentence id of each token, -1 if it is not in a sentence. A
+        # sentence id is the index of the sentence across all of the Docs.
+        self._sentence_ids = array('q')
+        # The first sentence id of each Doc.
+        self._doc_sentence_offsets = array('Q')
+        # The doc id of each sentence.
+        self._sentence_docs = array('Q')
+        # Field name -> value -> the token ids that have the value, in order.
+        self._postings: Dict[str, Dict[str, array]] = {field: {} for field in self.FIELDS}
+        # Field name -> the sorted values of the field, for prefix lookups,
+        # `None` when a value has been added since it was sorted.
+        self._sorted_keys: Dict[str, Optional[List[str]]] = {field: None for field in self.FIELDS}
+        if ucrel_docs is not None:
+            self.extend(ucrel_docs)
+
+    @staticmethod
+    def _token_values(token: UCREL_Token, doc_id: int) -> Tuple[Optional[str], ...]:
+        '''
+        1. **token**: The token to index.
+        2. **doc_id**: The doc id of the `UCREL_Doc` the `token` is in.
+
+        **returns**: The value of each of the `FIELDS` of the `token`.
+        '''
+        mwe_id = None
+        if token.mwe_tag is not None:
+            mwe_id = f"{doc_id}:{token.mwe_tag.partition('.')[0]}"
+        return (token.lemma, token.pos_tag, token.usas_tag, mwe_id)
+
+    def add(self, ucrel_doc: UCREL_Doc) -> int:
+        '''
+        1. **ucrel_doc**: The `UCREL_Doc` to add to the index.
+
+        **returns**: The doc id of the `ucrel_doc`.
+        '''
+        doc_id = len(self._doc_offsets)
+        token_offset = len(self._sentence_ids)
+        sentence_offset = len(self._sentence_docs)
+        sentence_indexes = ucrel_doc._sentence_indexes or []
+        doc_sentence_ids = array('q', [-1]) * len(ucrel_doc)
+        for sentence_id, (start_index, end_index) in enumerate(sentence_indexes, sentence_offset):
+            doc_sentence_ids[start_index:end_index] = array('q', [sentence_id]) * (end_index - start_index)
+
+        field_postings = [self._postings[field] for field in self.FIELDS]
+        for token_id, token in enumerate(ucrel_doc, token_offset):
+            for field_index, value in enumerate(self._token_values(token, doc_id)):
+                if value is None:
+                    continue
+                postings = field_postings[field_index]
+                if value not in postings:
+                    postings[value] = array('Q')
+                    self._sorted_keys[self.FIELDS[field_index]] = None
+                postings[value].append(token_id)
+        self._doc_offsets.append(token_offset)
+        self._sentence_ids.extend(doc_sentence_ids)
+        self._doc_sentence_offsets.append(sentence_offset)
+        self._sentence_docs.extend(array('Q', [doc_id]) * len(sentence_indexes))
+        return doc_id
+
+    def extend(self, ucrel_docs: Iterable[UCREL_Doc]) -> None:
+        '''
+        1. **ucrel_docs**: The `UCREL_Doc`s to add to the index, see `add`.
+        '''
+        for ucrel_doc in ucrel_docs:
+            self.add(ucrel_doc)
+
+    def __len__(self) -> int:
+        '''
+        **returns**: The number of `UCREL_Doc`s in the index.
+        '''
+        return len(self._doc_offsets)
+
+    @property
+    def number_tokens(self) -> int:
+        '''
+        **returns**: The number of tokens in the index.
+        '''
+        return len(self._sentence_ids)
+
+    def _check_field(self, field: str) -> None:
+        '''
+        **raises ValueError**: If the `field` is not one of the `FIELDS`.
+        '''
+        if field not in self._postings:
+            raise ValueError(f'{field} is not an indexed field, the indexed '
+                             f'fields are: {self.FIELDS}')
+
+    def keys(self, field: str) -> List[str]:
+        '''
+        1. **field**: One of the `FIELDS`.
+
+        **returns**: The values of the `field` in the index, sorted.
+
+        **raises ValueError**: If the `field` is not one of the `FIELDS`.
+        '''
+        self._check_field(field)
+        sorted_keys = self._sorted_keys[field]
+        if sorted_keys is None:
+            sorted_keys = sorted(self._postings[field])
+            self._sorted_keys[field] = sorted_keys
+        return sorted_keys
+
+    def _prefix_keys(self, field: str, prefix: str) -> Iterator[str]:
+        '''
+        USAS tags are hierarchical, e.g. `A1.1.1` is within `A1`, so a
+        prefix that ends in a digit only matches values where the prefix is
+        not followed by another digit, e.g. `A1` matches `A1`, `A1.1.1`,
+        and `A1+` but not `A11.1`.
+
+        1. **field**: One of the `FIELDS`.
+        2. **prefix**: The prefix of the values to find.
+
+        **returns**: Yields the values of the `field` that start with the `prefix`.
+        '''
+        sorted_keys = self.keys(field)
+        prefix_length = len(prefix)
+        ends_in_digit = prefix[-1:].isdigit()
+        for key_index in range(bisect.bisect_left(sorted_keys, prefix), len(sorted_keys)):
+            key = sorted_keys[key_index]
+            if not key.startswith(prefix):
+                break
+            if ends_in_digit and key[prefix_length:prefix_length + 1].isdigit():
+                continue
+            yield key
+
+    def _token_ids(self, field: str, value: str, prefix: bool) -> array:
+        '''
+        1. **field**: One of the `FIELDS`.
+        2. **value**: The value, or prefix, of the `field` to find.
+        3. **prefix**: Whether the `value` is a prefix, see `_prefix_keys`.
+
+        **returns**: The ids of the tokens found, in order.
+
+        **raises ValueError**: If the `field` is not one of the `FIELDS`.
+        '''
+        if not prefix:
+            self._check_field(field)
+            return self._postings[field].get(value, array('Q'))
+        postings = [self._postings[field][key] for key in self._prefix_keys(field, value)]
+        if len(postings) == 1:
+            return postings[0]
+        # Sorting the concatenated runs of ids merges them.
+        return array('Q', sorted(itertools.chain.from_iterable(postings)))
+
+    def _search_token_ids(self, prefix: Union[bool, Iterable[str]],
+                          criteria: Dict[str, str]) -> List[int]:
+        '''
+        **returns**: The ids of the tokens that match all of the `criteria`,
+        in order, see `search`.
+        '''
+        if not criteria:
+            raise ValueError('At least one field to search by is required, '
+                             f'the indexed fields are: {self.FIELDS}')
+        if isinstance(prefix, bool):
+            prefix_fields = set(criteria) if prefix else set()
+        else:
+            prefix_fields = set(prefix)
+        token_ids = sorted((self._token_ids(field, value, field in prefix_fields)
+                            for field, value in criteria.items()), key=len)
+        # Intersect the smallest with the others.
+        matched_ids = token_ids[0].tolist()
+        for other_ids in token_ids[1:]:
+            if len(matched_ids) * 32 < len(other_ids):
+                matched_ids = [token_id for token_id in matched_ids
+                               if _sorted_contains(other_ids, token_id)]
+            else:
+                matched_ids = sorted(set(matched_ids).intersection(other_ids))
+        return matched_ids
+
+    def _postings_of(self, token_ids: Iterable[int]) -> Iterator[Posting]:
+        '''
+        1. **token_ids**: Token ids in order.
+
+        **returns**: Yields the posting of each token id.
+        '''
+        doc_offsets = self._doc_offsets
+        doc_sentence_offsets = self._doc_sentence_offsets
+        sentence_ids = self._sentence_ids
+        number_docs = len(doc_offsets)
+        doc_id = 0
+        for token_id in token_ids:
+            # Docs with no tokens have the same offset as the next Doc.
+            if doc_id + 1 < number_docs and doc_offsets[doc_id + 1] <= token_id:
+                doc_id = bisect.bisect_right(doc_offsets, token_id, doc_id + 1) - 1
+            sentence_id: Optional[int] = None
+            if sentence_ids[token_id] != -1:
+                sentence_id = sentence_ids[token_id] - doc_sentence_offsets[doc_id]
+            yield (doc_id, sentence_id, token_id - doc_offsets[doc_id])
+
+    def search(self, prefix: Union[bool, Iterable[str]] = False,
+               **criteria: str) -> List[Posting]:
+        '''
+        Finds the tokens that match all of the `criteria` e.g.
+        `search(lemma='bank', pos_tag='NN1')`.
+
+        1. **prefix**: Whether the `criteria` values are prefixes, `True`
+        for all of them or the fields whose values are prefixes e.g.
+        `['usas_tag']`. For hierarchical USAS tags a prefix that ends in a
+        digit does not match a longer number e.g. `A1` matches `A1.1.1` but
+        not `A11`.
+        2. **criteria**: Field name, from `FIELDS`, and the value of that
+        field to match. The `mwe_id` value is `{doc id}:{MWE id}` e.g.
+        `search(mwe_id='4:1')` finds the tokens of MWE 1 in doc 4, and
+        `search(mwe_id='4', prefix=True)` the tokens of all of the MWEs in doc 4.
+
+        **returns**: The posting, `(doc id, sentence id, token index)`, of each
+        token found, in order.
+
+        **raises ValueError**: If there are no `criteria` or a field is not
+        one of the `FIELDS`.
+        '''
+        return list(self._postings_of(self._search_token_ids(prefix, criteria)))
+
+    def count(self, prefix: Union[bool, Iterable[str]] = False, **criteria: str) -> int:
+        '''
+        **returns**: The number of tokens that match all of the `criteria`,
+        see `search` for the arguments.
+
+        **raises ValueError**: If there are no `criteria` or a field is not
+        one of the `FIELDS`.
+        '''
+        return len(self._search_token_ids(prefix, criteria))
+
+    def sentences(self, prefix: Union[bool, Iterable[str]] = False,
+                  **criteria: str) -> List[Tuple[int, int]]:
+        '''
+        Finds the sentences that have a token that matches all of the
+        `criteria`, see `search` for the arguments.
+
+        **returns**: The `(doc id, sentence id)` of each sentence found, in
+        order. The sentence is `list(ucrel_docs[doc_id].sentences)[sentence_id]`.
+
+        **raises ValueError**: If there are no `criteria` or a field is not
+        one of the `FIELDS`.
+        '''
+        token_ids = self._search_token_ids(prefix, criteria)
+        # The sentence ids of the tokens are in order, as the token ids are.
+        sentence_ids = dict.fromkeys(map(self._sentence_ids.__getitem__, token_ids))
+        # Tokens that are not in a sentence
+        sentence_ids.pop(-1, None)
+        sentences: List[Tuple[int, int]] = []
+        for sentence_id in sentence_ids:
+            doc_id = self._sentence_docs[sentence_id]
+            sentences.append((doc_id, sentence_id - self._doc_sentence_offsets[doc_id]))
+        return sentences
+
+    def dump(self, fp: BinaryIO) -> None:
+        '''
+        Writes the index to the binary file `fp`, it can be read back with `load`.
+
+        1. **fp**: A file opened in binary write mode e.g. `open('corpus.index', 'wb')`.
+        '''
+        arrays = [self._doc_offsets, self._sentence_ids,
+                  self._doc_sentence_offsets, self._sentence_docs]
+        fields: Dict[str, List[Tuple[str, int]]] = {}
+        for field in self.FIELDS:
+            fields[field] = []
+            for key, token_ids in self._postings[field].items():
+                fields[field].append((key, len(token_ids)))
+                arrays.append(token_ids)
+        header = json.dumps({'number_docs': len(self._doc_offsets),
+                             'number_tokens': len(self._sentence_ids),
+                             'number_sentences': len(self._sentence_docs),
+                             'fields': fields}).encode('utf-8')
+        fp.write(self._MAGIC)
+        fp.write(len(header).to_bytes(8, 'little'))
+        fp.write(header)
+        # The arrays are stored in little endian.
+        for values in arrays:
+            if sys.byteorder == 'big':
+                values = array(values.typecode, values)
+                values.byteswap()
+            fp.write(values.tobytes())
+
+    @staticmethod
+    def load(fp: BinaryIO) -> 'UCREL_Index':
+        '''
+        1. **fp**: A binary file written by `dump` e.g. `open('corpus.index', 'rb')`.
+
+        **returns**: The index in the file.
+
+        **raises ValueError**: If the file was not written by `dump`.
+        '''
+        if fp.read(len(UCREL_Index._MAGIC)) != UCREL_Index._MAGIC:
+            raise ValueError('The file is not a UCREL Index file.')
+        header_length = int.from_bytes(fp.read(8), 'little')
+        header = json.loads(fp.read(header_length).decode('utf-8'))
+
+        def read_array(typecode: str, length: int) -> array:
+            values = array(typecode)
+            number_bytes = length * values.itemsize
+            data = fp.read(number_bytes)
+            if len(data) != number_bytes:
+                raise ValueError('The UCREL Index file is truncated.')
+            values.frombytes(data)
+            if sys.byteorder == 'big':
+                values.byteswap()
+            return values
+
+        index = UCREL_Index()
+        index._doc_offsets = read_array('Q', header['number_docs'])
+        index._sentence_ids = read_array('q', header['number_tokens'])
+        index._doc_sentence_offsets = read_array('Q', header['number_docs'])
+        index._sentence_docs = read_array('Q', header['number_sentences'])
+        for field in UCREL_Index.FIELDS:
+            postings = index._postings[field]
+            for key, length in header['fields'][field]:
+                postings[key] = read_array('Q', length)
+        return index
+
+    def __repr__(self) -> str:
+        '''
+        String representation of the UCREL Index instance, format:
+
+        UCREL Index, {len(self)} UCREL Docs, {self.number_tokens} tokens
+        '''
+        return f'UCREL Index, {len(self)} UCREL Docs, {self.number_tokens} tokens'
@@ -0,0 +1,143 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: module_notebooks/09_metrics.ipynb (unless otherwise specified).
+
+__all__ = ['UCREL_Metrics']
+
+# Cell
+
+import contextlib
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional, Union
+
+class UCREL_Metrics():
+    '''
+    Counters and timers of the work done by a `UCREL_API`, e.g. the time
+    spent escaping the texts, waiting for and downloading the responses,
+    and parsing them, and the number of bytes sent and received. Given to a
+    `UCREL_API` through its `metrics` argument, when a `UCREL_API` has no
+    `metrics` nothing is recorded.
+
+    The counters and timers can be read with `snapshot` and/or sent as they
+    are recorded to a `hook`, e.g. to forward them to a metrics system
+    such as [StatsD](https://github.com/statsd/statsd) or
+    [Prometheus](https://prometheus.io/). An instance can be shared by
+    many threads.
+    '''
+    # Timers, the number of times, total and longest time in seconds of:
+    # escape -- SGML entity escaping a text.
+    # request -- sending a request until the response headers are received,
+    # including any retries.
+    # download -- receiving the response body after the headers.
+    # parse -- parsing a USAS response into `UCREL_Doc`s.
+    TIMERS = ('escape', 'request', 'download', 'parse')
+    # Counters, the number of:
+    # requests -- requests made to the server that returned a response.
+    # errors -- requests that raised an exception.
+    # retries -- retries of the requests, see `UCREL_API` `max_retries`.
+    # bytes_sent -- bytes of the request bodies.
+    # bytes_received -- bytes of the response bodies.
+    # tokens -- tokens parsed from the responses.
+    # cache_hits -- responses found in the `UCREL_API` `cache`.
+    # memory_cache_hits -- `UCREL_Doc`s found in the `UCREL_API` `memory_cache`.
+    COUNTERS = ('requests', 'errors', 'retries', 'bytes_sent', 'bytes_received',
+                'tokens', 'cache_hits', 'memory_cache_hits')
+
+    def __init__(self, hook: Optional[Callable[[str, Union[int, float]], None]] = None) -> None:
+        '''
+        1. **hook**: Called with the name and value of each count and time
+        as it is recorded, e.g. `hook('bytes_sent', 1024)` or
+        `hook('parse_seconds', 0.01)`. The name of a time is the timer name
+        followed by `_seconds`. **Optional**
+        '''
+        self.hook = hook
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        '''
+        Sets all of the counters and timers to 0.
+        '''
+        with self._lock:
+            self._counts: Dict[str, int] = dict.fromkeys(self.COUNTERS, 0)
+            # Timer name -> [number of times, total seconds, longest seconds]
+            self._timers: Dict[str, list] = {name: [0, 0.0, 0.0] for name in self.TIMERS}
+
+    def count(self, name: str, value: int = 1) -> None:
+        '''
+        1. **name**: One of the `COUNTERS`.
+        2. **value**: The amount to add to the counter.
+        '''
+        with self._lock:
+            self._counts[name] += value
+        if self.hook is not None:
+            self.hook(name, value)
+
+    def time(self, name: str, seconds: float) -> None:
+        '''
+        1. **name**: One of the `TIMERS`.
+        2. **seconds**: The time to add to the timer.
+        '''
+        with self._lock:
+            timer = self._timers[name]
+            timer[0] += 1
+            timer[1] += seconds
+            if seconds > timer[2]:
+                timer[2] = seconds
+        if self.hook is not None:
+            self.hook(f'{name}_seconds', seconds)
+
+    @contextlib.contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        '''
+        Context manager that adds the time taken by its block to a timer,
+        even if the block raises an exception.
+
+        1. **name**: One of the `TIMERS`.
+        '''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.time(name, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Union[int, float]]:
+        '''
+        **returns**: The value of each of the `COUNTERS`, and for each of the
+        `TIMERS` e.g. `parse`, the number of times `parse_calls`, the total
+        time `parse_seconds`, and the longest time `parse_max_seconds`.
+        The values are copies, which can be serialised as JSON.
+        '''
+        with self._lock:
+            snapshot: Dict[str, Union[int, float]] = dict(self._counts)
+            for name, (calls, seconds, max_seconds) in self._timers.items():
+                snapshot[f'{name}_calls'] = calls
+                snapshot[f'{name}_seconds'] = seconds
+                snapshot[f'{name}_max_seconds'] = max_seconds
+        return snapshot
+
+    def __getstate__(self) -> dict:
+        '''
+        **returns**: The state of this instance without its lock, so that a
+        `UCREL_API` with metrics can be used by a process pool. Each process
+        records to its own copy.
+        '''
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        '''
+        1. **state**: State returned by `__getstate__`.
+        '''
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        '''
+        String representation of the UCREL Metrics instance, format:
+
+        UCREL Metrics, {requests} requests, {tokens} tokens, {errors} errors
+        '''
+        snapshot = self.snapshot()
+        return (f'UCREL Metrics, {snapshot["requests"]} requests, '
+                f'{snapshot["tokens"]} tokens, {snapshot["errors"]} errors')
@@ -0,0 +1,393 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: module_notebooks/10_pipeline.ipynb (unless otherwise specified).
+
+__all__ = ['read_documents', 'UCREL_Pipeline', 'main']
+
+# Cell
+
+import argparse
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import json
+import math
+import os
+from pathlib import Path
+import random
+import sys
+import threading
+import time
+from typing import Container, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import requests
+
+from .adaptive import UCREL_Rate_Limiter, UCREL_Adaptive_Controller
+from .api import UCREL_API
+from .corpus import UCREL_Corpus
+from .ucrel_doc import UCREL_Doc
+
+def read_documents(paths: Iterable[Union[str, Path]], pattern: str = '*.txt',
+                   lines: bool = False, skip_ids: Container[str] = ()
+                   ) -> Iterator[Tuple[str, str]]:
+    '''
+    Reads the documents, as UTF-8 text, from files and directories one at
+    a time.
+
+    1. **paths**: Files and/or directories. The files in a directory, and
+    its sub-directories, whose names match the `pattern` are read in
+    sorted order.
+    2. **pattern**: The [glob pattern](https://docs.python.org/3/library/pathlib.html#pathlib.Path.glob)
+    of the file names to read from a directory.
+    3. **lines**: If `True` each non empty line of a file is a document,
+    else each file is a document.
+    4. **skip_ids**: The ids of documents that are not read, e.g. the
+    documents a `UCREL_Pipeline` has already tagged.
+
+    **returns**: The `(id, text)` of each document. The id of a file is its
+    path, the id of a file in a directory is its path relative to the
+    directory. The id of a line is the id of its file followed by `:` and
+    its line number, starting at 1.
+
+    **raises FileNotFoundError**: If a path does not exist.
+    '''
+    for path in map(Path, paths):
+        if path.is_dir():
+            files = sorted((file_path, file_path.relative_to(path).as_posix())
+                           for file_path in path.rglob(pattern) if file_path.is_file())
+        elif path.exists():
+            files = [(path, path.as_posix())]
+        else:
+            raise FileNotFoundError(f'{path} does not exist')
+        for file_path, file_id in files:
+            if not lines:
+                if file_id not in skip_ids:
+                    yield file_id, file_path.read_text(encoding='utf-8')
+                continue
+            with open(file_path, 'r', encoding='utf-8') as text_file:
+                for line_number, line in enumerate(text_file, 1):
+                    line_id = f'{file_id}:{line_number}'
+                    if line.strip() and line_id not in skip_ids:
+                        yield line_id, line.rstrip('\n')
+
+class UCREL_Pipeline():
+    '''
+    Tags a stream of documents with USAS using many threads, and appends
+    the `UCREL_Doc`s to a `UCREL_Corpus` as they are tagged. The id of each
+    tagged document, and where it is in the corpus, is recorded in a
+    checkpoint file next to the corpus with the `.checkpoint` suffix added
+    e.g. `corpus.jsonl.checkpoint`. If the pipeline is stopped, e.g. by a
+    crash or a server outage, running it again on the same documents only
+    tags the documents that are not in the checkpoint.
+
+    Requests can be limited to a number per second, see
+    `UCREL_Rate_Limiter`. When a request fails with a connection error, a
+    timeout, or a status code of 429 or 5xx, all of the threads wait before
+    their next request, the wait doubles with each failed attempt at the
+    same document up to `max_backoff` seconds, so that an overloaded
+    server is given time to recover. Any other error, e.g. a status code
+    of 404, is not retried and the document is recorded as failed.
+    '''
+    def __init__(self, ucrel_api: UCREL_API, output: Union[str, Path],
+                 tagset: str = 'c7', workers: int = 4,
+                 requests_per_second: Optional[float] = None,
+                 burst: Optional[float] = None, max_attempts: int = 5,
+                 backoff_factor: float = 1.0, max_backoff: float = 60.0,
+                 max_chars: Optional[int] = None, compress: bool = False) -> None:
+        '''
+        1. **ucrel_api**: The `UCREL_API` used to tag the documents. Its
+        `pool_maxsize` should be at least `workers`.
+        2. **output**: The `UCREL_Corpus` file to append the `UCREL_Doc`s to,
+        it is created if it does not exist.
+        3. **tagset**: The tagset to be used by USAS. Either `c5` or `c7`.
+        4. **workers**: The number of documents to tag at the same time.
+        5. **requests_per_second**: The most requests to make per second,
+        by default there is no limit. **Optional**
+        6. **burst**: The most requests that can be made at once, see
+        `UCREL_Rate_Limiter`. **Optional**
+        7. **max_attempts**: The number of times a document is sent, when
+        its requests fail with an error that is retried, before it is
+        recorded as failed.
+        8. **backoff_factor**: Wait `backoff_factor * (2 ** (attempt - 1))`
+        seconds, with random jitter, after a failed attempt.
+        9. **max_backoff**: The longest wait in seconds after a failed attempt.
+        10. **max_chars**: Documents longer than this are tagged in chunks,
+        see `UCREL_API.usas_chunked`, each chunk counts as one request. By
+        default the `chunk_chars` of the `ucrel_api` `controller`, or 20000
+        without a `controller`.
+        11. **compress**: Whether a new corpus is compressed, see `UCREL_Corpus`.
+
+        **raises ValueError**: If `workers` or `max_attempts` is less than 1.
+        '''
+        if workers < 1:
+            raise ValueError(f'`workers` has to be at least 1 and not {workers}')
+        if max_attempts < 1:
+            raise ValueError(f'`max_attempts` has to be at least 1 and not {max_attempts}')
+        self.ucrel_api = ucrel_api
+        self.tagset = tagset
+        self.workers = workers
+        self.rate_limiter: Optional[UCREL_Rate_Limiter] = None
+        if requests_per_second is not None:
+            self.rate_limiter = UCREL_Rate_Limiter(requests_per_second, burst)
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_chars = max_chars
+        # The ids of the documents that failed and their last exception,
+        # they are tagged again when the pipeline is next run.
+        self.failed: List[Tuple[str, Exception]] = []
+        # No thread makes a request until this `time.monotonic` time.
+        self._pause_until = 0.0
+        self._pause_lock = threading.Lock()
+
+        self.corpus = UCREL_Corpus(output, compress=compress)
+        self.checkpoint_path = Path(f'{self.corpus.path}.checkpoint')
+        # Document id -> its index in the corpus
+        self.done: Dict[str, int] = self._read_checkpoint()
+        self._checkpoint_file = open(self.checkpoint_path, 'a', encoding='utf-8')
+
+    def _read_checkpoint(self) -> Dict[str, int]:
+        '''
+        Reads the checkpoint file, an id is only done if its `UCREL_Doc` was
+        written to the corpus. If the checkpoint has ids that are not done
+        it is re-written without them.
+
+        **returns**: The id of each document in the corpus and its index.
+        '''
+        if not self.checkpoint_path.exists():
+            return {}
+        done: Dict[str, int] = {}
+        number_lines = 0
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as checkpoint_file:
+            for line in checkpoint_file:
+                number_lines += 1
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A partly written line, e.g. if a process was stopped whilst writing.
+                    continue
+                if entry['index'] < len(self.corpus):
+                    done.setdefault(entry['id'], entry['index'])
+        if len(done) != number_lines:
+            temp_path = Path(f'{self.checkpoint_path}.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as temp_file:
+                for doc_id, index in done.items():
+                    temp_file.write(json.dumps({'id': doc_id, 'index': index}) + '\n')
+            os.replace(temp_path, self.checkpoint_path)
+        return done
+
+    def _wait(self, number_requests: int) -> None:
+        '''
+        Waits until requests can be made, see `_backoff`, then until the
+        rate limiter allows `number_requests` requests.
+        '''
+        pause_seconds = self._pause_until - time.monotonic()
+        if pause_seconds > 0:
+            time.sleep(pause_seconds)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(number_requests)
+
+    def _backoff(self, attempt: int) -> None:
+        '''
+        Pauses all of the threads after a failed `attempt`, see `_wait`.
+
+        1. **attempt**: The number of the attempt that failed, starting at 1.
+        '''
+        backoff = min(self.max_backoff, self.backoff_factor * (2 ** (attempt - 1)))
+        # Jitter stops the threads from all retrying at the same time.
+        backoff *= random.uniform(0.5, 1.0)
+        with self._pause_lock:
+            self._pause_until = max(self._pause_until, time.monotonic() + backoff)
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        '''
+        1. **error**: The exception raised by a request.
+
+        **returns**: Whether the request can be tried again, a connection
+        error, a timeout, or a status code of 429 or 5xx.
+        '''
+        if isinstance(error, (requests.exceptions.ConnectionError,
+                              requests.exceptions.Timeout)):
+            return True
+        if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+            status_code = error.response.status_code
+            return status_code == 429 or 500 <= status_code < 600
+        return False
+
+    def _tag(self, text: str) -> Tuple[Union[UCREL_Doc, Exception], int]:
+        '''
+        1. **text**: The document to tag.
+
+        **returns**: The `UCREL_Doc` of the `text`, or the exception raised
+        by its last attempt, and the number of attempts that failed. Only
+        the errors in `_is_retryable` are tried again.
+        '''
+        if not text.strip():
+            return UCREL_Doc(text, tokens=[], sentence_indexes=[]), 0
+        max_chars = self.max_chars
+        if max_chars is None:
+            max_chars = self.ucrel_api._max_chars()
+        number_requests = max(1, math.ceil(len(text) / max_chars))
+        attempt = 1
+        while True:
+            self._wait(number_requests)
+            try:
+                if number_requests == 1:
+                    return self.ucrel_api.usas(text, tagset=self.tagset), attempt - 1
+                return (self.ucrel_api.usas_chunked(text, tagset=self.tagset,
+                                                    max_chars=max_chars), attempt - 1)
+            except Exception as error:
+                if attempt == self.max_attempts or not self._is_retryable(error):
+                    return error, attempt
+                self._backoff(attempt)
+            attempt += 1
+
+    def _write(self, doc_id: str, ucrel_doc: UCREL_Doc) -> None:
+        '''
+        Appends the `ucrel_doc` to the corpus. Its id is written to the
+        checkpoint first, so that it is only done once the corpus has it.
+        '''
+        index = len(self.corpus)
+        self._checkpoint_file.write(json.dumps({'id': doc_id, 'index': index}) + '\n')
+        self._checkpoint_file.flush()
+        self.corpus.append(ucrel_doc)
+        self.done[doc_id] = index
+
+    def run(self, documents: Iterable[Tuple[str, str]]) -> Dict[str, int]:
+        '''
+        Tags the documents that are not `done`, at most `workers` at a time,
+        and appends them to the corpus in the order they finish. Only a few
+        documents per worker are read ahead of those being tagged, so
+        `documents` can be a large stream e.g. `read_documents`.
+
+        1. **documents**: The `(id, text)` of each document, documents with
+        the same id as a document that is done are skipped.
+
+        **returns**: The number of documents `tagged`, `skipped` as they are
+        already done, `failed`, see `self.failed`, and the
+        number of `retries`.
+        '''
+        summary = {'tagged': 0, 'skipped': 0, 'failed': 0, 'retries': 0}
+        # Future -> id of the document it is tagging
+        in_flight: Dict[Future, str] = {}
+
+        def write_finished(block: bool) -> None:
+            finished, _ = wait(in_flight, timeout=None if block else 0,
+                               return_when=FIRST_COMPLETED)
+            for future in finished:
+                doc_id = in_flight.pop(future)
+                ucrel_doc, failed_attempts = future.result()
+                if isinstance(ucrel_doc, Exception):
+                    summary['failed'] += 1
+                    summary['retries'] += failed_attempts - 1
+                    self.failed.append((doc_id, ucrel_doc))
+                    continue
+                summary['tagged'] += 1
+                summary['retries'] += failed_attempts
+                self._write(doc_id, ucrel_doc)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for doc_id, text in documents:
+                if doc_id in self.done or doc_id in in_flight.values():
+                    summary['skipped'] += 1
+                    continue
+                in_flight[pool.submit(self._tag, text)] = doc_id
+                write_finished(block=len(in_flight) >= self.workers * 2)
+            while in_flight:
+                write_finished(block=True)
+        self.corpus.flush()
+        return summary
+
+    def close(self) -> None:
+        '''
+        Writes any `UCREL_Doc`s that have not been written and closes the
+        corpus and the checkpoint file.
+        '''
+        self.corpus.close()
+        self._checkpoint_file.close()
+
+    def __enter__(self) -> 'UCREL_Pipeline':
+        '''
+        **returns**: This instance, the corpus is closed on exit.
+        '''
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        '''
+        Closes the corpus and the checkpoint file, see `close`.
+        '''
+        self.close()
+
+    def __repr__(self) -> str:
+        '''
+        String representation of the UCREL Pipeline instance, format:
+
+        UCREL Pipeline, output {self.corpus.path}, {len(self.done)} documents done, {self.workers} workers
+        '''
+        return (f'UCREL Pipeline, output {self.corpus.path}, {len(self.done)} documents done, '
+                f'{self.workers} workers')
+
+# Cell
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    '''
+    Command line interface of the `UCREL_Pipeline`, installed as the
+    `ucrel-pipeline` command, run `ucrel-pipeline --help` for its arguments.
+
+    1. **argv**: The command line arguments, by default `sys.argv[1:]`.
+
+    **returns**: The exit status, 1 if any document failed else 0.
+    '''
+    parser = argparse.ArgumentParser(prog='ucrel-pipeline',
+                                     description='Tags text files with USAS, appending the '
+                                                 'UCREL Docs to a UCREL Corpus. Run again with '
+                                                 'the same output to resume.')
+    parser.add_argument('inputs', nargs='+', help='Text files and/or directories of text files.')
+    parser.add_argument('--output', required=True, help='The UCREL Corpus file to append to.')
+    parser.add_argument('--email', required=True, help='Email address of the user.')
+    parser.add_argument('--server-address', default='http://ucrel-api.lancaster.ac.uk')
+    parser.add_argument('--port', default='')
+    parser.add_argument('--timeout', type=int, default=60)
+    parser.add_argument('--tagset', default='c7', choices=['c5', 'c7'])
+    parser.add_argument('--pattern', default='*.txt',
+                        help='Glob pattern of the file names to read from a directory.')
+    parser.add_argument('--lines', action='store_true',
+                        help='Each non empty line of a file is a document.')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests-per-second', type=float)
+    parser.add_argument('--burst', type=float)
+    parser.add_argument('--max-attempts', type=int, default=5)
+    parser.add_argument('--backoff-factor', type=float, default=1.0)
+    parser.add_argument('--max-backoff', type=float, default=60.0)
+    parser.add_argument('--max-chars', type=int,
+                        help='Documents longer than this are tagged in chunks, by '
+                             'default 20000 or adapted with --adaptive.')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Adapt the chunk size and number of concurrent requests '
+                             'to the server, up to --workers requests at once.')
+    parser.add_argument('--target-latency', type=float, default=10.0,
+                        help='Seconds each request should take with --adaptive.')
+    parser.add_argument('--compress', action='store_true', help='Compress a new UCREL Corpus.')
+    args = parser.parse_args(argv)
+
+    controller = None
+    if args.adaptive:
+        controller = UCREL_Adaptive_Controller(target_latency=args.target_latency,
+                                               initial_concurrency=min(4, args.workers),
+                                               max_concurrency=args.workers)
+    ucrel_api = UCREL_API(args.email, args.server_address, port=args.port,
+                          timeout=args.timeout, pool_maxsize=args.workers,
+                          controller=controller)
+    with ucrel_api, UCREL_Pipeline(ucrel_api, args.output, tagset=args.tagset,
+                                   workers=args.workers,
+                                   requests_per_second=args.requests_per_second,
+                                   burst=args.burst, max_attempts=args.max_attempts,
+                                   backoff_factor=args.backoff_factor,
+                                   max_backoff=args.max_backoff, max_chars=args.max_chars,
+                                   compress=args.compress) as pipeline:
+        documents = read_documents(args.inputs, pattern=args.pattern, lines=args.lines,
+                                   skip_ids=pipeline.done)
+        summary = pipeline.run(documents)
+        print(f'{summary["tagged"]} tagged, {summary["failed"]} failed, '
+              f'{summary["retries"]} retries, {len(pipeline.done)} documents in '
+              f'{pipeline.corpus.path}')
+        for doc_id, error in pipeline.failed:
+            print(f'Failed {doc_id}: {error}', file=sys.stderr)
+    return 1 if summary['failed'] else 0
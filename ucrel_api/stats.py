@@ -0,0 +1,238 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: module_notebooks/08_stats.ipynb (unless otherwise specified).
+
+__all__ = ['UCREL_Stats']
+
+# Cell
+
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .ucrel_doc import UCREL_Doc, UCREL_Columnar_Doc
+
+class _Vocab(dict):
+    '''
+    Maps each value to its id, a value that is not in the vocabulary is
+    given the next id when it is looked up.
+    '''
+    def __missing__(self, value: Optional[str]) -> int:
+        value_id = len(self)
+        self[value] = value_id
+        return value_id
+
+def _log_likelihood_terms(observed: 'numpy.ndarray', expected: 'numpy.ndarray') -> 'numpy.ndarray':
+    '''
+    **returns**: `observed * ln(observed / expected)` of each value, which
+    is 0 when `observed` is 0.
+    '''
+    terms = numpy.zeros(len(observed), dtype=numpy.float64)
+    non_zero = observed > 0
+    terms[non_zero] = observed[non_zero] * numpy.log(observed[non_zero] / expected[non_zero])
+    return terms
+
+class UCREL_Stats():
+    '''
+    Corpus statistics, frequencies, cross tabulations, and keyness, of a
+    collection of `UCREL_Doc`s. The token attributes of all of the
+    `UCREL_Doc`s are stored as [NumPy](https://numpy.org/) arrays of
+    integer ids, one array per attribute, which are counted with vectorised
+    NumPy operations rather than Python loops.
+
+    The `UCREL_Doc`s are only read when the instance is created, the ids of
+    a `UCREL_Columnar_Doc` are converted without creating its tokens.
+
+    Requires `numpy` to be installed, `pip install numpy`.
+    '''
+    # The token attributes that can be counted.
+    FIELDS = UCREL_Columnar_Doc.TOKEN_ATTRIBUTES
+
+    def __init__(self, ucrel_docs: Iterable[UCREL_Doc],
+                 fields: Iterable[str] = FIELDS) -> None:
+        '''
+        1. **ucrel_docs**: The `UCREL_Doc`s to count e.g. a list of
+        `UCREL_Doc`s or a `UCREL_Corpus`.
+        2. **fields**: The token attributes to count, by default all of the
+        `FIELDS`. Fewer fields use less memory.
+
+        **raises ImportError**: If `numpy` is not installed.
+        **raises ValueError**: If a field is not one of the `FIELDS`.
+        '''
+        if numpy is None:
+            error_msg = ('Corpus statistics require `numpy` to be installed: '
+                         '`pip install numpy`')
+            raise ImportError(error_msg)
+        self.fields = tuple(fields)
+        for field in self.fields:
+            if field not in self.FIELDS:
+                raise ValueError(f'{field} is not a token attribute, the token '
+                                 f'attributes are: {self.FIELDS}')
+        # Field -> value -> id, id 0 is always `None`
+        vocabs = {field: _Vocab({None: 0}) for field in self.fields}
+        doc_ids: Dict[str, List['numpy.ndarray']] = {field: [] for field in self.fields}
+        for ucrel_doc in ucrel_docs:
+            for field in self.fields:
+                if isinstance(ucrel_doc, UCREL_Columnar_Doc):
+                    field_ids = self._columnar_ids(ucrel_doc, field, vocabs[field])
+                else:
+                    value_ids = map(vocabs[field].__getitem__, map(attrgetter(field), ucrel_doc))
+                    field_ids = numpy.fromiter(value_ids, dtype=numpy.int32, count=len(ucrel_doc))
+                doc_ids[field].append(field_ids)
+        # Field -> the values in id order.
+        self.vocabs: Dict[str, List[Optional[str]]] = {field: list(vocab)
+                                                       for field, vocab in vocabs.items()}
+        # Field -> the value id of each token.
+        self.ids: Dict[str, 'numpy.ndarray'] = {}
+        for field, field_ids in doc_ids.items():
+            field_ids.append(numpy.zeros(0, dtype=numpy.int32))
+            self.ids[field] = numpy.concatenate(field_ids)
+
+    @staticmethod
+    def _columnar_ids(ucrel_doc: UCREL_Columnar_Doc, field: str, vocab: _Vocab) -> 'numpy.ndarray':
+        '''
+        1. **ucrel_doc**: The `UCREL_Columnar_Doc` to convert.
+        2. **field**: The token attribute to convert.
+        3. **vocab**: The vocabulary of the `field`, values of the
+        `ucrel_doc` that are not in it are added.
+
+        **returns**: The `vocab` id of the `field` value of each token in
+        the `ucrel_doc`.
+        '''
+        column = ucrel_doc._columns[UCREL_Columnar_Doc.TOKEN_ATTRIBUTES.index(field)]
+        doc_ids = numpy.frombuffer(column, dtype=numpy.dtype(f'u{column.itemsize}'))
+        doc_vocab = ucrel_doc._vocab
+        # The `ucrel_doc` vocabulary is shared by all of its columns, only
+        # the values used by this column are added to the `vocab`.
+        used_ids = numpy.flatnonzero(numpy.bincount(doc_ids, minlength=len(doc_vocab)))
+        id_map = numpy.zeros(len(doc_vocab), dtype=numpy.int32)
+        used_values = map(doc_vocab.__getitem__, used_ids.tolist())
+        id_map[used_ids] = numpy.fromiter(map(vocab.__getitem__, used_values),
+                                          dtype=numpy.int32, count=len(used_ids))
+        return id_map[doc_ids]
+
+    def __len__(self) -> int:
+        '''
+        **returns**: The number of tokens counted.
+        '''
+        return len(self.ids[self.fields[0]]) if self.fields else 0
+
+    def _field_ids(self, field: str) -> 'numpy.ndarray':
+        '''
+        **returns**: The value id of each token for the `field`.
+
+        **raises ValueError**: If the `field` was not counted.
+        '''
+        if field not in self.ids:
+            raise ValueError(f'{field} was not counted, the counted fields '
+                             f'are: {self.fields}')
+        return self.ids[field]
+
+    def counts(self, field: str) -> 'numpy.ndarray':
+        '''
+        1. **field**: One of the counted `fields`.
+
+        **returns**: The frequency of each value of the `field` as an array
+        in the order of `self.vocabs[field]`, the first is the number of
+        tokens that have no value for the `field`.
+
+        **raises ValueError**: If the `field` was not counted.
+        '''
+        return numpy.bincount(self._field_ids(field), minlength=len(self.vocabs[field]))
+
+    def frequencies(self, field: str) -> Dict[str, int]:
+        '''
+        1. **field**: One of the counted `fields` e.g. `usas_tag`.
+
+        **returns**: The frequency of each value of the `field`, most
+        frequent first. Tokens that have no value for the `field` are not
+        included.
+
+        **raises ValueError**: If the `field` was not counted.
+        '''
+        counts = self.counts(field)[1:]
+        vocab = self.vocabs[field]
+        order = numpy.argsort(-counts, kind='stable')
+        return {vocab[value_id + 1]: count
+                for value_id, count in zip(order.tolist(), counts[order].tolist())}
+
+    def crosstab(self, row_field: str = 'pos_tag', column_field: str = 'usas_tag'
+                 ) -> Tuple[List[str], List[str], 'numpy.ndarray']:
+        '''
+        Cross tabulation of the values of two fields, by default the
+        number of times each POS tag occurs with each USAS tag.
+
+        1. **row_field**: One of the counted `fields`.
+        2. **column_field**: One of the counted `fields`.
+
+        **returns**: The `row_field` values, the `column_field` values, and
+        a matrix of the number of tokens that have each pair of values,
+        `matrix[row_index, column_index]`. Tokens that have no value for
+        either field are not counted.
+
+        **raises ValueError**: If a field was not counted.
+        '''
+        row_ids = self._field_ids(row_field)
+        column_ids = self._field_ids(column_field)
+        number_rows = len(self.vocabs[row_field])
+        number_columns = len(self.vocabs[column_field])
+        pair_ids = row_ids.astype(numpy.int64) * number_columns + column_ids
+        matrix = numpy.bincount(pair_ids, minlength=number_rows * number_columns)
+        matrix = matrix.reshape(number_rows, number_columns)[1:, 1:]
+        return self.vocabs[row_field][1:], self.vocabs[column_field][1:], matrix
+
+    def keyness(self, reference: 'UCREL_Stats', field: str = 'lemma'
+                ) -> List[Tuple[str, float, int, int]]:
+        '''
+        The [log-likelihood](https://ucrel.lancs.ac.uk/llwizard.html)
+        keyness of each value of the `field` in this corpus compared to the
+        `reference` corpus. The corpus sizes are the number of tokens that
+        have a value for the `field`.
+
+        1. **reference**: The statistics of the corpus to compare to.
+        2. **field**: A field counted by both this instance and the
+        `reference` e.g. `lemma` or `usas_tag`.
+
+        **returns**: A tuple of the value, its log-likelihood, its frequency
+        in this corpus, and its frequency in the `reference` corpus, for
+        each value in either corpus, most key first. The log-likelihood is
+        negative if the value is relatively less frequent in this corpus
+        than in the `reference` corpus.
+
+        **raises ValueError**: If the `field` was not counted by both.
+        '''
+        counts = self.counts(field)
+        reference_counts = reference.counts(field)
+        # Aligns the reference values with the values of this corpus
+        vocab = _Vocab({value: value_id for value_id, value in enumerate(self.vocabs[field])})
+        reference_map = numpy.array([vocab[value] for value in reference.vocabs[field]],
+                                    dtype=numpy.int64)
+        values = list(vocab)
+        frequencies = numpy.zeros(len(values), dtype=numpy.int64)
+        frequencies[:len(counts)] = counts
+        reference_frequencies = numpy.zeros(len(values), dtype=numpy.int64)
+        reference_frequencies[reference_map] = reference_counts
+        frequencies, reference_frequencies = frequencies[1:], reference_frequencies[1:]
+
+        size = frequencies.sum()
+        reference_size = reference_frequencies.sum()
+        total_ratio = (frequencies + reference_frequencies) / max(size + reference_size, 1)
+        expected = size * total_ratio
+        reference_expected = reference_size * total_ratio
+        log_likelihood = 2 * (_log_likelihood_terms(frequencies, expected) +
+                              _log_likelihood_terms(reference_frequencies, reference_expected))
+        log_likelihood = numpy.where(frequencies < expected, -log_likelihood, log_likelihood)
+        order = numpy.argsort(-numpy.abs(log_likelihood), kind='stable')
+        return list(zip([values[value_id + 1] for value_id in order.tolist()],
+                        log_likelihood[order].tolist(), frequencies[order].tolist(),
+                        reference_frequencies[order].tolist()))
+
+    def __repr__(self) -> str:
+        '''
+        String representation of the UCREL Stats instance, format:
+
+        UCREL Stats, {len(self)} tokens, fields {self.fields}
+        '''
+        return f'UCREL Stats, {len(self)} tokens, fields {self.fields}'
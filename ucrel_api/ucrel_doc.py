@@ -1,12 +1,19 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: module_notebooks/02_ucrel_doc.ipynb (unless otherwise specified).
 
-__all__ = ['UCREL_Doc']
+__all__ = ['UCREL_Doc', 'UCREL_Columnar_Doc']
 
 # Cell
 
 from collections import abc
+import itertools
 import json
-from typing import List, Tuple, Optional, Iterable, Any
+import re
+from typing import List, Tuple, Optional, Iterable, Iterator, Any, Dict, TextIO, Callable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from .ucrel_token import UCREL_Token
 
@@ -24,7 +31,8 @@ class UCREL_Doc(abc.Iterable, abc.Sized):
     and [collections.abc.Sized](https://docs.python.org/3/library/collections.abc.html#collections.abc.Sized)
     '''
     def __init__(self, text: str, tokens: List[UCREL_Token],
-                 sentence_indexes: Optional[List[Tuple[int,int]]] = None
+                 sentence_indexes: Optional[List[Tuple[int,int]]] = None,
+                 mwe_indexes: Optional[List[Tuple[int, ...]]] = None
                  ) -> None:
         '''
         1. **text**: The text the Doc is representing.
@@ -34,10 +42,15 @@ class UCREL_Doc(abc.Iterable, abc.Sized):
            the start and end of the sentence. These are used to
            create the `sentences` property. Can be accessed through
            `self._sentence_indexes`. **Optional**
+        4. **mwe_indexes**: A List of Tuples. Where each tuple contains
+           the token indexes of a Multi Word Expression (MWE), see the
+           `mwe_indexes` property. **Optional**, if not given they are
+           found from the token MWE tags when first accessed.
         '''
         self.text = text
         self.tokens = tokens
         self._sentence_indexes = sentence_indexes
+        self._mwe_indexes = mwe_indexes
 
     def __repr__(self) -> str:
         '''
@@ -46,7 +59,7 @@ class UCREL_Doc(abc.Iterable, abc.Sized):
         base_repr = 'UCREL Doc:'
         if self._sentence_indexes is not None:
             base_repr = f'UCREL Doc ({len(self._sentence_indexes)} sentences):'
-        first_three_tokens = self.tokens[:3]
+        first_three_tokens = self[:3]
         first_three_token_strings = '\n'.join([str(token) for token in first_three_tokens])
         base_repr += f'\nFirst {len(first_three_tokens)} tokens:\n'
         base_repr += first_three_token_strings
@@ -88,6 +101,8 @@ class UCREL_Doc(abc.Iterable, abc.Sized):
         2. sentence_indexes
         3. tokens
 
+        The `mwe_indexes` are not compared as they come from the tokens.
+
         **raises NotImplementedError**: If the `other` instance is not of
         the same class type as `self`.
         '''
@@ -125,24 +140,101 @@ class UCREL_Doc(abc.Iterable, abc.Sized):
                          'without `sentence_indexes` at construction time')
             raise ValueError(error_msg)
         for start_index, end_index in self._sentence_indexes:
-            yield self.tokens[start_index:end_index]
+            yield self[start_index:end_index]
+
+    @property
+    def mwe_indexes(self) -> List[Tuple[int, ...]]:
+        '''
+        **returns**: The token indexes of each Multi Word Expression (MWE)
+        in the Doc, in the order the MWEs start. The tokens of an MWE are
+        found from their `UCREL_Token.mwe_tag`, which is
+        `{MWE id}.{number of tokens in the MWE}.{position in the MWE}`
+        e.g. `1.2.1`, the tokens do not have to be next to each other.
+
+        `UCREL_API.usas` finds the MWEs whilst it parses the response,
+        otherwise they are found, once, the first time they are accessed.
+        '''
+        if self._mwe_indexes is None:
+            mwe_grouper = _MWE_Grouper()
+            for token_index, token in enumerate(self):
+                if token.mwe_tag is not None:
+                    mwe_grouper.add(token_index, token.mwe_tag)
+            self._mwe_indexes = mwe_grouper.mwe_indexes()
+        return self._mwe_indexes
+
+    @property
+    def mwes(self) -> Iterable[List[UCREL_Token]]:
+        '''
+        **returns**: An iterable of all of the Multi Word Expressions (MWE)
+        in the text represented as a list of `UCREL_Token`s, see `mwe_indexes`.
+        '''
+        for token_indexes in self.mwe_indexes:
+            yield [self[token_index] for token_index in token_indexes]
 
     def to_json(self) -> str:
         '''
         **returns** This UCREL_Doc as a JSON String.
         '''
-        text_json = json.dumps(self.text)
-        sentence_indexes_json = json.dumps(self._sentence_indexes)
+        return json.dumps({'text': self.text,
+                           'tokens': [token._to_dict() for token in self],
+                           'sentence_indexes': self._sentence_indexes})
 
-        token_json = '['
-        for token in self.tokens:
-            token_json += f'{token.to_json()}, '
-        token_json = token_json.rstrip(', ')
-        token_json += ']'
+    def dump(self, fp: TextIO, tokens_per_write: int = 10000) -> None:
+        '''
+        Writes this UCREL_Doc to the file as JSON, the same JSON that `to_json`
+        returns, without creating the whole JSON String in memory.
+
+        1. **fp**: A text file, or file like object, to write to.
+        2. **tokens_per_write**: The number of tokens written to the file at a time.
+        '''
+        fp.write('{"text": ' + json.dumps(self.text) + ', "tokens": [')
+        separator = ''
+        tokens = iter(self)
+        while True:
+            token_dicts = [token._to_dict() for token in itertools.islice(tokens, tokens_per_write)]
+            if not token_dicts:
+                break
+            # Removes the `[` and `]` of the JSON list of tokens
+            fp.write(separator + json.dumps(token_dicts)[1:-1])
+            separator = ', '
+        fp.write('], "sentence_indexes": ' + json.dumps(self._sentence_indexes) + '}')
+
+    @staticmethod
+    def _from_json_dict(json_ucrel_doc: Dict[str, Any],
+                        doc_class: Optional[type] = None) -> 'UCREL_Doc':
+        '''
+        1. **json_ucrel_doc**: The decoded JSON of a `UCREL_Doc` whose tokens
+        have already been converted into `UCREL_Token`s.
+        2. **doc_class**: The class of the Doc to create, by default `UCREL_Doc`.
+
+        **returns** The `json_ucrel_doc` represented through the `doc_class`.
+        '''
+        # Convert Sentence Indexes from a List of List objects into
+        # a List of Tuples
+        sentence_indexes = []
+        json_sentence_indexes = json_ucrel_doc['sentence_indexes']
+        if json_sentence_indexes is not None:
+            for index in json_sentence_indexes:
+                sentence_indexes.append(tuple(index))
+        sentence_indexes = sentence_indexes if sentence_indexes else None
+        json_ucrel_doc['sentence_indexes'] = sentence_indexes
+        return (doc_class or UCREL_Doc)(**json_ucrel_doc)
+
+    @staticmethod
+    def _decode_json(json_string: str) -> Dict[str, Any]:
+        '''
+        1. **json_string**: A string that is the return of
+        `UCREL_Doc.to_json` method
 
-        json_string = ('{"text": ' + text_json + ', "tokens": ' + token_json +
-                       ', "sentence_indexes": '+ sentence_indexes_json + '}')
-        return json_string
+        **returns** The decoded `json_string`, decoded by orjson if it is installed.
+        '''
+        if orjson is not None:
+            try:
+                return orjson.loads(json_string)
+            except orjson.JSONDecodeError:
+                # e.g. lone surrogates which `json` encodes but orjson rejects
+                pass
+        return json.loads(json_string)
 
     @staticmethod
     def from_json(json_string: str) -> 'UCREL_Doc':
@@ -150,29 +242,476 @@ class UCREL_Doc(abc.Iterable, abc.Sized):
         A static method that given a `json_string` will
         return a `UCREL_Doc` representation of that string.
 
+        If [orjson](https://github.com/ijl/orjson) is installed it is used
+        to decode the `json_string`, which is faster than the standard library.
+
         1. **json_string**: A string that is the return of
         `UCREL_Doc.to_json` method
 
         **returns** The given `json_string` represented through the
         `UCREL_Doc`.
         '''
+        json_ucrel_doc = UCREL_Doc._decode_json(json_string)
+        json_ucrel_doc['tokens'] = _tokens_from_dicts(json_ucrel_doc['tokens'])
+        return UCREL_Doc._from_json_dict(json_ucrel_doc)
 
-        json_ucrel_doc = json.loads(json_string)
+    @staticmethod
+    def load(fp: TextIO, chunk_size: int = 65536) -> 'UCREL_Doc':
+        '''
+        A static method that reads a `UCREL_Doc` from a file of JSON, the
+        JSON is read incrementally and never fully in memory.
 
-        # Convert Sentence Indexes from a List of List objects into
-        # a List of Tuples
-        sentence_indexes = []
-        json_sentence_indexes = json_ucrel_doc['sentence_indexes']
-        if json_sentence_indexes is not None:
-            for index in json_sentence_indexes:
-                sentence_indexes.append(tuple(index))
-        sentence_indexes = sentence_indexes if sentence_indexes else None
-        json_ucrel_doc['sentence_indexes'] = sentence_indexes
+        1. **fp**: A text file, or file like object, that contains the return of
+        `UCREL_Doc.to_json` or `UCREL_Doc.dump` and nothing else.
+        2. **chunk_size**: The minimum number of characters read from the
+        `fp` at a time.
+
+        **returns** The JSON in the `fp` represented through the `UCREL_Doc`.
 
-        # Convert the Tokens from a Dict object into UCREL_Token object
-        ucrel_tokens = []
-        for token in json_ucrel_doc['tokens']:
+        **raises json.JSONDecodeError**: If the `fp` does not contain valid JSON.
+        '''
+        json_ucrel_doc = UCREL_Doc._load_json_dict(fp, chunk_size, _tokens_from_dicts)
+        return UCREL_Doc._from_json_dict(json_ucrel_doc)
+
+    @staticmethod
+    def _load_json_dict(fp: TextIO, chunk_size: int,
+                        tokens_from_dicts: Callable[[Iterator[Dict[str, Optional[str]]]], Any]
+                        ) -> Dict[str, Any]:
+        '''
+        1. **fp**: A text file, or file like object, that contains the return of
+        `UCREL_Doc.to_json` or `UCREL_Doc.dump` and nothing else.
+        2. **chunk_size**: The minimum number of characters read from the
+        `fp` at a time.
+        3. **tokens_from_dicts**: Converts an iterator of the decoded JSON of
+        each token, which are decoded one at a time, into the `tokens`.
+
+        **returns** The decoded JSON in the `fp`, with the `tokens` converted
+        by `tokens_from_dicts`.
+
+        **raises json.JSONDecodeError**: If the `fp` does not contain valid JSON.
+        '''
+        reader = _JSONStreamReader(fp, chunk_size)
+        json_ucrel_doc: Dict[str, Any] = {}
+        reader.expect('{')
+        if reader.peek() == '}':
+            reader.expect('}')
+        else:
+            while True:
+                key = reader.value()
+                reader.expect(':')
+                if key == 'tokens':
+                    json_ucrel_doc[key] = tokens_from_dicts(reader.iter_array())
+                else:
+                    json_ucrel_doc[key] = reader.value()
+                if reader.expect(',}') == '}':
+                    break
+        reader.expect_end()
+        return json_ucrel_doc
+
+class _MWE_Grouper():
+    '''
+    Groups tokens into Multi Word Expressions (MWE) by their MWE tags,
+    `{MWE id}.{number of tokens in the MWE}.{position in the MWE}` e.g.
+    `1.2.1`. An MWE id can be used again once its MWE has all of its tokens.
+    '''
+    def __init__(self) -> None:
+        # Token indexes of each MWE, in the order the MWEs start.
+        self._mwes: List[List[int]] = []
+        # MWE id -> (token indexes, number of tokens) of the MWEs that
+        # do not have all of their tokens yet.
+        self._open_mwes: Dict[str, Tuple[List[int], int]] = {}
+
+    def add(self, token_index: int, mwe_tag: str) -> None:
+        '''
+        1. **token_index**: The index of the token in the Doc.
+        2. **mwe_tag**: The MWE tag of the token.
+        '''
+        mwe_id, _, mwe_length = mwe_tag.partition('.')
+        open_mwe = self._open_mwes.get(mwe_id)
+        if open_mwe is None:
+            mwe_length = mwe_length.partition('.')[0]
+            open_mwe = ([], int(mwe_length) if mwe_length.isdigit() else 0)
+            self._mwes.append(open_mwe[0])
+            self._open_mwes[mwe_id] = open_mwe
+        token_indexes, number_tokens = open_mwe
+        token_indexes.append(token_index)
+        if len(token_indexes) == number_tokens:
+            del self._open_mwes[mwe_id]
+
+    def mwe_indexes(self) -> List[Tuple[int, ...]]:
+        '''
+        **returns**: The token indexes of each MWE, see `UCREL_Doc.mwe_indexes`.
+        '''
+        return [tuple(token_indexes) for token_indexes in self._mwes]
+
+def _tokens_from_dicts(token_dicts: Iterable[Dict[str, Optional[str]]]) -> List[UCREL_Token]:
+    '''
+    1. **token_dicts**: The decoded JSON of `UCREL_Token`s.
+
+    **returns** The `token_dicts` converted into `UCREL_Token`s.
+    '''
+    # Convert the Tokens from a Dict object into UCREL_Token object,
+    # positional arguments are faster than `UCREL_Token(**token)`.
+    ucrel_tokens = []
+    for token in token_dicts:
+        try:
+            ucrel_tokens.append(UCREL_Token(token['text'], token['lemma'], token['pos_tag'],
+                                            token['usas_tag'], token['mwe_tag']))
+        except KeyError:
             ucrel_tokens.append(UCREL_Token(**token))
-        json_ucrel_doc['tokens'] = ucrel_tokens
+    return ucrel_tokens
+
+class _JSONStreamReader():
+    '''
+    Reads a JSON document from a text file one value at a time, only the
+    value that is being read is kept in memory.
+    '''
+    _WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+    def __init__(self, fp: TextIO, chunk_size: int = 65536) -> None:
+        '''
+        1. **fp**: The text file to read from.
+        2. **chunk_size**: The minimum number of characters read from the
+        file at a time.
+        '''
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._index = 0
+
+    def _read(self) -> bool:
+        '''
+        Reads more of the file into the buffer, dropping what has been read,
+        at least as many characters as are in the buffer are read so that
+        a large value is read in a linear number of steps.
+
+        **returns**: `False` if the end of the file has been reached.
+        '''
+        chunk = self._fp.read(max(self._chunk_size, len(self._buffer) - self._index))
+        if not chunk:
+            return False
+        self._buffer = self._buffer[self._index:] + chunk
+        self._index = 0
+        return True
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        '''
+        **returns**: A JSONDecodeError at the current position of the buffer.
+        '''
+        return json.JSONDecodeError(message, self._buffer, self._index)
+
+    def peek(self) -> str:
+        '''
+        **returns**: The next character that is not whitespace, an empty
+        string at the end of the file.
+        '''
+        while True:
+            self._index = self._WHITESPACE.match(self._buffer, self._index).end()
+            if self._index < len(self._buffer) or not self._read():
+                return self._buffer[self._index:self._index + 1]
+
+    def expect(self, characters: str) -> str:
+        '''
+        1. **characters**: The characters that the next character, that is
+        not whitespace, can be.
+
+        **returns**: The next character, that is not whitespace, which is read.
+
+        **raises json.JSONDecodeError**: If the next character is not one of
+        the `characters`.
+        '''
+        character = self.peek()
+        if not character or character not in characters:
+            raise self._error(f'Expecting one of {characters!r}')
+        self._index += 1
+        return character
+
+    def expect_end(self) -> None:
+        '''
+        **raises json.JSONDecodeError**: If there is anything other than
+        whitespace left in the file.
+        '''
+        if self.peek():
+            raise self._error('Extra data')
+
+    def value(self) -> Any:
+        '''
+        **returns**: The next JSON value.
 
-        return UCREL_Doc(**json_ucrel_doc)
+        **raises json.JSONDecodeError**: If the next value is not valid JSON.
+        '''
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._index)
+            except json.JSONDecodeError:
+                # Either whitespace before the value or the value continues
+                # after the end of the buffer.
+                index = self._index
+                self.peek()
+                if self._index == index and not self._read():
+                    raise
+                continue
+            # A number at the end of the buffer could continue in the file
+            if end == len(self._buffer) and isinstance(value, (int, float)) and self._read():
+                continue
+            self._index = end
+            return value
+
+    def iter_array(self) -> Iterator[Any]:
+        '''
+        **returns**: Yields each value of the next JSON array.
+
+        **raises json.JSONDecodeError**: If the next value is not a valid JSON array.
+        '''
+        self.expect('[')
+        if self.peek() == ']':
+            self.expect(']')
+            return
+        while True:
+            yield self.value()
+            # The separator that `json.dumps` uses, checked first as it is faster.
+            if self._buffer.startswith(', ', self._index):
+                self._index += 2
+            elif self.expect(',]') == ']':
+                return
+
+# Cell
+
+from array import array
+import sys
+from typing import Dict, Union, TextIO
+
+class UCREL_Columnar_Doc(UCREL_Doc):
+    '''
+    A `UCREL_Doc` that stores its tokens in columns rather than as a list of
+    `UCREL_Token`s, which uses far less memory for large texts. Each token
+    attribute, e.g. `lemma`, is stored as an [array](https://docs.python.org/3/library/array.html)
+    of ids into a vocabulary that stores each distinct string once.
+
+    `UCREL_Token`s are only created when they are accessed, e.g. through
+    `__getitem__`, `__iter__`, `tokens`, or `sentences`, therefore changing
+    an accessed token does not change the Doc.
+
+    **inherits from**: `UCREL_Doc`
+    '''
+    # The token attributes in the order they are stored as columns.
+    TOKEN_ATTRIBUTES = ('text', 'lemma', 'pos_tag', 'usas_tag', 'mwe_tag')
+
+    def __init__(self, text: str, tokens: Iterable[UCREL_Token],
+                 sentence_indexes: Optional[List[Tuple[int,int]]] = None,
+                 mwe_indexes: Optional[List[Tuple[int, ...]]] = None
+                 ) -> None:
+        '''
+        1. **text**: The text the Doc is representing.
+        2. **tokens**: Iterable of `UCREL_Token`s, these are converted into
+           columns and are not kept.
+        3. **sentence_indexes**: A List of Tuples. Where each tuple
+           contains a start and an end token index representing
+           the start and end of the sentence. These are used to
+           create the `sentences` property. Can be accessed through
+           `self._sentence_indexes`. **Optional**
+        4. **mwe_indexes**: A List of Tuples. Where each tuple contains
+           the token indexes of a Multi Word Expression (MWE), see
+           `UCREL_Doc.mwe_indexes`. **Optional**
+        '''
+        # Id 0 is always `None`
+        self._vocab: List[Optional[str]] = [None]
+        self._vocab_ids: Dict[Optional[str], int] = {None: 0}
+        self._columns: Tuple[array, ...] = tuple(array('I') for _ in self.TOKEN_ATTRIBUTES)
+        super().__init__(text, tokens, sentence_indexes, mwe_indexes)
+
+    @property
+    def tokens(self) -> List[UCREL_Token]:
+        '''
+        **returns**: A new list of all of the tokens in the Doc, setting
+        `tokens` replaces all of the tokens in the Doc.
+        '''
+        return self[:]
+
+    @tokens.setter
+    def tokens(self, tokens: Iterable[UCREL_Token]) -> None:
+        tokens_values = ((token.text, token.lemma, token.pos_tag, token.usas_tag, token.mwe_tag)
+                         for token in tokens)
+        self._columns = self._to_columns(tokens_values, self._vocab, self._vocab_ids)
+
+    @staticmethod
+    def _to_columns(tokens_values: Iterable[Tuple[Optional[str], ...]],
+                    vocab: List[Optional[str]], vocab_ids: Dict[Optional[str], int]
+                    ) -> Tuple[array, ...]:
+        '''
+        1. **tokens_values**: The values of the `TOKEN_ATTRIBUTES` of each token.
+        2. **vocab**: The vocabulary, new values are added to it.
+        3. **vocab_ids**: The id of each value in the `vocab`, new values are added to it.
+
+        **returns**: A column of vocabulary ids for each of the `TOKEN_ATTRIBUTES`.
+        '''
+        columns = tuple(array('I') for _ in UCREL_Columnar_Doc.TOKEN_ATTRIBUTES)
+        for token_values in tokens_values:
+            for value, column in zip(token_values, columns):
+                value_id = vocab_ids.get(value)
+                if value_id is None:
+                    value_id = len(vocab)
+                    vocab_ids[value] = value_id
+                    vocab.append(value)
+                column.append(value_id)
+        return columns
+
+    def _create_token(self, index: int) -> UCREL_Token:
+        '''
+        1. **index**: A non negative index of a token in the Doc.
+
+        **returns**: A new `UCREL_Token` of the token at the `index`.
+        '''
+        vocab = self._vocab
+        return UCREL_Token(*[vocab[column[index]] for column in self._columns])
+
+    def __iter__(self) -> Iterable[UCREL_Token]:
+        '''
+        **returns**: Yields each token in the Doc, see `tokens`.
+        '''
+        vocab = self._vocab
+        for token_ids in zip(*self._columns):
+            yield UCREL_Token(*[vocab[token_id] for token_id in token_ids])
+
+    def __len__(self) -> int:
+        '''
+        **returns**: The number of tokens in the Doc.
+        '''
+        return len(self._columns[0])
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[UCREL_Token, List[UCREL_Token]]:
+        '''
+        1. **index**: The index of the token, or a slice of the tokens, to return.
+
+        **returns**: The token at the given index, or a list of the
+        tokens in the given slice.
+
+        **raises IndexError**: If the `index` is out of range.
+        '''
+        if isinstance(index, slice):
+            return [self._create_token(token_index)
+                    for token_index in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f'Token index {index} is out of range for a Doc '
+                             f'of {len(self)} tokens')
+        return self._create_token(index)
+
+    def __repr__(self) -> str:
+        '''
+        String representation of the UCREL Columnar Doc instance,
+        same as `UCREL_Doc.__repr__`.
+        '''
+        return 'UCREL Columnar' + super().__repr__()[len('UCREL'):]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        '''
+        **returns**: The state to pickle, the vocabulary ids are
+        re-created when un-pickled.
+        '''
+        state = self.__dict__.copy()
+        del state['_vocab_ids']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        '''
+        1. **state**: The state returned by `__getstate__`.
+        '''
+        self.__dict__.update(state)
+        self._vocab_ids = {value: value_id for value_id, value in enumerate(self._vocab)}
+
+    @property
+    def nbytes(self) -> int:
+        '''
+        **returns**: The approximate number of bytes used to store the
+        tokens, which is the size of the columns and the vocabulary.
+        '''
+        size = sum(column.itemsize * len(column) for column in self._columns)
+        size += sys.getsizeof(self._vocab) + sys.getsizeof(self._vocab_ids)
+        size += sum(sys.getsizeof(value) for value in self._vocab if value is not None)
+        return size
+
+    @staticmethod
+    def from_doc(ucrel_doc: UCREL_Doc) -> 'UCREL_Columnar_Doc':
+        '''
+        1. **ucrel_doc**: The `UCREL_Doc` to convert.
+
+        **returns**: A `UCREL_Columnar_Doc` of the `ucrel_doc`.
+        '''
+        sentence_indexes = ucrel_doc._sentence_indexes
+        if sentence_indexes is not None:
+            sentence_indexes = list(sentence_indexes)
+        mwe_indexes = ucrel_doc._mwe_indexes
+        if mwe_indexes is not None:
+            mwe_indexes = list(mwe_indexes)
+        return UCREL_Columnar_Doc(ucrel_doc.text, ucrel_doc,
+                                  sentence_indexes=sentence_indexes,
+                                  mwe_indexes=mwe_indexes)
+
+    @staticmethod
+    def from_json(json_string: str) -> 'UCREL_Columnar_Doc':
+        '''
+        Same as `UCREL_Doc.from_json` but returns a `UCREL_Columnar_Doc`.
+
+        1. **json_string**: A string that is the return of
+        `UCREL_Doc.to_json` method
+
+        **returns** The given `json_string` represented through the
+        `UCREL_Columnar_Doc`.
+        '''
+        json_ucrel_doc = UCREL_Doc._decode_json(json_string)
+        json_ucrel_doc['tokens'] = UCREL_Columnar_Doc._columns_from_dicts(json_ucrel_doc['tokens'])
+        return UCREL_Columnar_Doc._from_columns_dict(json_ucrel_doc)
+
+    @staticmethod
+    def load(fp: TextIO, chunk_size: int = 65536) -> 'UCREL_Columnar_Doc':
+        '''
+        Same as `UCREL_Doc.load` but returns a `UCREL_Columnar_Doc`.
+
+        1. **fp**: A text file, or file like object, that contains the return of
+        `UCREL_Doc.to_json` or `UCREL_Doc.dump` and nothing else.
+        2. **chunk_size**: The minimum number of characters read from the
+        `fp` at a time.
+
+        **returns** The JSON in the `fp` represented through the
+        `UCREL_Columnar_Doc`.
+
+        **raises json.JSONDecodeError**: If the `fp` does not contain valid JSON.
+        '''
+        # Each token is added to the columns as it is decoded, so only the
+        # columns are ever fully in memory.
+        json_ucrel_doc = UCREL_Doc._load_json_dict(fp, chunk_size,
+                                                   UCREL_Columnar_Doc._columns_from_dicts)
+        return UCREL_Columnar_Doc._from_columns_dict(json_ucrel_doc)
+
+    @staticmethod
+    def _columns_from_dicts(token_dicts: Iterable[Dict[str, Optional[str]]]
+                            ) -> Tuple[List[Optional[str]], Dict[Optional[str], int], Tuple[array, ...]]:
+        '''
+        1. **token_dicts**: The decoded JSON of `UCREL_Token`s.
+
+        **returns** The vocabulary, the id of each value in the vocabulary,
+        and the columns of the `token_dicts`, without creating `UCREL_Token`s.
+        '''
+        vocab: List[Optional[str]] = [None]
+        vocab_ids: Dict[Optional[str], int] = {None: 0}
+        tokens_values = ((token['text'], token.get('lemma'), token.get('pos_tag'),
+                          token.get('usas_tag'), token.get('mwe_tag')) for token in token_dicts)
+        return vocab, vocab_ids, UCREL_Columnar_Doc._to_columns(tokens_values, vocab, vocab_ids)
+
+    @staticmethod
+    def _from_columns_dict(json_ucrel_doc: Dict[str, Any]) -> 'UCREL_Columnar_Doc':
+        '''
+        1. **json_ucrel_doc**: The decoded JSON of a `UCREL_Doc` whose tokens
+        are the return of `_columns_from_dicts`.
+
+        **returns** The `json_ucrel_doc` represented through the `UCREL_Columnar_Doc`.
+        '''
+        vocab, vocab_ids, columns = json_ucrel_doc['tokens']
+        json_ucrel_doc['tokens'] = []
+        columnar_doc = UCREL_Doc._from_json_dict(json_ucrel_doc, UCREL_Columnar_Doc)
+        columnar_doc._vocab, columnar_doc._vocab_ids = vocab, vocab_ids
+        columnar_doc._columns = columns
+        return columnar_doc
@@ -4,7 +4,7 @@ __all__ = ['UCREL_Token']
 
 # Cell
 import json
-from typing import Optional, Any
+from typing import Optional, Any, Dict
 
 class UCREL_Token():
     '''
@@ -14,6 +14,9 @@ class UCREL_Token():
     This class is inspired by the [Token](https://spacy.io/api/token)
     class from the [SpaCy API.](https://spacy.io/api)
     '''
+    # No per token `__dict__`, which saves memory when there are many tokens.
+    __slots__ = ('text', 'lemma', 'pos_tag', 'usas_tag', 'mwe_tag')
+
     def __init__(self, text: str, lemma: Optional[str] = None,
                  pos_tag: Optional[str] = None,
                  usas_tag: Optional[str] = None,
@@ -91,11 +94,20 @@ class UCREL_Token():
             return False
         return True
 
+    def _to_dict(self) -> Dict[str, Optional[str]]:
+        '''
+        **returns** This UCREL_Token as a dictionary of its attributes, in
+        the order they are written to JSON.
+        '''
+        return {'text': self.text, 'lemma': self.lemma,
+                'pos_tag': self.pos_tag, 'usas_tag': self.usas_tag,
+                'mwe_tag': self.mwe_tag}
+
     def to_json(self) -> str:
         '''
         **returns** This UCREL_Token as a JSON String.
         '''
-        return json.dumps(self.__dict__)
+        return json.dumps(self._to_dict())
 
     @staticmethod
     def from_json(json_string: str) -> 'UCREL_Token':